@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Program Knowledge Base for PrimeTime BD Intel
+Merges programs_dictionary.json, primes_lookup.json and settings.program_mapping.program_keywords
+into one compiled artifact with term, prime, location and subcontractor indexes. The artifact is
+cached on disk and rebuilt only when a source file's content changes.
+
+Usage:
+    python config/knowledge_base.py [--config config/settings.yaml] [--rebuild]
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import load_settings, resolve_path
+
+logger = logging.getLogger(__name__)
+
+# Bump when the compiled layout changes so stale artifacts are rebuilt
+KNOWLEDGE_BASE_FORMAT = 1
+
+DEFAULT_SOURCES = {
+    "programs_dictionary": "config/programs_dictionary.json",
+    "primes_lookup": "config/primes_lookup.json",
+}
+DEFAULT_CACHE_PATH = "data/knowledge_base.json"
+
+# Resolved artifact path -> knowledge base loaded in this process
+_cache: Dict[str, "ProgramKnowledgeBase"] = {}
+
+
+def normalize(text: str) -> str:
+    """Lookup key for names and places: lowercased with whitespace collapsed."""
+    return " ".join(str(text).lower().split())
+
+
+def code_key(code: str) -> str:
+    """Normalize program codes so 'F/A-18' in the dictionary matches 'F_A_18' in settings."""
+    return re.sub(r"[^a-z0-9]", "", code.lower())
+
+
+def _add(index: Dict[str, List[str]], key: str, value: str) -> None:
+    values = index.setdefault(normalize(key), [])
+    if value not in values:
+        values.append(value)
+
+
+class ProgramKnowledgeBase:
+    """Program, prime and subcontractor data with lookup indexes, as compiled by compile_sources.
+
+    Index keys are normalize()d; values are program codes as spelled in programs_dictionary.json
+    (or prime/subcontractor names as spelled in primes_lookup.json), in source order.
+    """
+
+    def __init__(self, data: Dict):
+        self.data = data
+        self.sources: Dict[str, Dict] = data["sources"]
+        self.programs: Dict[str, Dict] = data["programs"]
+        self.program_keywords: Dict[str, List[str]] = data["program_keywords"]
+        self.prime_contractors: Dict[str, Dict] = data["prime_contractors"]
+        self.subcontractors: Dict[str, Dict] = data["subcontractors"]
+        self.clearance_levels: Dict[str, Dict] = data["clearance_levels"]
+        self.locations: Dict[str, List[str]] = data["locations"]
+        self.clearance_hubs: Dict[str, Dict] = data["clearance_hubs"]
+        self.term_programs: Dict[str, List[str]] = data["term_programs"]
+        self.prime_programs: Dict[str, List[str]] = data["prime_programs"]
+        self.location_programs: Dict[str, List[str]] = data["location_programs"]
+        self.subcontractor_primes: Dict[str, List[str]] = data["subcontractor_primes"]
+        self.subcontractor_programs: Dict[str, List[str]] = data["subcontractor_programs"]
+
+    def version(self, *source_names: str) -> str:
+        """Content hash of the named sources (all of them by default)."""
+        names = source_names or sorted(self.sources)
+        return hashlib.sha256("".join(self.sources[name]["sha256"] for name in names).encode()).hexdigest()
+
+    def programs_for_term(self, term: str) -> List[str]:
+        return self.term_programs.get(normalize(term), [])
+
+    def programs_for_prime(self, prime: str) -> List[str]:
+        return self.prime_programs.get(normalize(prime), [])
+
+    def programs_for_location(self, location: str) -> List[str]:
+        return self.location_programs.get(normalize(location), [])
+
+    def primes_for_subcontractor(self, subcontractor: str) -> List[str]:
+        return self.subcontractor_primes.get(normalize(subcontractor), [])
+
+    def programs_for_subcontractor(self, subcontractor: str) -> List[str]:
+        return self.subcontractor_programs.get(normalize(subcontractor), [])
+
+
+def _read_json(path: str, name: str) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.error(f"Knowledge base source {name} not found: {path}")
+        return {}
+
+
+def compile_sources(programs_file: Dict, primes_file: Dict, program_keywords: Dict) -> Dict:
+    """Merge the three sources into the compiled (JSON-serializable) layout, without source signatures."""
+    programs = programs_file.get("programs", {})
+    codes = {code_key(code): code for code in programs}
+
+    def canonical(code: str) -> str:
+        return codes.get(code_key(code), code)
+
+    keywords = {}
+    for code, terms in (program_keywords or {}).items():
+        keywords.setdefault(canonical(code), []).extend(terms)
+
+    term_programs: Dict[str, List[str]] = {}
+    prime_programs: Dict[str, List[str]] = {}
+    location_programs: Dict[str, List[str]] = {}
+    for code, details in programs.items():
+        for term in ([code, details.get("full_name", "")] + details.get("acronyms", [])
+                     + details.get("code_names", []) + details.get("key_skills", []) + keywords.get(code, [])):
+            if term:
+                _add(term_programs, term, code)
+        if details.get("prime_contractor"):
+            _add(prime_programs, details["prime_contractor"], code)
+        for location in details.get("locations", []):
+            _add(location_programs, location, code)
+
+    prime_contractors = primes_file.get("prime_contractors", {})
+    subcontractor_primes: Dict[str, List[str]] = {}
+    subcontractor_programs: Dict[str, List[str]] = {}
+    for prime, details in prime_contractors.items():
+        prime_codes = [canonical(code) for code in details.get("programs", [])]
+        for code in prime_codes:
+            _add(prime_programs, prime, code)
+        # A prime's sites count for all of its programs
+        for location in details.get("key_locations", []):
+            for code in prime_codes:
+                _add(location_programs, location, code)
+        for code, subcontractors in details.get("subcontractors", {}).items():
+            for subcontractor in subcontractors:
+                _add(subcontractor_primes, subcontractor, prime)
+                _add(subcontractor_programs, subcontractor, canonical(code))
+
+    subcontractors = primes_file.get("subcontractors", {})
+    for subcontractor, details in subcontractors.items():
+        for code in details.get("programs", []):
+            code = canonical(code)
+            _add(subcontractor_programs, subcontractor, code)
+            prime = programs.get(code, {}).get("prime_contractor")
+            if prime:
+                _add(subcontractor_primes, subcontractor, prime)
+
+    return {
+        "format": KNOWLEDGE_BASE_FORMAT,
+        "programs": programs,
+        "program_keywords": keywords,
+        "prime_contractors": prime_contractors,
+        "subcontractors": subcontractors,
+        "clearance_levels": programs_file.get("clearance_levels", {}),
+        "locations": programs_file.get("locations", {}),
+        "clearance_hubs": primes_file.get("clearance_hubs", {}),
+        "term_programs": term_programs,
+        "prime_programs": prime_programs,
+        "location_programs": location_programs,
+        "subcontractor_primes": subcontractor_primes,
+        "subcontractor_programs": subcontractor_programs,
+    }
+
+
+def _stat(path: str) -> Optional[List[int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _file_digest(path: str) -> str:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return ""
+
+
+def _keywords_digest(settings: Dict) -> str:
+    # Only program_keywords feed the knowledge base, so other settings edits do not rebuild it
+    keywords = settings.get("program_mapping", {}).get("program_keywords", {})
+    return hashlib.sha256(json.dumps(keywords, sort_keys=True).encode()).hexdigest()
+
+
+def _source_paths(config_path: str, settings: Dict) -> Dict[str, str]:
+    configured = settings.get("knowledge_base", {})
+    paths = {name: os.path.abspath(resolve_path(configured.get(name, default)))
+             for name, default in DEFAULT_SOURCES.items()}
+    paths["settings"] = os.path.abspath(resolve_path(config_path))
+    return paths
+
+
+def _is_fresh(sources: Dict[str, Dict], paths: Dict[str, str], settings: Dict) -> Optional[bool]:
+    """True if no source changed, False if one did; None if unchanged but re-stamped (mtime only)."""
+    touched = False
+    for name, path in paths.items():
+        recorded = sources.get(name)
+        if recorded is None or recorded["path"] != path:
+            return False
+        signature = _stat(path)
+        if signature == recorded["stat"]:
+            continue
+        # Touched or rewritten: only a content change forces a rebuild
+        digest = _keywords_digest(settings) if name == "settings" else _file_digest(path)
+        if digest != recorded["sha256"]:
+            return False
+        recorded["stat"] = signature
+        touched = True
+    return None if touched else True
+
+
+def _write_artifact(path: str, data: Dict) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def build_knowledge_base(config_path: str = "config/settings.yaml") -> Dict:
+    """Compile the knowledge base from its sources, with their signatures."""
+    settings = load_settings(config_path)
+    paths = _source_paths(config_path, settings)
+    # Stat before reading, so a write racing the build is caught by the next freshness check
+    stats = {name: _stat(path) for name, path in paths.items()}
+    data = compile_sources(_read_json(paths["programs_dictionary"], "programs_dictionary"),
+                           _read_json(paths["primes_lookup"], "primes_lookup"),
+                           settings.get("program_mapping", {}).get("program_keywords", {}))
+    data["sources"] = {
+        name: {
+            "path": path,
+            "stat": stats[name],
+            "sha256": _keywords_digest(settings) if name == "settings" else _file_digest(path),
+        }
+        for name, path in paths.items()
+    }
+    return data
+
+
+def load_knowledge_base(config_path: str = "config/settings.yaml", rebuild: bool = False) -> ProgramKnowledgeBase:
+    """The shared program knowledge base, compiled on first use and cached on disk.
+
+    Every call re-checks the sources' mtimes (hashing only files whose mtime
+    moved), so long-running processes pick up edits; callers get the same
+    object back while nothing changed. Treat it as read-only.
+    """
+    settings = load_settings(config_path)
+    paths = _source_paths(config_path, settings)
+    artifact = os.path.abspath(resolve_path(settings.get("knowledge_base", {}).get("cache_path", DEFAULT_CACHE_PATH)))
+
+    cached = _cache.get(artifact)
+    if cached is not None and not rebuild:
+        fresh = _is_fresh(cached.sources, paths, settings)
+        if fresh is None:
+            _write_artifact(artifact, cached.data)
+        if fresh is not False:
+            return cached
+
+    data = None
+    if not rebuild and os.path.exists(artifact):
+        try:
+            with open(artifact, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable knowledge base {artifact}: {e}")
+        if data is not None:
+            fresh = False if data.get("format") != KNOWLEDGE_BASE_FORMAT else _is_fresh(data["sources"], paths, settings)
+            if fresh is None:
+                _write_artifact(artifact, data)
+            elif fresh is False:
+                data = None
+
+    if data is None:
+        data = build_knowledge_base(config_path)
+        _write_artifact(artifact, data)
+        logger.info(f"Compiled program knowledge base to {artifact}")
+
+    knowledge_base = ProgramKnowledgeBase(data)
+    _cache[artifact] = knowledge_base
+    return knowledge_base
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile the program knowledge base")
+    parser.add_argument("--config", "-c", default="config/settings.yaml", help="Configuration file")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild even if the sources are unchanged")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    knowledge_base = load_knowledge_base(args.config, rebuild=args.rebuild)
+    print(f"Programs: {len(knowledge_base.programs)}")
+    print(f"Terms: {len(knowledge_base.term_programs)}, primes: {len(knowledge_base.prime_programs)}, "
+          f"locations: {len(knowledge_base.location_programs)}, "
+          f"subcontractors: {len(knowledge_base.subcontractor_primes)}")
+    print(f"Version: {knowledge_base.version()[:12]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Settings Loader for PrimeTime BD Intel
+Loads and validates config/settings.yaml for the pipelines and scrapers, once per process.
+"""
+
+import os
+from typing import Dict, List, Tuple
+
+import yaml
+
+DEFAULT_SETTINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.yaml")
+
+NUMBER = (int, float)
+
+# Dotted key -> (expected type, required). Required keys are read without a default.
+SETTINGS_SCHEMA = {
+    "apis.openai.model": (str, True),
+    "apis.openai.max_tokens": (int, True),
+    "apis.openai.temperature": (NUMBER, True),
+    "apis.openai.timeout": (NUMBER, False),
+    "apis.openai.requests_per_minute": (NUMBER, False),
+    "apis.openai.tokens_per_minute": (NUMBER, False),
+    "apis.openai.max_retries": (int, False),
+    "apis.openai.retry_base_delay": (NUMBER, False),
+    "apis.openai.pricing": (dict, False),
+    "job_processing.max_concurrent_jobs": (int, False),
+    "job_processing.checkpoint_fsync_every": (int, False),
+    "program_mapping.keyword_match_threshold": (NUMBER, True),
+    "program_mapping.fuzzy_match_threshold": (NUMBER, False),
+    "program_mapping.exact_match_threshold": (NUMBER, False),
+    "program_mapping.program_keywords": (dict, False),
+    "program_mapping.local_tier": (dict, False),
+    "program_mapping.prefilter": (dict, False),
+    "program_mapping.batching": (dict, False),
+    "program_mapping.llm_cache": (dict, False),
+    "knowledge_base": (dict, False),
+    "entity_resolution.inputs": (list, False),
+    "entity_resolution.match_threshold": (NUMBER, False),
+    "entity_resolution.max_block_size": (int, False),
+    "org_chart.max_org_depth": (int, False),
+    "org_chart.title_patterns": (dict, False),
+    "org_chart.level_order": (list, False),
+    "org_chart.managing_levels": (list, False),
+    "org_chart.generic_word_share": (NUMBER, False),
+    "playbook.max_sections": (int, False),
+    "playbook.max_bullet_points": (int, False),
+    "playbook.output_formats": (list, False),
+    "playbook.max_concurrent": (int, False),
+    "playbook.sections": (dict, False),
+    "scoring.program_weights": (dict, False),
+    "scoring.clearance_scores": (dict, False),
+    "scoring.location_scores": (dict, False),
+    "hiring_trends.windows": (list, False),
+    "hiring_trends.surge_ratio": (NUMBER, False),
+    "hiring_trends.surge_min_jobs": (int, False),
+    "hiring_trends.chronic_weeks": (int, False),
+    "monitoring.mapping_metrics": (dict, False),
+    "scraping.requests_per_minute": (NUMBER, False),
+    "scraping.delay_between_requests": (NUMBER, False),
+    "scraping.max_retries": (int, False),
+    "scraping.retry_delay": (NUMBER, False),
+    "scraping.user_agents": (list, False),
+}
+
+# libyaml's loader is several times faster than the pure-Python one
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Resolved path -> ((mtime, size), settings)
+_cache: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+
+
+def resolve_path(config_path: str) -> str:
+    """Relative paths that do not exist from the working directory resolve against the project root.
+
+    Engines use it for config-relative files (settings, dictionaries, prompts) so scripts run from anywhere.
+    """
+    if not os.path.isabs(config_path) and not os.path.exists(config_path):
+        project_root = os.path.dirname(os.path.dirname(DEFAULT_SETTINGS_PATH))
+        return os.path.join(project_root, config_path)
+    return config_path
+
+
+def validate_settings(settings: Dict, path: str = "settings") -> None:
+    """Raise ValueError listing every missing required key or mistyped value in SETTINGS_SCHEMA."""
+    errors: List[str] = []
+    for key, (expected, required) in SETTINGS_SCHEMA.items():
+        value = settings
+        for part in key.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        if value is None:
+            if required:
+                errors.append(f"{key} is required")
+        elif not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+            names = "/".join(t.__name__ for t in expected) if isinstance(expected, tuple) else expected.__name__
+            errors.append(f"{key} must be {names}, got {type(value).__name__}")
+    if errors:
+        raise ValueError(f"Invalid settings in {path}: " + "; ".join(errors))
+
+
+def load_settings(config_path: str = "config/settings.yaml") -> Dict:
+    """Load and validate the YAML settings file.
+
+    The parsed result is cached per file and reused until the file changes,
+    so every component in a process shares one parse. Treat the returned
+    dict as read-only.
+    """
+    path = os.path.abspath(resolve_path(config_path))
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with open(path, "r", encoding="utf-8") as f:
+        settings = yaml.load(f, Loader=_Loader) or {}
+    validate_settings(settings, path)
+    _cache[path] = (signature, settings)
+    return settings
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Shared File Helpers
+Input expansion, JSON/JSONL record loading and atomic JSON writes shared by the pipeline engines.
+"""
+
+import glob
+import json
+import os
+from typing import Any, List
+
+
+def expand_inputs(paths: List[str]) -> List[str]:
+    """Files as given; directories and globs expand to the CSV files in them."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.csv"))))
+        elif any(ch in path for ch in "*?["):
+            files.extend(sorted(glob.glob(path)))
+        else:
+            files.append(path)
+    return files
+
+
+def load_records(path: str) -> Any:
+    """Records from a JSONL file, or the value of a JSON file (usually an array of records).
+
+    .jsonl files are always read line by line; other files are read as JSONL
+    only when they do not parse as a single JSON value.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if not path.endswith(".jsonl"):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def write_json(path: str, data) -> None:
+    """Write data as JSON through a temporary file, so readers never see a partial file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        # dumps() encodes in C in one pass; dump() streams through the pure-Python encoder
+        f.write(json.dumps(data, ensure_ascii=False))
+    os.replace(temp_path, path)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Name Matching Helpers
+Normalizers, blocking keys (email, LinkedIn slug, Soundex) and Jaro-Winkler similarity for
+contact entity resolution.
+"""
+
+import re
+from functools import lru_cache
+from typing import Tuple
+
+EMPTY_VALUES = {"", "unknown", "n/a", "na", "none", "null", "-", "tbd"}
+SALUTATIONS = {"mr", "mrs", "ms", "miss", "dr", "prof", "capt", "col", "maj", "lt", "sgt"}
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "phd", "pe", "pmp", "cissp", "mba"}
+
+LINKEDIN_SLUG_RE = re.compile(r"linkedin\.com/(?:in|pub)/([^/?#\s]+)", re.IGNORECASE)
+EMAIL_RE = re.compile(r"[^\s;,/<>]+@[^\s;,/<>]+\.[a-z]{2,}", re.IGNORECASE)
+NAME_WORD_RE = re.compile(r"[^\W\d_]+(?:['-][^\W\d_]+)*")
+
+SOUNDEX_CODES = {c: str(d) for d, letters in enumerate(
+    ("aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r")) for c in letters}
+
+
+def clean(value) -> str:
+    """Stripped value, or "" for blanks and placeholders like "unknown"."""
+    value = str(value or "").strip()
+    return "" if value.lower() in EMPTY_VALUES else value
+
+
+def normalize_email(value: str) -> str:
+    """First email address in a field, lowercased ("" if none)."""
+    match = EMAIL_RE.search(value or "")
+    return match.group().lower().rstrip(".") if match else ""
+
+
+def linkedin_slug(value: str) -> str:
+    """Profile slug of a LinkedIn URL, lowercased ("" if none)."""
+    match = LINKEDIN_SLUG_RE.search(value or "")
+    return match.group(1).lower().rstrip("/") if match else ""
+
+
+def normalize_place(value: str) -> str:
+    """Lookup key for a city: lowercased letters and single spaces."""
+    return " ".join(re.findall(r"[a-z]+", (value or "").lower()))
+
+
+def parse_name(full_name: str) -> Tuple[str, str]:
+    """(first, last) from "First M. Last", "Last, First" or "Dr. First Last Jr.", lowercased."""
+    full_name = full_name or ""
+    if "," in full_name:
+        last, _, first = full_name.partition(",")
+        if not all(w.lower().strip(".") in SUFFIXES for w in first.split()):
+            full_name = f"{first} {last}"
+    words = [w for w in NAME_WORD_RE.findall(full_name.lower()) if w not in SALUTATIONS]
+    while len(words) > 1 and words[-1] in SUFFIXES:
+        words.pop()
+    if not words:
+        return "", ""
+    if len(words) == 1:
+        return "", words[0]
+    return words[0], words[-1]
+
+
+def soundex(word: str) -> str:
+    """American Soundex code, e.g. "Robert" and "Rupert" -> "R163"."""
+    letters = [c for c in (word or "").lower() if c in SOUNDEX_CODES]
+    if not letters:
+        return ""
+    code = letters[0].upper()
+    previous = SOUNDEX_CODES[letters[0]]
+    for c in letters[1:]:
+        digit = SOUNDEX_CODES[c]
+        if digit != "0" and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w do not separate letters with the same code; vowels do
+        if c not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+@lru_cache(maxsize=1 << 18)
+def jaro_winkler(a: str, b: str, prefix_scale: float = 0.1) -> float:
+    """Jaro-Winkler similarity in [0, 1], memoized since blocks repeat the same names."""
+    if a == b:
+        return 1.0 if a else 0.0
+    len_a, len_b = len(a), len(b)
+    if not len_a or not len_b:
+        return 0.0
+    window = max(0, max(len_a, len_b) // 2 - 1)
+    matched_b = [False] * len_b
+    matches_a = []
+    for i, c in enumerate(a):
+        for j in range(max(0, i - window), min(len_b, i + window + 1)):
+            if not matched_b[j] and b[j] == c:
+                matched_b[j] = True
+                matches_a.append(c)
+                break
+    if not matches_a:
+        return 0.0
+    matches_b = [b[j] for j in range(len_b) if matched_b[j]]
+    transpositions = sum(x != y for x, y in zip(matches_a, matches_b)) / 2
+    m = len(matches_a)
+    jaro = (m / len_a + m / len_b + (m - transpositions) / m) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+def first_name_similarity(a: str, b: str) -> float:
+    """Jaro-Winkler, treating an initial as matching any name with that letter."""
+    if not a or not b:
+        return 0.0
+    if (len(a) == 1 or len(b) == 1) and a[0] == b[0]:
+        return 0.9
+    return jaro_winkler(a, b)
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Contact Entity Resolution for PrimeTime BD Intel
+Merges the same person across ZoomInfo exports, people_targets.csv, the GBSD delta sheet and
+team rollups. Records are grouped into blocks by normalized email, LinkedIn slug, ZoomInfo ID
+and last-name Soundex + city, and fuzzy name matching runs only within a block, so the work
+grows with block sizes instead of quadratically with the input.
+
+Usage:
+    python resolve_contacts.py -i docs/ -o data/contacts/contacts_resolved.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.settings import load_settings
+from pipelines.common.files import expand_inputs
+from pipelines.entity_resolution.name_matching import (clean, first_name_similarity, jaro_winkler, linkedin_slug,
+                                                      normalize_email, normalize_place, parse_name, soundex)
+
+logger = logging.getLogger(__name__)
+
+# Canonical field -> header aliases, compared lowercased with non-alphanumerics removed.
+# Earlier aliases win when a file has several (Direct Phone Number over Mobile phone).
+FIELD_ALIASES = {
+    "name": ["full_name", "Full Name", "Name"],
+    "first_name": ["First Name"],
+    "last_name": ["Last Name"],
+    "title": ["Job Title", "Title", "role", "current_title"],
+    "company": ["Company Name", "company"],
+    "department": ["Company Division Name", "Department", "Team / IPT", "org_unit", "org_unit_alignment"],
+    "city": ["Person City"],
+    "state": ["Person State"],
+    "location": ["site_location", "Org Unit / Location", "Location", "geography"],
+    "email": ["Email Address", "email", "Email(s)"],
+    "phone": ["Direct Phone Number", "Mobile phone", "phone", "Phone Number(s)"],
+    "linkedin": ["LinkedIn Contact Profile URL", "linkedin_url", "LinkedIn URL"],
+    "program": ["program"],
+    "zoominfo_id": ["ZoomInfo Contact ID"],
+    "zoominfo_url": ["ZoomInfo Contact Profile URL"],
+    # Rollup sheets list a team's members in one cell
+    "member_names": ["ContactNames", "Known Team Members"],
+}
+OUTPUT_FIELDS = ["name", "first_name", "last_name", "title", "company", "department", "city", "state",
+                 "email", "phone", "linkedin", "program"]
+ZOOMINFO_ID_RE = re.compile(r"/person/(\d+)")
+
+
+def _header_key(header: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", (header or "").lower())
+
+
+ALIAS_FIELDS = {_header_key(alias): field for field, aliases in FIELD_ALIASES.items() for alias in aliases}
+ALIAS_RANK = {_header_key(alias): rank for aliases in FIELD_ALIASES.values() for rank, alias in enumerate(aliases)}
+
+
+class Contact:
+    """One source row (or one rollup member), normalized for blocking and matching."""
+
+    __slots__ = ("source", "fields", "first", "last", "city", "email", "slug", "zoominfo_id")
+
+    def __init__(self, source: str, fields: Dict[str, str]):
+        self.source = source
+        self.fields = fields
+        if fields.get("first_name") or fields.get("last_name"):
+            self.first, self.last = parse_name(f"{fields.get('first_name', '')} {fields.get('last_name', '')}")
+        else:
+            self.first, self.last = parse_name(fields.get("name", ""))
+        self.city = normalize_place(fields.get("city", ""))
+        self.email = normalize_email(fields.get("email", ""))
+        self.slug = linkedin_slug(fields.get("linkedin", ""))
+        self.zoominfo_id = fields.get("zoominfo_id", "")
+
+
+def _column_map(header: List[str]) -> Dict[str, int]:
+    """Canonical field -> column index, preferring the earliest alias of each field."""
+    columns: Dict[str, Tuple[int, int]] = {}
+    for index, name in enumerate(header):
+        key = _header_key(name)
+        field = ALIAS_FIELDS.get(key)
+        if field and (field not in columns or ALIAS_RANK[key] < columns[field][0]):
+            columns[field] = (ALIAS_RANK[key], index)
+    return {field: index for field, (_, index) in columns.items()}
+
+
+def iter_source(path: str) -> Iterator[Contact]:
+    """Stream one CSV as Contacts, whatever its column layout."""
+    label = os.path.basename(path)
+    with open(path, "r", newline="", encoding="utf-8-sig", errors="replace") as f:
+        reader = csv.reader(f)
+        header = next((row for row in reader if any(cell.strip() for cell in row)), None)
+        if header is None:
+            return
+        columns = _column_map(header)
+        location = columns.get("location")
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            line = reader.line_num
+            if len(row) > len(header) and location is not None:
+                # An unquoted "City, State" in the location column spills into the next cells
+                extra = len(row) - len(header)
+                row = row[:location] + [", ".join(row[location:location + extra + 1])] + row[location + extra + 1:]
+            fields = {field: clean(row[index]) for field, index in columns.items() if index < len(row)}
+            if not fields.get("zoominfo_id") and fields.get("zoominfo_url"):
+                match = ZOOMINFO_ID_RE.search(fields["zoominfo_url"])
+                fields["zoominfo_id"] = match.group(1) if match else ""
+            fields.pop("zoominfo_url", None)
+            if fields.get("location") and not fields.get("city"):
+                city, _, state = fields["location"].partition(",")
+                fields["city"] = city.strip()
+                fields.setdefault("state", state.strip())
+            fields.pop("location", None)
+
+            members = fields.pop("member_names", "")
+            if members and not (fields.get("name") or fields.get("last_name")):
+                for member in members.split(";"):
+                    member = clean(member)
+                    if member:
+                        yield Contact(f"{label}:{line}", dict(fields, name=member))
+            elif fields.get("name") or fields.get("last_name") or fields.get("email") or fields.get("linkedin"):
+                yield Contact(f"{label}:{line}", fields)
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent: List[int] = []
+
+    def add(self) -> int:
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    def union(self, a: int, b: int) -> bool:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        # The lower index (earlier, higher-priority source) stays the root
+        if root_b < root_a:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        return True
+
+
+class ContactResolver:
+    """Blocked entity resolution over contacts added in source-priority order.
+
+    Exact keys (email, LinkedIn slug, ZoomInfo ID) merge every record in their
+    block whose last name is compatible with the block's first record. Records
+    sharing last-name Soundex and city are compared pairwise on first and last
+    name, with company as a tie-breaker, and merged at or above
+    match_threshold. Blocks larger than max_block_size are sorted by name and
+    each record is compared only with the next max_block_size - 1, keeping the
+    worst case bounded without leaving common surnames unmatched.
+    """
+
+    EXACT_KEYS = ("email", "slug", "zoominfo_id")
+
+    def __init__(self, match_threshold: float = 0.9, max_block_size: int = 500):
+        self.match_threshold = match_threshold
+        self.max_block_size = max_block_size
+        self.contacts: List[Contact] = []
+        self.sets = UnionFind()
+        self.exact_blocks: Dict[Tuple[str, str], int] = {}
+        self.name_blocks: Dict[str, List[int]] = {}
+        # Root -> reasons its members were merged
+        self.reasons: Dict[int, Dict[str, int]] = {}
+        self.stats = {"records": 0, "comparisons": 0, "fuzzy_merges": 0, "exact_merges": 0, "windowed_blocks": 0,
+                      "key_conflicts": 0}
+
+    def add(self, contacts: Iterable[Contact]) -> None:
+        """Index contacts; exact-key merges happen here, as each record arrives."""
+        for contact in contacts:
+            index = self.sets.add()
+            self.contacts.append(contact)
+            self.stats["records"] += 1
+            for key in self.EXACT_KEYS:
+                value = getattr(contact, key)
+                if not value:
+                    continue
+                first = self.exact_blocks.setdefault((key, value), index)
+                if first == index:
+                    continue
+                if self.names_compatible(self.contacts[first], contact):
+                    self._merge(first, index, key)
+                else:
+                    # Exports occasionally attach someone else's profile URL or address
+                    self.stats["key_conflicts"] += 1
+                    logger.debug(f"Not merging {contact.source} into {self.contacts[first].source}: "
+                                 f"same {key} {value!r} but different names")
+            if contact.last and contact.city:
+                self.name_blocks.setdefault(f"{soundex(contact.last)}|{contact.city}", []).append(index)
+
+    def _merge(self, a: int, b: int, reason: str) -> None:
+        root_a, root_b = self.sets.find(a), self.sets.find(b)
+        if root_a == root_b:
+            return
+        self.sets.union(a, b)
+        root = self.sets.find(a)
+        reasons = self.reasons.pop(root_a, {})
+        for name, count in self.reasons.pop(root_b, {}).items():
+            reasons[name] = reasons.get(name, 0) + count
+        reasons[reason] = reasons.get(reason, 0) + 1
+        self.reasons[root] = reasons
+        self.stats["fuzzy_merges" if reason == "name_city" else "exact_merges"] += 1
+
+    @staticmethod
+    def names_compatible(a: Contact, b: Contact) -> bool:
+        """False only when both records have names and the last names clearly differ (allowing swaps)."""
+        if not a.last or not b.last:
+            return True
+        return jaro_winkler(a.last, b.last) >= 0.8 or (a.first == b.last and a.last == b.first)
+
+    def score(self, a: Contact, b: Contact) -> float:
+        """Name similarity of two records in the same block, 0.0 on a hard conflict."""
+        if a.slug and b.slug and a.slug != b.slug:
+            return 0.0
+        # Different addresses at the same domain are different people
+        if a.email and b.email and a.email != b.email and a.email.split("@")[1] == b.email.split("@")[1]:
+            return 0.0
+        score = 0.6 * first_name_similarity(a.first, b.first) + 0.4 * jaro_winkler(a.last, b.last)
+        company_a = a.fields.get("company", "").lower()
+        company_b = b.fields.get("company", "").lower()
+        if company_a and company_b:
+            score += 0.05 if company_a == company_b else -0.1
+        return score
+
+    def resolve(self) -> None:
+        """Fuzzy-match within each last-name/city block (a sorted window for oversized ones)."""
+        for key, members in self.name_blocks.items():
+            if len(members) < 2:
+                continue
+            window = len(members)
+            if len(members) > self.max_block_size:
+                self.stats["windowed_blocks"] += 1
+                logger.info(f"Oversized block {key} ({len(members)} records): comparing within a "
+                            f"{self.max_block_size}-record window sorted by name")
+                # Sorted neighbourhood: spellings of the same name land next to each other
+                contacts = self.contacts
+                members = sorted(members, key=lambda i: (contacts[i].first, contacts[i].last, i))
+                window = self.max_block_size
+            find = self.sets.find
+            for position, a in enumerate(members):
+                contact = self.contacts[a]
+                root = find(a)
+                for b in members[position + 1:position + window]:
+                    if find(b) == root:
+                        continue
+                    self.stats["comparisons"] += 1
+                    if self.score(contact, self.contacts[b]) >= self.match_threshold:
+                        self._merge(a, b, "name_city")
+                        root = find(a)
+
+    def clusters(self) -> Dict[int, List[int]]:
+        """Root -> member indices, both in source-priority order."""
+        clusters: Dict[int, List[int]] = {}
+        for index in range(len(self.contacts)):
+            clusters.setdefault(self.sets.find(index), []).append(index)
+        return clusters
+
+    def merged_rows(self) -> Iterator[Dict]:
+        """One row per person: first non-empty value per field in source order, plus provenance."""
+        for root, members in self.clusters().items():
+            records = [self.contacts[i] for i in members]
+            row = {}
+            for field in OUTPUT_FIELDS:
+                row[field] = next((r.fields[field] for r in records if r.fields.get(field)), "")
+            # The most complete name variant ("Jonathan A. Smith" over "J. Smith")
+            named = max(records, key=lambda r: (len(r.first) > 1, len(r.first) + len(r.last)))
+            row["name"] = (named.fields.get("name") or
+                           f"{named.fields.get('first_name', '')} {named.fields.get('last_name', '')}".strip())
+            row["first_name"] = row["first_name"] or named.first.title()
+            row["last_name"] = row["last_name"] or named.last.title()
+            primary = next((f"{key}:{getattr(r, key)}" for key in self.EXACT_KEYS for r in records
+                            if getattr(r, key)), f"name:{named.first} {named.last}|{records[0].city}|{records[0].source}")
+            row["resolved_id"] = hashlib.md5(primary.encode("utf-8")).hexdigest()[:12]
+            row["record_count"] = len(records)
+            row["sources"] = "; ".join(r.source for r in records)
+            row["match_keys"] = "; ".join(f"{reason}={count}" for reason, count
+                                          in sorted(self.reasons.get(root, {}).items()))
+            yield row
+
+
+def write_rows(rows: Iterable[Dict], output_file: str) -> int:
+    """Write merged rows as CSV, or JSON Lines for a .jsonl output; returns the count."""
+    directory = os.path.dirname(output_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    count = 0
+    columns = ["resolved_id"] + OUTPUT_FIELDS + ["record_count", "sources", "match_keys"]
+    with open(output_file, "w", newline="", encoding="utf-8") as f:
+        writer = None if output_file.endswith(".jsonl") else csv.DictWriter(f, fieldnames=columns)
+        if writer is not None:
+            writer.writeheader()
+        for row in rows:
+            if writer is not None:
+                writer.writerow(row)
+            else:
+                f.write(json.dumps({c: row[c] for c in columns}, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Merge and deduplicate contacts across people datasets")
+    parser.add_argument("--input", "-i", action="append",
+                        help="CSV, directory or glob, highest priority first (default: entity_resolution.inputs)")
+    parser.add_argument("--output", "-o", help="Merged contacts .csv or .jsonl (default: entity_resolution.output_path)")
+    parser.add_argument("--config", "-c", default="config/settings.yaml", help="Configuration file")
+    args = parser.parse_args()
+
+    settings = load_settings(args.config).get("entity_resolution", {})
+    inputs = expand_inputs(args.input or settings.get("inputs", []))
+    output_file = args.output or settings.get("output_path", "data/contacts/contacts_resolved.csv")
+    if not inputs:
+        parser.error("no inputs given")
+
+    resolver = ContactResolver(settings.get("match_threshold", 0.9), settings.get("max_block_size", 500))
+    for path in inputs:
+        before = resolver.stats["records"]
+        resolver.add(iter_source(path))
+        logger.info(f"{path}: {resolver.stats['records'] - before} records")
+    resolver.resolve()
+    count = write_rows(resolver.merged_rows(), output_file)
+
+    stats = resolver.stats
+    logger.info(f"{stats['records']} records -> {count} contacts ({stats['exact_merges']} exact-key merges, "
+                f"{stats['fuzzy_merges']} fuzzy merges from {stats['comparisons']} comparisons in "
+                f"{len(resolver.name_blocks)} name blocks, {stats['windowed_blocks']} oversized blocks windowed, "
+                f"{stats['key_conflicts']} shared keys with conflicting names left unmerged)")
+    logger.info(f"Merged contacts saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Batched Mapping Prompts
+Renders several jobs into one mapping prompt with a JSON-array response schema keyed by
+job_id, and validates and splits the model's reply.
+"""
+
+import json
+import re
+from typing import Dict, List
+
+JSON_ARRAY_RE = re.compile(r"\[.*\]", re.DOTALL)
+
+BATCH_PROMPT_HEADER = """Analyze each job posting below and map it to relevant defense programs.
+
+Candidate Programs:
+{programs_info}
+
+Jobs:
+"""
+
+BATCH_PROMPT_FOOTER = """
+For every job, choose programs only from that job's candidates and provide the program codes,
+a confidence score (0.0-1.0), the reasoning and the keywords that support the mapping.
+
+Respond with a JSON array containing exactly one object per job, keyed by its job_id:
+[
+    {{
+        "job_id": "{example_id}",
+        "mapped_programs": ["PROGRAM1", "PROGRAM2"],
+        "confidence_score": 0.85,
+        "reasoning": "Explanation here",
+        "keywords_found": ["keyword1", "keyword2"]
+    }}
+]
+"""
+
+
+def render_job(job_id: str, job_data: Dict, program_codes: List[str], description: str) -> str:
+    """One job's section of a batched prompt."""
+    return (
+        f"\n### job_id: {job_id}\n"
+        f"- Title: {job_data.get('title', 'N/A')}\n"
+        f"- Company: {job_data.get('company', 'N/A')}\n"
+        f"- Location: {job_data.get('location', 'N/A')}\n"
+        f"- Clearance: {job_data.get('clearance_level', 'N/A')}\n"
+        f"- Description: {description}\n"
+        f"- Candidates: {', '.join(program_codes)}\n"
+    )
+
+
+def create_batch_prompt(program_lines: List[str], job_sections: List[str], example_id: str) -> str:
+    return (
+        BATCH_PROMPT_HEADER.format(programs_info="\n".join(program_lines))
+        + "".join(job_sections)
+        + BATCH_PROMPT_FOOTER.format(example_id=example_id)
+    )
+
+
+def is_valid_mapping(item: Dict) -> bool:
+    """True if a reply object has the fields a mapping result needs, with sane types."""
+    programs = item.get("mapped_programs")
+    score = item.get("confidence_score")
+    return (
+        isinstance(programs, list)
+        and all(isinstance(code, str) for code in programs)
+        and isinstance(score, (int, float)) and not isinstance(score, bool)
+        and 0.0 <= score <= 1.0
+    )
+
+
+def parse_batch_response(ai_response: str) -> Dict[str, Dict]:
+    """Valid mapping objects from a batched reply, keyed by job_id.
+
+    Missing, duplicated or malformed entries are left out so the caller can
+    retry just those jobs.
+    """
+    match = JSON_ARRAY_RE.search(ai_response or "")
+    if not match:
+        return {}
+    try:
+        items = json.loads(match.group())
+    except json.JSONDecodeError:
+        return {}
+
+    parsed: Dict[str, Dict] = {}
+    duplicates = set()
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict) or not is_valid_mapping(item):
+            continue
+        job_id = str(item.get("job_id"))
+        if job_id in parsed:
+            duplicates.add(job_id)
+        parsed[job_id] = item
+    for job_id in duplicates:
+        del parsed[job_id]
+    return parsed
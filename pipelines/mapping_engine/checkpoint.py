@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Mapping Checkpoints
+Append-only JSONL checkpoints with periodic fsync, resume by job ID, job-ID-hash sharding and
+progress reporting with an ETA for long mapping runs.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def shard_of(job_data: Dict, shard_count: int) -> int:
+    """Stable shard index for a job from a hash of its job ID (its content when it has none)."""
+    job_id = job_data.get("job_id")
+    key = str(job_id) if job_id is not None else json.dumps(job_data, sort_keys=True)
+    return int(hashlib.md5(key.encode("utf-8")).hexdigest(), 16) % shard_count
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse "INDEX/COUNT" (e.g. "0/4") into (index, count)."""
+    index, _, count = value.partition("/")
+    index, count = int(index), int(count)
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {value!r}; expected INDEX/COUNT with 0 <= INDEX < COUNT")
+    return index, count
+
+
+class MappingCheckpoint:
+    """Append-only JSONL file of mapping results that doubles as the resume state."""
+
+    def __init__(self, path: str, resume: bool = False, fsync_every: int = 50):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self.completed: Set[str] = set()
+        self.unsynced = 0
+
+        if resume and os.path.exists(path):
+            self._load()
+            self.file = open(path, "a", encoding="utf-8")
+        else:
+            self.file = open(path, "w", encoding="utf-8")
+
+    def _load(self) -> None:
+        """Collect completed job IDs, dropping a torn final line left by a crash."""
+        valid_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                valid_bytes += len(line)
+                if result.get("job_id") is not None:
+                    self.completed.add(str(result["job_id"]))
+        if valid_bytes < os.path.getsize(self.path):
+            logger.warning(f"Truncating incomplete record at the end of {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+    def is_done(self, job_data: Dict) -> bool:
+        job_id = job_data.get("job_id")
+        return job_id is not None and str(job_id) in self.completed
+
+    def write(self, result: Dict) -> None:
+        """Append one result; flushed immediately and fsynced every fsync_every records."""
+        self.file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.file.flush()
+        if result.get("job_id") is not None:
+            self.completed.add(str(result["job_id"]))
+        self.unsynced += 1
+        if self.unsynced >= self.fsync_every:
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+
+    def close(self) -> None:
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def seed_from_output(output_file: str, checkpoint_path: str) -> int:
+    """Start a checkpoint from a previous run's JSON array or JSONL output; returns the count."""
+    if output_file.endswith(".jsonl"):
+        with open(output_file, "r", encoding="utf-8") as f:
+            results = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(output_file, "r") as f:
+            results = json.load(f)
+    with open(checkpoint_path, "w", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return len(results)
+
+
+def _ordered_results(checkpoint_path: str, jobs: List[Dict]) -> List[Dict]:
+    """The checkpoint's results in input order, whatever order they completed in."""
+    positions = {}
+    for position, job in enumerate(jobs):
+        positions.setdefault(str(job.get("job_id")), position)
+    results = []
+    with open(checkpoint_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                results.append(json.loads(line))
+    # Stable sort, so results sharing a position (no job ID) keep their completion order
+    results.sort(key=lambda r: positions.get(str(r.get("job_id")), len(jobs)))
+    return results
+
+
+def write_output(checkpoint_path: str, output_file: str, jobs: List[Dict]) -> int:
+    """Write the checkpoint's results in input order, as JSONL for .jsonl outputs and a
+    JSON array otherwise; returns the count."""
+    results = _ordered_results(checkpoint_path, jobs)
+    with open(output_file, "w", encoding="utf-8") as f:
+        if output_file.endswith(".jsonl"):
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        else:
+            json.dump(results, f, indent=2)
+    return len(results)
+
+
+class ProgressReporter:
+    """Logs completed/total with throughput and ETA every `every` jobs."""
+
+    def __init__(self, total: int, every: int = 10):
+        self.total = total
+        self.every = every
+        self.done = 0
+        self.started = time.monotonic()
+
+    def update(self, count: int = 1) -> None:
+        before = self.done
+        self.done += count
+        if self.done // self.every > before // self.every or (self.done == self.total and count):
+            logger.info(self.status())
+
+    def status(self) -> str:
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        remaining = (self.total - self.done) / rate if rate else None
+        eta = time.strftime("%H:%M:%S", time.gmtime(remaining)) if remaining is not None else "unknown"
+        return f"Processed {self.done}/{self.total} jobs ({rate:.1f} jobs/s, ETA {eta})"
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache
+Persistent SQLite cache of completion text keyed by a hash of the full request and the
+programs dictionary version, with TTL and size eviction.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Optional
+
+
+class LLMResponseCache:
+    """SQLite-backed cache of LLM completions for one programs-dictionary version.
+
+    Rows written under any other dictionary version are purged on open, so
+    editing config/programs_dictionary.json invalidates every cached mapping.
+    """
+
+    def __init__(self, path: str = "data/llm_cache.sqlite", version: str = "",
+                 max_entries: int = 100000, ttl_days: float = 30):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.version = version
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else 0
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.conn.execute("DELETE FROM responses WHERE version != ?", (version,))
+        self.evict()
+
+    @staticmethod
+    def key(request: Dict, version: str) -> str:
+        """Hash of the model, sampling parameters, messages and dictionary version."""
+        canonical = json.dumps(
+            {
+                "model": request.get("model"),
+                "temperature": request.get("temperature"),
+                "max_tokens": request.get("max_tokens"),
+                "messages": request.get("messages"),
+                "version": version,
+            },
+            sort_keys=True, ensure_ascii=False, separators=(",", ":")
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached completion text for `key`, or None on a miss or expired entry."""
+        row = self.conn.execute(
+            "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or (self.ttl_seconds and now - row[1] > self.ttl_seconds):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        """Store a completion; committed immediately so a crash keeps finished work."""
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (key, version, response, created_at, last_used) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, self.version, response, now, now)
+        )
+        self.conn.commit()
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones beyond max_entries."""
+        removed = 0
+        if self.ttl_seconds:
+            removed += self.conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+        if self.max_entries:
+            removed += self.conn.execute(
+                """DELETE FROM responses WHERE key IN (
+                       SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                   )""",
+                (self.max_entries,)
+            ).rowcount
+        self.conn.commit()
+        return removed
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0],
+        }
+
+    def close(self) -> None:
+        self.evict()
+        self.conn.close()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Local Program Classifier
+TF-IDF program profiles built from programs_dictionary.json, scored against job postings by
+NumPy cosine similarity. Confident matches and clear non-matches are decided locally; only
+jobs with a program in the uncertain band are escalated to the LLM.
+
+Usage:
+    python local_classifier.py --jobs data/jobs_normalized.json --labels data/job_mappings.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from config.knowledge_base import load_knowledge_base
+from config.settings import load_settings
+from pipelines.common.files import load_records
+from pipelines.mapping_engine.program_index import ProgramIndex, TITLE_MULTIPLIER
+
+
+class LocalProgramClassifier:
+    """Cosine similarity between TF-IDF job vectors and per-program profiles.
+
+    Features are the program terms found by the ProgramIndex automaton: one
+    `id:<code>` feature per program for any of its names, acronyms or code
+    names, and one `kw:<term>` feature per skill/keyword, shared by every
+    program that lists it so IDF discounts generic terms like "stealth".
+    Each program is compared with the job vector restricted to that program's
+    own features, so a posting naming two programs matches both fully. A
+    program's confidence is that cosine divided by the cosine of a job that
+    names the program and nothing else, capped at 1.0.
+    """
+
+    def __init__(self, program_index: ProgramIndex, identity_boost: float = 2.0):
+        self.index = program_index
+        self.codes = list(program_index.primes)
+        self.features: Dict[str, int] = {}
+        program_features: List[List[str]] = []
+        for code in self.codes:
+            names = [f"id:{code}"]
+            names.extend(sorted({f"kw:{term}" for (c, term) in program_index.weights
+                                 if c == code and not program_index.is_identity(c, term)}))
+            program_features.append(names)
+            for name in names:
+                self.features.setdefault(name, len(self.features))
+
+        document_frequency = np.zeros(len(self.features))
+        for names in program_features:
+            document_frequency[[self.features[n] for n in names]] += 1
+        self.idf = np.log((1 + len(self.codes)) / (1 + document_frequency)) + 1
+
+        self.profiles = np.zeros((len(self.codes), len(self.features)))
+        for row, names in enumerate(program_features):
+            columns = [self.features[n] for n in names]
+            self.profiles[row, columns] = self.idf[columns]
+            self.profiles[row, columns[0]] *= identity_boost
+        self.profiles /= np.linalg.norm(self.profiles, axis=1, keepdims=True)
+        self.masks = (self.profiles > 0).astype(float)
+        # Cosine of a job vector that only names the program (a unit vector on its id feature)
+        self.reference = np.array([self.profiles[row, self.features[f"id:{code}"]]
+                                   for row, code in enumerate(self.codes)])
+
+    def vectorize(self, job_data: Dict) -> Tuple[np.ndarray, List[str]]:
+        """TF-IDF vector of a job (sublinear TF) and the program terms found in it."""
+        tf = np.zeros(len(self.features))
+        terms = set()
+        for text, multiplier in ((job_data.get("title") or "", TITLE_MULTIPLIER),
+                                 (job_data.get("description") or "", 1.0)):
+            for (code, term), count in self.index.automaton.count(text).items():
+                terms.add(term)
+                if self.index.is_identity(code, term):
+                    tf[self.features[f"id:{code}"]] += count * multiplier
+                else:
+                    # Shared terms are reported once per program; count them once
+                    column = self.features[f"kw:{term}"]
+                    tf[column] = max(tf[column], count * multiplier)
+        return np.where(tf > 0, 1 + np.log(np.maximum(tf, 1)), 0.0) * self.idf, sorted(terms)
+
+    def confidences(self, job_data: Dict) -> Tuple[Dict[str, float], List[str]]:
+        """Per-program confidence in [0, 1] (programs with no evidence omitted) and the terms found."""
+        vector, terms = self.vectorize(job_data)
+        if not terms:
+            return {}, terms
+        # Norm of the job vector restricted to each program's features
+        norms = np.sqrt(self.masks @ (vector * vector))
+        cosines = np.divide(self.profiles @ vector, norms, out=np.zeros(len(self.codes)), where=norms > 0)
+        scores = np.minimum(1.0, cosines / self.reference)
+        return {code: float(score) for code, score in zip(self.codes, scores) if score > 0}, terms
+
+    def classify(self, job_data: Dict, lower: float, upper: float) -> Dict:
+        """Programs accepted (>= upper) and uncertain (lower <= confidence < upper) for a job."""
+        confidences, terms = self.confidences(job_data)
+        return {
+            "mapped": [code for code, score in confidences.items() if score >= upper],
+            "uncertain": [code for code, score in confidences.items() if lower <= score < upper],
+            "confidences": confidences,
+            "terms": terms,
+        }
+
+
+def evaluate(classifier: LocalProgramClassifier, jobs: List[Dict], labels: Dict[str, List[str]],
+             lower: float, upper: float) -> Dict:
+    """Escalation rate and agreement with LLM labels over the labeled jobs."""
+    labeled = escalated = local = agreed = forced_agreed = 0
+    midpoint = (lower + upper) / 2
+    for job in jobs:
+        label = labels.get(str(job.get("job_id")))
+        if label is None:
+            continue
+        labeled += 1
+        decision = classifier.classify(job, lower, upper)
+        # What the local tier would have said had it been forced to decide every job
+        forced = {code for code, score in decision["confidences"].items() if score >= midpoint}
+        forced_agreed += forced == set(label)
+        if decision["uncertain"]:
+            escalated += 1
+            continue
+        local += 1
+        agreed += set(decision["mapped"]) == set(label)
+    return {
+        "labeled_jobs": labeled,
+        "escalated": escalated,
+        "escalation_rate": escalated / labeled if labeled else 0.0,
+        "decided_locally": local,
+        "local_agreement": agreed / local if local else 0.0,
+        "forced_agreement": forced_agreed / labeled if labeled else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the local mapping tier against LLM labels")
+    parser.add_argument("--jobs", "-j", required=True, help="Jobs JSON file")
+    parser.add_argument("--labels", "-l", required=True,
+                        help="Mapping output from an LLM run; only ai_analysis results are used as labels")
+    parser.add_argument("--config", "-c", default="config/settings.yaml", help="Configuration file")
+
+    args = parser.parse_args()
+
+    settings = load_settings(args.config)
+    mapping_settings = settings.get("program_mapping", {})
+    knowledge_base = load_knowledge_base(args.config)
+    with open(args.jobs, "r") as f:
+        jobs = json.load(f)
+    labels = {str(r.get("job_id")): r.get("mapped_programs", []) for r in load_records(args.labels)
+              if r.get("source") == "ai_analysis"}
+
+    classifier = LocalProgramClassifier(
+        ProgramIndex(knowledge_base.programs, knowledge_base.program_keywords),
+        identity_boost=mapping_settings.get("local_tier", {}).get("identity_boost", 2.0)
+    )
+    lower = mapping_settings.get("fuzzy_match_threshold", 0.8)
+    upper = mapping_settings.get("exact_match_threshold", 0.95)
+    report = evaluate(classifier, jobs, labels, lower, upper)
+
+    print(f"Uncertain band: [{lower}, {upper})")
+    print(f"Labeled jobs:      {report['labeled_jobs']}")
+    print(f"Escalated to LLM:  {report['escalated']} ({report['escalation_rate']:.1%})")
+    print(f"Decided locally:   {report['decided_locally']} "
+          f"(agree with LLM on {report['local_agreement']:.1%})")
+    print(f"Forced agreement:  {report['forced_agreement']:.1%} (all jobs decided locally at the band midpoint)")
+
+
+if __name__ == "__main__":
+    main()
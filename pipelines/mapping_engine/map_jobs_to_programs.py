@@ -6,71 +6,177 @@ Uses AI analysis to map job postings to specific defense programs.
 Provides confidence scoring and reasoning for each mapping.
 """
 
+import time
+
+# Taken before the remaining imports so the reported startup time includes them
+_STARTED = time.perf_counter()
+
 import json
 import logging
 import os
+import random
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-import openai
+from typing import Callable, Dict, List, Optional, Tuple
 import yaml
 from datetime import datetime
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from config.knowledge_base import load_knowledge_base
 from config.settings import load_settings
+from pipelines.mapping_engine.batch_prompts import create_batch_prompt, parse_batch_response, render_job
+from pipelines.mapping_engine.checkpoint import (MappingCheckpoint, ProgressReporter, parse_shard, seed_from_output,
+                                                 shard_of, write_output)
+from pipelines.mapping_engine.llm_cache import LLMResponseCache
+from pipelines.mapping_engine.metrics import MappingMetrics
+from pipelines.mapping_engine.program_index import ProgramIndex
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = "You are an expert in defense industry programs and job analysis."
+
+MAPPING_MODES = ("llm", "keyword")
+
+
+def _retryable_errors() -> Tuple:
+    """Errors worth retrying: throttling, transient server failures and network trouble."""
+    import openai
+    return (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError)
+
 class ProgramMappingEngine:
-    """AI-powered engine for mapping jobs to defense programs."""
+    """AI-powered engine for mapping jobs to defense programs.
+    
+    mode "llm" uses the local tier, cache and OpenAI; mode "keyword" maps offline with
+    keyword matching only and never imports openai or numpy.
+    """
     
-    def __init__(self, config_path: str = "config/settings.yaml"):
+    def __init__(self, config_path: str = "config/settings.yaml", use_cache: bool = True, mode: str = "llm"):
         """Initialize the mapping engine with configuration."""
+        if mode not in MAPPING_MODES:
+            raise ValueError(f"Unknown mapping mode {mode!r}; expected one of {', '.join(MAPPING_MODES)}")
+        self.mode = mode
+        self.config_path = config_path
         self.settings = load_settings(config_path)
-        self.programs_dict = self._load_programs_dictionary()
-        self.openai_client = self._setup_openai()
+        self.prefilter = self.settings.get("program_mapping", {}).get("prefilter", {})
+        self.batching = self.settings.get("program_mapping", {}).get("batching", {})
+        self.knowledge_base = None
+        self.refresh_knowledge_base()
+        self.tier_stats = {"local": 0, "escalated": 0}
+        self.prompt_stats = {
+            "prompts": 0, "skipped": 0, "prompt_tokens": 0, "unfiltered_prompt_tokens": 0,
+            "batched_jobs": 0, "batch_requests": 0, "batch_prompt_tokens": 0, "unbatched_prompt_tokens": 0
+        }
+        self.metrics = MappingMetrics(self.settings["apis"]["openai"].get("pricing"))
+        self._openai_client = None
+        if mode == "llm":
+            # Fail fast on a missing key, but leave the slow client import to the first request
+            self._api_key()
+        self.response_cache = self._setup_cache() if use_cache and mode == "llm" else None
         
-    def _load_programs_dictionary(self) -> Dict:
-        """Load the programs dictionary from config."""
-        try:
-            with open("config/programs_dictionary.json", "r") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            logger.error("Programs dictionary not found")
-            return {}
+    def refresh_knowledge_base(self) -> bool:
+        """Pick up edits to the program sources; returns True if the knowledge base changed."""
+        knowledge_base = load_knowledge_base(self.config_path)
+        if knowledge_base is self.knowledge_base:
+            return False
+        self.knowledge_base = knowledge_base
+        self.programs_dict = knowledge_base.programs
+        # Cached responses are only valid for the dictionary they were prompted with
+        self.programs_version = knowledge_base.sources["programs_dictionary"]["sha256"]
+        self.program_index = ProgramIndex(self.programs_dict, knowledge_base.program_keywords)
+        self.local_classifier = self._setup_local_tier() if self.mode == "llm" else None
+        response_cache = getattr(self, "response_cache", None)
+        if response_cache is not None and response_cache.version != self.programs_version:
+            response_cache.close()
+            self.response_cache = self._setup_cache()
+        return True
+    
+    def _setup_local_tier(self) -> Optional["LocalProgramClassifier"]:
+        """Build the local TF-IDF tier if enabled in settings."""
+        tier_settings = self.settings.get("program_mapping", {}).get("local_tier", {})
+        if not tier_settings.get("enabled", True):
+            return None
+        # Imported here so keyword mode never loads numpy
+        from pipelines.mapping_engine.local_classifier import LocalProgramClassifier
+        return LocalProgramClassifier(self.program_index, identity_boost=tier_settings.get("identity_boost", 2.0))
+    
+    def _setup_cache(self) -> Optional[LLMResponseCache]:
+        """Open the persistent response cache if enabled in settings."""
+        cache_settings = self.settings.get("program_mapping", {}).get("llm_cache", {})
+        if not cache_settings.get("enabled", True):
+            return None
+        return LLMResponseCache(
+            cache_settings.get("path", "data/llm_cache.sqlite"),
+            version=self.programs_version,
+            max_entries=cache_settings.get("max_entries", 100000),
+            ttl_days=cache_settings.get("ttl_days", 30)
+        )
             
-    def _setup_openai(self) -> openai.OpenAI:
-        """Setup OpenAI client with API key."""
+    @staticmethod
+    def _api_key() -> str:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable not set")
+        return api_key
+    
+    @property
+    def openai_client(self) -> "openai.OpenAI":
+        """OpenAI client, imported and built on first use."""
+        if self._openai_client is None:
+            self._openai_client = self._setup_openai()
+        return self._openai_client
+    
+    def _setup_openai(self) -> "openai.OpenAI":
+        """Setup OpenAI client with API key."""
+        import openai
+        return openai.OpenAI(api_key=self._api_key(), base_url=self.settings["apis"]["openai"].get("base_url"))
         
-        return openai.OpenAI(api_key=api_key)
-        
+    def _completion_kwargs(self, prompt: str) -> Dict:
+        """Build the chat completion request for a mapping prompt."""
+        openai_settings = self.settings["apis"]["openai"]
+        return {
+            "model": openai_settings["model"],
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": openai_settings["max_tokens"],
+            "temperature": openai_settings["temperature"]
+        }
+    
     def map_job_to_programs(self, job_data: Dict) -> Dict:
         """Map a single job to relevant defense programs."""
+        started = time.perf_counter()
+        mapping_result = self._map_job(job_data)
+        self.metrics.record_job(time.perf_counter() - started, mapping_result["source"])
+        return mapping_result
+    
+    def _map_job(self, job_data: Dict) -> Dict:
+        if self.mode == "keyword":
+            return self._keyword_based_mapping(job_data)
         try:
+            local_result = self._local_mapping(job_data)
+            if local_result is not None:
+                return local_result
+            
             # Prepare prompt for AI analysis
-            prompt = self._create_mapping_prompt(job_data)
+            request = self._build_request(job_data)
+            if request is None:
+                return self._keyword_based_mapping(job_data)
+            cache_key, cached = self._cache_lookup(request)
+            if cached is not None:
+                return self._parse_ai_response(cached, job_data)
             
             # Get AI response
-            response = self.openai_client.chat.completions.create(
-                model=self.settings["apis"]["openai"]["model"],
-                messages=[
-                    {"role": "system", "content": "You are an expert in defense industry programs and job analysis."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.settings["apis"]["openai"]["max_tokens"],
-                temperature=self.settings["apis"]["openai"]["temperature"]
-            )
+            response = self._complete(request)
             
             # Parse AI response
             ai_analysis = response.choices[0].message.content
             mapping_result = self._parse_ai_response(ai_analysis, job_data)
+            self._cache_store(cache_key, ai_analysis, mapping_result)
             
             return mapping_result
             
@@ -78,40 +184,425 @@ class ProgramMappingEngine:
             logger.error(f"Error mapping job {job_data.get('job_id', 'unknown')}: {e}")
             return self._create_fallback_mapping(job_data)
     
-    def _create_mapping_prompt(self, job_data: Dict) -> str:
-        """Create the prompt for AI analysis."""
-        programs_info = "\n".join([
-            f"- {code}: {details['full_name']} ({details['prime_contractor']})"
-            for code, details in self.programs_dict.items()
-        ])
-        
-        prompt = f"""
-        Analyze this job posting and map it to relevant defense programs.
-        
-        Job Details:
-        - Title: {job_data.get('title', 'N/A')}
-        - Company: {job_data.get('company', 'N/A')}
-        - Location: {job_data.get('location', 'N/A')}
-        - Clearance: {job_data.get('clearance_level', 'N/A')}
-        - Description: {job_data.get('description', 'N/A')}
-        
-        Available Programs:
-        {programs_info}
-        
-        Please provide:
-        1. List of relevant programs (program codes)
-        2. Confidence score (0.0-1.0)
-        3. Reasoning for the mapping
-        4. Key keywords that support the mapping
-        
-        Format your response as JSON:
-        {{
-            "mapped_programs": ["PROGRAM1", "PROGRAM2"],
-            "confidence_score": 0.85,
-            "reasoning": "Explanation here",
-            "keywords_found": ["keyword1", "keyword2"]
-        }}
+    def _complete(self, request: Dict) -> "openai.types.chat.ChatCompletion":
+        """Synchronous completion call, timed and counted in the run metrics."""
+        started = time.perf_counter()
+        try:
+            response = self.openai_client.chat.completions.create(**request)
+        except Exception as e:
+            self.metrics.record_call(request["model"], time.perf_counter() - started, error=type(e).__name__)
+            raise
+        self._record_usage(request["model"], time.perf_counter() - started, 0.0, response)
+        return response
+    
+    def _record_usage(self, model: str, seconds: float, queue_wait: float, response) -> None:
+        usage = response.usage
+        self.metrics.record_call(model, seconds, queue_wait,
+                                 prompt_tokens=usage.prompt_tokens if usage is not None else 0,
+                                 completion_tokens=usage.completion_tokens if usage is not None else 0)
+    
+    def _local_mapping(self, job_data: Dict) -> Optional[Dict]:
+        """Decide a job locally, or return None to escalate it to the LLM.
+        
+        Programs scoring at or above exact_match_threshold are accepted; a job with
+        any program between fuzzy_match_threshold and exact_match_threshold is escalated.
         """
+        if self.local_classifier is None:
+            return None
+        lower = self.settings["program_mapping"].get("fuzzy_match_threshold", 0.8)
+        upper = self.settings["program_mapping"].get("exact_match_threshold", 0.95)
+        decision = self.local_classifier.classify(job_data, lower, upper)
+        if decision["uncertain"]:
+            self.tier_stats["escalated"] += 1
+            return None
+        
+        self.tier_stats["local"] += 1
+        confidences = decision["confidences"]
+        mapped = decision["mapped"]
+        if mapped:
+            reasoning = "Local TF-IDF match: " + ", ".join(f"{code} {confidences[code]:.2f}" for code in mapped)
+        else:
+            reasoning = f"No program scored above {lower}"
+        return {
+            "job_id": job_data.get("job_id"),
+            "mapped_programs": mapped,
+            "confidence_score": round(min(confidences[code] for code in mapped), 3) if mapped else 0.0,
+            "reasoning": reasoning,
+            "keywords_found": decision["terms"],
+            "mapped_at": datetime.now().isoformat(),
+            "source": "local_classifier"
+        }
+    
+    def _cache_lookup(self, request: Dict) -> Tuple[Optional[str], Optional[str]]:
+        """Return (cache key, cached completion text) for a request; both None without a cache."""
+        if self.response_cache is None:
+            return None, None
+        key = LLMResponseCache.key(request, self.programs_version)
+        return key, self.response_cache.get(key)
+    
+    def _cache_store(self, key: Optional[str], ai_analysis: str, mapping_result: Dict) -> None:
+        """Cache a completion, but only one that parsed; malformed replies are retried next run."""
+        if key is not None and mapping_result.get("source") == "ai_analysis":
+            self.response_cache.put(key, ai_analysis)
+    
+    async def map_jobs_async(self, jobs: List[Dict], max_concurrent: Optional[int] = None,
+                             batch_size: Optional[int] = None,
+                             on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Map jobs concurrently, bounded by max_concurrent and the configured rate limits.
+        
+        With batch_size > 1, up to batch_size jobs share each request. on_result is
+        called with each result as it completes; the returned list is in input order.
+        """
+        # Imported here so keyword mode starts without asyncio or openai
+        import asyncio
+        import openai
+        from pipelines.mapping_engine.rate_limiter import AsyncRateLimiter
+        
+        openai_settings = self.settings["apis"]["openai"]
+        if max_concurrent is None:
+            max_concurrent = self.settings.get("job_processing", {}).get("max_concurrent_jobs", 10)
+        
+        # Retries are handled here with jitter, so the client must not retry on its own
+        client = openai.AsyncOpenAI(
+            api_key=self._api_key(),
+            base_url=openai_settings.get("base_url"),
+            timeout=openai_settings.get("timeout", 60),
+            max_retries=0
+        )
+        session = {
+            "client": client,
+            "limiter": AsyncRateLimiter(
+                openai_settings.get("requests_per_minute", 500),
+                openai_settings.get("tokens_per_minute", 300000)
+            ),
+            "semaphore": asyncio.Semaphore(max(1, max_concurrent)),
+            "progress": ProgressReporter(len(jobs)),
+            "on_result": on_result
+        }
+        
+        async def run(job: Dict) -> Dict:
+            started = time.perf_counter()
+            return self._finish(session, await self._map_job_async(session, job), started)
+        
+        try:
+            if batch_size and batch_size > 1:
+                return await self._map_jobs_batched(session, jobs, batch_size)
+            return await asyncio.gather(*(run(job) for job in jobs))
+        finally:
+            await client.close()
+    
+    def _finish(self, session: Dict, result: Dict, started: float) -> Dict:
+        """Record a final result's wall time (from started), hand it to the on_result
+        callback and count it for progress."""
+        self.metrics.record_job(time.perf_counter() - started, result["source"])
+        if session["on_result"] is not None:
+            session["on_result"](result)
+        session["progress"].update()
+        return result
+    
+    async def _complete_async(self, session: Dict, request: Dict, label: str) -> Optional[str]:
+        """Completion text for a request, retrying throttled and transient failures with
+        jittered exponential backoff; None if the request ultimately fails."""
+        import asyncio
+        
+        openai_settings = self.settings["apis"]["openai"]
+        max_retries = openai_settings.get("max_retries", 5)
+        base_delay = openai_settings.get("retry_base_delay", 1.0)
+        estimated_tokens = self._estimate_tokens(request)
+        model = request["model"]
+        
+        queued = time.perf_counter()
+        async with session["semaphore"]:
+            slot_wait = time.perf_counter() - queued
+            for attempt in range(max_retries + 1):
+                queue_wait = slot_wait + await session["limiter"].acquire(estimated_tokens)
+                slot_wait = 0.0
+                started = time.perf_counter()
+                try:
+                    response = await session["client"].chat.completions.create(**request)
+                except _retryable_errors() as e:
+                    self.metrics.record_call(model, time.perf_counter() - started, queue_wait,
+                                             error=type(e).__name__)
+                    if attempt == max_retries:
+                        logger.error(f"Error mapping {label}: giving up after {attempt + 1} attempts: {e}")
+                        return None
+                    delay = self._retry_delay(e, base_delay, attempt)
+                    logger.warning(f"Retrying {label} in {delay:.1f}s ({type(e).__name__})")
+                    await asyncio.sleep(delay)
+                    continue
+                except Exception as e:
+                    self.metrics.record_call(model, time.perf_counter() - started, queue_wait,
+                                             error=type(e).__name__)
+                    logger.error(f"Error mapping {label}: {e}")
+                    return None
+                
+                self._record_usage(model, time.perf_counter() - started, queue_wait, response)
+                if response.usage is not None:
+                    session["limiter"].adjust(response.usage.total_tokens - estimated_tokens)
+                return response.choices[0].message.content
+        return None
+    
+    async def _map_job_async(self, session: Dict, job_data: Dict, escalated: bool = False) -> Dict:
+        """Map one job with its own request; escalated jobs skip the local tier."""
+        job_id = job_data.get("job_id", "unknown")
+        try:
+            if not escalated:
+                local_result = self._local_mapping(job_data)
+                if local_result is not None:
+                    return local_result
+            request = self._build_request(job_data)
+            if request is None:
+                return self._keyword_based_mapping(job_data)
+            cache_key, cached = self._cache_lookup(request)
+        except Exception as e:
+            logger.error(f"Error mapping job {job_id}: {e}")
+            return self._create_fallback_mapping(job_data)
+        if cached is not None:
+            return self._parse_ai_response(cached, job_data)
+        
+        ai_analysis = await self._complete_async(session, request, f"job {job_id}")
+        if ai_analysis is None:
+            return self._create_fallback_mapping(job_data)
+        mapping_result = self._parse_ai_response(ai_analysis, job_data)
+        self._cache_store(cache_key, ai_analysis, mapping_result)
+        return mapping_result
+    
+    async def _map_jobs_batched(self, session: Dict, jobs: List[Dict], batch_size: int) -> List[Dict]:
+        """Map jobs with several jobs per request, packed to the batching token budget."""
+        import asyncio
+        
+        results: List[Optional[Dict]] = [None] * len(jobs)
+        entries = []
+        for index, job in enumerate(jobs):
+            started = time.perf_counter()
+            try:
+                local_result = self._local_mapping(job)
+                if local_result is not None:
+                    results[index] = self._finish(session, local_result, started)
+                    continue
+                program_codes = self._candidate_programs(job)
+                if self._skip_without_candidates(job, program_codes):
+                    results[index] = self._finish(session, self._keyword_based_mapping(job), started)
+                    continue
+                # Cached per job under the single-job request, so either mode reuses the other's work
+                request = self._request_for(job, program_codes)
+                cache_key, cached = self._cache_lookup(request)
+            except Exception as e:
+                logger.error(f"Error mapping job {job.get('job_id', 'unknown')}: {e}")
+                results[index] = self._finish(session, self._create_fallback_mapping(job), started)
+                continue
+            if cached is not None:
+                results[index] = self._finish(session, self._parse_ai_response(cached, job), started)
+                continue
+            self.prompt_stats["batched_jobs"] += 1
+            self.prompt_stats["unbatched_prompt_tokens"] += self._estimate_tokens(request) - request["max_tokens"]
+            entries.append({
+                "index": index,
+                "job": job,
+                "program_codes": program_codes if program_codes is not None else list(self.programs_dict),
+                "cache_key": cache_key,
+                "started": started
+            })
+        
+        batches = self._pack_batches(entries, batch_size)
+        logger.info(f"Packed {len(entries)} uncached jobs into {len(batches)} batched requests")
+        await asyncio.gather(*(self._run_batch(session, batch, results) for batch in batches))
+        return results
+    
+    def _pack_batches(self, entries: List[Dict], batch_size: int) -> List[List[Tuple[str, str, Dict]]]:
+        """Greedily group entries into batches of (job_id ref, prompt section, entry).
+        
+        A batch closes when it reaches batch_size jobs, when its reply would not
+        fit in apis.openai.max_tokens, or when its prompt would exceed
+        batching.prompt_token_budget.
+        """
+        budget_chars = self.batching.get("prompt_token_budget", 8000) * 4
+        response_tokens = self.batching.get("response_tokens_per_job", 200)
+        limit = max(1, min(batch_size, self.settings["apis"]["openai"]["max_tokens"] // response_tokens))
+        base_chars = len(SYSTEM_PROMPT) + len(create_batch_prompt([], [], ""))
+        description_budget = self.prefilter.get("description_token_budget")
+        
+        batches, current, codes, refs, chars = [], [], set(), set(), base_chars
+        for entry in entries:
+            job = entry["job"]
+            ref = str(job.get("job_id") or "")
+            if not ref or ref in refs:
+                # Job IDs key the reply, so missing or repeated IDs get a positional one
+                ref = f"job-{entry['index']}"
+            section = render_job(ref, job, entry["program_codes"],
+                                 self._trim_to_budget(str(job.get("description", "N/A")), description_budget))
+            added = len(section) + self._catalog_chars(set(entry["program_codes"]) - codes)
+            if current and (len(current) >= limit or chars + added > budget_chars):
+                batches.append(current)
+                current, codes, refs, chars = [], set(), set(), base_chars
+                added = len(section) + self._catalog_chars(entry["program_codes"])
+            current.append((ref, section, entry))
+            codes.update(entry["program_codes"])
+            refs.add(ref)
+            chars += added
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def _run_batch(self, session: Dict, batch: List[Tuple[str, str, Dict]], results: List) -> None:
+        """Map one batch, then retry missing or malformed jobs in smaller batches."""
+        import asyncio
+        
+        if len(batch) == 1:
+            entry = batch[0][2]
+            mapping_result = await self._map_job_async(session, entry["job"], escalated=True)
+            results[entry["index"]] = self._finish(session, mapping_result, entry["started"])
+            return
+        
+        program_codes = []
+        for _, _, entry in batch:
+            program_codes.extend(code for code in entry["program_codes"] if code not in program_codes)
+        prompt = create_batch_prompt(
+            [self._program_line(code) for code in program_codes],
+            [section for _, section, _ in batch],
+            batch[0][0]
+        )
+        request = self._completion_kwargs(prompt)
+        request["max_tokens"] = min(request["max_tokens"],
+                                    self.batching.get("response_tokens_per_job", 200) * len(batch))
+        self.prompt_stats["batch_requests"] += 1
+        self.prompt_stats["batch_prompt_tokens"] += self._estimate_tokens(request) - request["max_tokens"]
+        
+        ai_analysis = await self._complete_async(session, request, f"batch of {len(batch)} jobs")
+        if ai_analysis is None:
+            # The request itself failed after retries; splitting would only repeat that
+            for _, _, entry in batch:
+                results[entry["index"]] = self._finish(session, self._create_fallback_mapping(entry["job"]),
+                                                       entry["started"])
+            return
+        
+        parsed = parse_batch_response(ai_analysis)
+        retry = []
+        for ref, section, entry in batch:
+            item = parsed.get(ref)
+            if item is None:
+                retry.append((ref, section, entry))
+                continue
+            mapping_result = self._mapping_from_parsed(item, entry["job"])
+            self._cache_store(entry["cache_key"], json.dumps(item), mapping_result)
+            results[entry["index"]] = self._finish(session, mapping_result, entry["started"])
+        
+        if retry:
+            self.metrics.record_parse_failure(len(retry))
+            logger.warning(f"{len(retry)}/{len(batch)} jobs missing or malformed in batch reply; "
+                           f"retrying in smaller batches")
+            half = (len(retry) + 1) // 2
+            await asyncio.gather(*(self._run_batch(session, retry[i:i + half], results)
+                                   for i in range(0, len(retry), half)))
+    
+    @staticmethod
+    def _estimate_tokens(request: Dict) -> int:
+        """Rough token reservation: ~4 characters per prompt token plus the completion budget."""
+        prompt_chars = sum(len(message["content"]) for message in request["messages"])
+        return prompt_chars // 4 + request["max_tokens"]
+    
+    @staticmethod
+    def _retry_delay(error: Exception, base_delay: float, attempt: int) -> float:
+        """Exponential backoff with full jitter, never shorter than a server-sent Retry-After."""
+        delay = random.uniform(0, base_delay * 2 ** attempt)
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return delay
+    
+    def _build_request(self, job_data: Dict) -> Optional[Dict]:
+        """Build the completion request for a job, or None if no program is a plausible candidate."""
+        program_codes = self._candidate_programs(job_data)
+        if self._skip_without_candidates(job_data, program_codes):
+            return None
+        return self._request_for(job_data, program_codes)
+    
+    def _candidate_programs(self, job_data: Dict) -> Optional[List[str]]:
+        """Top-K candidate program codes, or None when prefiltering is disabled (all programs)."""
+        if not self.prefilter.get("enabled", True):
+            return None
+        return [code for code, _ in self.program_index.rank(job_data, self.prefilter.get("top_k", 5))]
+    
+    def _skip_without_candidates(self, job_data: Dict, program_codes: Optional[List[str]]) -> bool:
+        if program_codes == [] and self.prefilter.get("skip_llm_without_candidates", True):
+            self.prompt_stats["skipped"] += 1
+            logger.debug(f"Job {job_data.get('job_id', 'unknown')}: no candidate programs, skipping LLM")
+            return True
+        return False
+    
+    def _request_for(self, job_data: Dict, program_codes: Optional[List[str]]) -> Dict:
+        """Single-job completion request listing program_codes (all programs when None)."""
+        prompt = self._create_mapping_prompt(job_data, program_codes)
+        
+        # Estimate what the same job would have cost with the full catalog and description
+        description = str(job_data.get("description", "N/A"))
+        trimmed = self._trim_to_budget(description, self.prefilter.get("description_token_budget"))
+        unfiltered_chars = len(prompt) + len(description) - len(trimmed)
+        if program_codes is not None:
+            unfiltered_chars += self._catalog_chars(self.programs_dict) - self._catalog_chars(program_codes)
+        tokens, unfiltered = len(prompt) // 4, unfiltered_chars // 4
+        self.prompt_stats["prompts"] += 1
+        self.prompt_stats["prompt_tokens"] += tokens
+        self.prompt_stats["unfiltered_prompt_tokens"] += unfiltered
+        logger.debug(f"Job {job_data.get('job_id', 'unknown')}: {len(program_codes or self.programs_dict)} "
+                     f"candidate programs, ~{tokens} prompt tokens (~{unfiltered} unfiltered)")
+        
+        return self._completion_kwargs(prompt)
+    
+    def _program_line(self, code: str) -> str:
+        details = self.programs_dict[code]
+        return f"- {code}: {details['full_name']} ({details['prime_contractor']})"
+    
+    def _catalog_chars(self, program_codes) -> int:
+        return sum(len(self._program_line(code)) + 1 for code in program_codes)
+    
+    @staticmethod
+    def _trim_to_budget(text: str, token_budget: Optional[int]) -> str:
+        """Cut text to roughly token_budget tokens (~4 characters each) at a word boundary."""
+        if not token_budget or len(text) <= token_budget * 4:
+            return text
+        cut = text[:token_budget * 4]
+        return cut[:cut.rfind(" ")].rstrip() + " ..." if " " in cut else cut
+    
+    def _create_mapping_prompt(self, job_data: Dict, program_codes: Optional[List[str]] = None) -> str:
+        """Create the prompt for AI analysis, listing only program_codes when given."""
+        if program_codes is None:
+            program_codes = list(self.programs_dict)
+        programs_info = "\n".join(self._program_line(code) for code in program_codes)
+        description = self._trim_to_budget(
+            str(job_data.get("description", "N/A")), self.prefilter.get("description_token_budget")
+        )
+        
+        prompt = f"""Analyze this job posting and map it to relevant defense programs.
+
+Job Details:
+- Title: {job_data.get('title', 'N/A')}
+- Company: {job_data.get('company', 'N/A')}
+- Location: {job_data.get('location', 'N/A')}
+- Clearance: {job_data.get('clearance_level', 'N/A')}
+- Description: {description}
+
+Candidate Programs:
+{programs_info}
+
+Please provide:
+1. List of relevant programs (program codes, only from the candidates above)
+2. Confidence score (0.0-1.0)
+3. Reasoning for the mapping
+4. Key keywords that support the mapping
+
+Format your response as JSON:
+{{
+    "mapped_programs": ["PROGRAM1", "PROGRAM2"],
+    "confidence_score": 0.85,
+    "reasoning": "Explanation here",
+    "keywords_found": ["keyword1", "keyword2"]
+}}
+"""
         return prompt
     
     def _parse_ai_response(self, ai_response: str, job_data: Dict) -> Dict:
@@ -121,59 +612,52 @@ class ProgramMappingEngine:
             import re
             json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
             if json_match:
-                parsed = json.loads(json_match.group())
-                
-                return {
-                    "job_id": job_data.get("job_id"),
-                    "mapped_programs": parsed.get("mapped_programs", []),
-                    "confidence_score": parsed.get("confidence_score", 0.0),
-                    "reasoning": parsed.get("reasoning", ""),
-                    "keywords_found": parsed.get("keywords_found", []),
-                    "mapped_at": datetime.now().isoformat(),
-                    "source": "ai_analysis"
-                }
+                return self._mapping_from_parsed(json.loads(json_match.group()), job_data)
+            logger.warning("Failed to parse AI response: no JSON object found")
         except Exception as e:
             logger.warning(f"Failed to parse AI response: {e}")
         
+        self.metrics.record_parse_failure()
         # Fallback to keyword-based mapping
         return self._keyword_based_mapping(job_data)
     
+    def _mapping_from_parsed(self, parsed: Dict, job_data: Dict) -> Dict:
+        """Mapping result from a decoded AI reply object."""
+        return {
+            "job_id": job_data.get("job_id"),
+            "mapped_programs": parsed.get("mapped_programs", []),
+            "confidence_score": parsed.get("confidence_score", 0.0),
+            "reasoning": parsed.get("reasoning", ""),
+            "keywords_found": parsed.get("keywords_found", []),
+            "mapped_at": datetime.now().isoformat(),
+            "source": "ai_analysis"
+        }
+    
     def _keyword_based_mapping(self, job_data: Dict) -> Dict:
         """Fallback mapping based on keyword matching."""
-        job_text = f"{job_data.get('title', '')} {job_data.get('description', '')}".lower()
+        job_text = f"{job_data.get('title', '')} {job_data.get('description', '')}"
+        company = job_data.get("company", "")
+        threshold = self.settings["program_mapping"]["keyword_match_threshold"]
         mapped_programs = []
         keywords_found = []
         
-        for program_code, program_details in self.programs_dict.items():
-            # Check program name and acronyms
-            program_terms = [program_details['full_name'].lower()] + \
-                           [acronym.lower() for acronym in program_details.get('acronyms', [])] + \
-                           [code_name.lower() for code_name in program_details.get('code_names', [])]
-            
-            # Check key skills
-            program_skills = [skill.lower() for skill in program_details.get('key_skills', [])]
-            
-            # Calculate match score
-            match_score = 0
-            matched_keywords = []
-            
-            for term in program_terms:
-                if term in job_text:
-                    match_score += 0.3
-                    matched_keywords.append(term)
-            
-            for skill in program_skills:
-                if skill in job_text:
-                    match_score += 0.2
-                    matched_keywords.append(skill)
+        # One automaton pass finds every program's terms, on word boundaries
+        hits = self.program_index.hits(job_text)
+        for program_code in self.programs_dict:
+            term_hits = hits.get(program_code)
+            if not term_hits:
+                continue
+            # Names, acronyms and code names score higher than skills and keywords
+            match_score = sum(0.3 if self.program_index.is_identity(program_code, term) else 0.2
+                              for term in term_hits)
             
             # Check company match
-            if program_details.get('prime_contractor', '').lower() in job_data.get('company', '').lower():
+            if self.program_index.prime_matches(program_code, company):
                 match_score += 0.4
             
-            if match_score >= self.settings["program_mapping"]["keyword_match_threshold"]:
+            if match_score >= threshold:
                 mapped_programs.append(program_code)
-                keywords_found.extend(matched_keywords)
+                keywords_found.extend(term_hits)
         
         return {
             "job_id": job_data.get("job_id"),
@@ -197,52 +681,148 @@ class ProgramMappingEngine:
             "source": "fallback"
         }
     
-    def process_jobs_batch(self, jobs_file: str, output_file: str) -> None:
-        """Process a batch of jobs and save mapping results."""
+    def process_jobs_batch(self, jobs_file: str, output_file: str, concurrent: bool = False,
+                           max_concurrent: Optional[int] = None, batch_size: Optional[int] = None,
+                           resume: bool = False, shard: Optional[Tuple[int, int]] = None,
+                           metrics_json: Optional[str] = None, metrics_prom: Optional[str] = None) -> None:
+        """Process a batch of jobs and save mapping results.
+        
+        Results are appended to <output>.partial.jsonl as they complete, then written
+        to the output in input order at the end: JSONL when it ends in .jsonl,
+        otherwise a JSON array. resume skips job IDs already in the checkpoint (or,
+        without one, in the output); shard=(index, count) maps only jobs whose ID
+        hashes to index.
+        batch_size packs that many jobs per request (default: program_mapping.batching
+        when enabled); batching always runs on the concurrent path. Run metrics go to
+        metrics_json and metrics_prom (default: monitoring.mapping_metrics).
+        """
         try:
+            if self.refresh_knowledge_base():
+                logger.info("Program knowledge base changed; reloaded")
+            
             # Load jobs
             with open(jobs_file, "r") as f:
                 jobs = json.load(f)
+            if shard is not None:
+                jobs = [job for job in jobs if shard_of(job, shard[1]) == shard[0]]
+                logger.info(f"Shard {shard[0]}/{shard[1]}: {len(jobs)} jobs")
             
-            logger.info(f"Processing {len(jobs)} jobs for program mapping")
+            if batch_size is None and self.batching.get("enabled", False):
+                batch_size = self.batching.get("max_jobs_per_request", 10)
             
-            # Process each job
-            mapping_results = []
-            for job in jobs:
-                result = self.map_job_to_programs(job)
-                mapping_results.append(result)
+            # Concurrent results complete out of order, so the output is only written at the end
+            checkpoint_path = f"{output_file}.partial.jsonl"
+            if resume and not os.path.exists(checkpoint_path) and os.path.exists(output_file):
+                seed_from_output(output_file, checkpoint_path)
+            fsync_every = self.settings.get("job_processing", {}).get("checkpoint_fsync_every", 50)
+            with MappingCheckpoint(checkpoint_path, resume=resume, fsync_every=fsync_every) as checkpoint:
+                pending = [job for job in jobs if not checkpoint.is_done(job)]
+                if len(pending) < len(jobs):
+                    logger.info(f"Resuming: {len(jobs) - len(pending)} jobs already in {checkpoint_path}")
+                logger.info(f"Processing {len(pending)} jobs for program mapping")
                 
-                # Log progress
-                if len(mapping_results) % 10 == 0:
-                    logger.info(f"Processed {len(mapping_results)}/{len(jobs)} jobs")
+                if self.mode == "llm" and (concurrent or (batch_size and batch_size > 1)):
+                    import asyncio
+                    asyncio.run(self.map_jobs_async(pending, max_concurrent, batch_size, on_result=checkpoint.write))
+                else:
+                    # Process each job
+                    progress = ProgressReporter(len(pending))
+                    for job in pending:
+                        checkpoint.write(self.map_job_to_programs(job))
+                        progress.update()
             
             # Save results
-            with open(output_file, "w") as f:
-                json.dump(mapping_results, f, indent=2)
+            write_output(checkpoint_path, output_file, jobs)
+            os.remove(checkpoint_path)
             
             logger.info(f"Program mapping completed. Results saved to {output_file}")
+            if self.response_cache is not None:
+                logger.info(f"LLM response cache: {self.response_cache.stats()}")
+            tiers = self.tier_stats
+            if tiers["local"] + tiers["escalated"]:
+                logger.info(f"Local tier: {tiers['local']} decided locally, {tiers['escalated']} escalated to the LLM "
+                            f"({tiers['escalated'] / (tiers['local'] + tiers['escalated']):.1%} escalation rate)")
+            stats = self.prompt_stats
+            if stats["prompts"]:
+                logger.info(f"Prompts: {stats['prompts']} built, {stats['skipped']} skipped without candidates, "
+                            f"~{stats['prompt_tokens']} prompt tokens "
+                            f"(~{stats['unfiltered_prompt_tokens']} with full catalog and description)")
+            if stats["batch_requests"]:
+                logger.info(f"Batching: {stats['batched_jobs']} jobs in {stats['batch_requests']} requests, "
+                            f"~{stats['batch_prompt_tokens']} prompt tokens "
+                            f"(~{stats['unbatched_prompt_tokens']} as one job per request)")
+            self._write_metrics(metrics_json, metrics_prom)
             
         except Exception as e:
             logger.error(f"Error processing jobs batch: {e}")
             raise
 
+    def _write_metrics(self, json_path: Optional[str] = None, prom_path: Optional[str] = None) -> None:
+        """Log latency and cost, then write the JSON run summary and Prometheus file."""
+        metrics_settings = self.settings.get("monitoring", {}).get("mapping_metrics", {})
+        json_path = json_path or metrics_settings.get("summary_path")
+        prom_path = prom_path or metrics_settings.get("prometheus_path")
+        
+        summary = self.metrics.summary()
+        jobs = summary["job_seconds"]
+        logger.info(f"Job wall time: p50 {jobs['p50'] * 1000:.1f} ms, p95 {jobs['p95'] * 1000:.1f} ms, "
+                    f"p99 {jobs['p99'] * 1000:.1f} ms; sources {summary['sources']}, "
+                    f"{summary['parse_failures']} parse failures")
+        for model, calls in summary["llm"].items():
+            latency = calls["latency_seconds"]
+            cost = calls["estimated_cost_usd"]
+            logger.info(f"{model}: {calls['requests']} requests, p50 {latency['p50']:.2f}s, "
+                        f"p95 {latency['p95']:.2f}s, p99 {latency['p99']:.2f}s, "
+                        f"{calls['prompt_tokens']} prompt + {calls['completion_tokens']} completion tokens, "
+                        + (f"~${cost:.4f}" if cost is not None else "no pricing configured"))
+        
+        if json_path:
+            extra = {"mode": self.mode, "local_tier": dict(self.tier_stats), "prompts": dict(self.prompt_stats)}
+            if self.response_cache is not None:
+                extra["cache"] = self.response_cache.stats()
+            self.metrics.write_json(json_path, extra)
+            logger.info(f"Run summary saved to {json_path}")
+        if prom_path:
+            self.metrics.write_prometheus(prom_path)
+            logger.info(f"Prometheus metrics saved to {prom_path}")
+
 def main():
     """Main function for command-line usage."""
     import argparse
     
     parser = argparse.ArgumentParser(description="Map jobs to defense programs")
     parser.add_argument("--input", "-i", required=True, help="Input jobs JSON file")
-    parser.add_argument("--output", "-o", required=True, help="Output mapping JSON file")
+    parser.add_argument("--output", "-o", required=True, help="Output mapping JSON or JSONL file")
     parser.add_argument("--config", "-c", default="config/settings.yaml", help="Configuration file")
+    parser.add_argument("--mode", "-m", choices=MAPPING_MODES, default="llm",
+                        help="llm: local tier + OpenAI; keyword: offline keyword matching, no API key needed")
+    parser.add_argument("--concurrent", action="store_true",
+                        help="Map jobs concurrently with asyncio (rate limited per settings)")
+    parser.add_argument("--max-concurrent", type=int,
+                        help="In-flight request limit (default: job_processing.max_concurrent_jobs)")
+    parser.add_argument("--batch-size", type=int,
+                        help="Jobs per request (default: program_mapping.batching; 1 disables batching)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip job IDs already in the output or its .partial.jsonl checkpoint")
+    parser.add_argument("--shard", type=parse_shard, metavar="INDEX/COUNT",
+                        help="Map only jobs whose job ID hashes to this shard, e.g. 0/4")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the persistent LLM response cache")
+    parser.add_argument("--metrics-json", help="Run summary JSON file (default: monitoring.mapping_metrics)")
+    parser.add_argument("--metrics-prom",
+                        help="Prometheus text-format metrics file (default: monitoring.mapping_metrics)")
     
     args = parser.parse_args()
     
     try:
         # Initialize engine
-        engine = ProgramMappingEngine(args.config)
+        engine = ProgramMappingEngine(args.config, use_cache=not args.no_cache, mode=args.mode)
+        logger.info(f"Startup ({args.mode} mode): {(time.perf_counter() - _STARTED) * 1000:.0f} ms")
         
         # Process jobs
-        engine.process_jobs_batch(args.input, args.output)
+        engine.process_jobs_batch(args.input, args.output, concurrent=args.concurrent,
+                                  max_concurrent=args.max_concurrent, batch_size=args.batch_size,
+                                  resume=args.resume, shard=args.shard,
+                                  metrics_json=args.metrics_json, metrics_prom=args.metrics_prom)
         
         print(f"Program mapping completed successfully!")
         print(f"Results saved to: {args.output}")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Mapping Metrics
+Per-job and per-LLM-call instrumentation for the program mapping engine: wall time, queue
+wait, tokens, estimated cost, result sources and parse failures. Written as a JSON run
+summary and a Prometheus text-format file.
+"""
+
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def percentile(sorted_values: List[float], quantile: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(quantile * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _latency_summary(values: List[float]) -> Dict:
+    ordered = sorted(values)
+    summary = {f"p{int(q * 100)}": percentile(ordered, q) for q in QUANTILES}
+    summary.update({"count": len(ordered), "sum": sum(ordered), "max": ordered[-1] if ordered else 0.0})
+    return summary
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class MappingMetrics:
+    """Accumulates mapping run measurements in memory."""
+
+    def __init__(self, pricing: Optional[Dict] = None):
+        # model -> {"prompt": USD per 1K tokens, "completion": USD per 1K tokens}
+        self.pricing = pricing or {}
+        self.started = time.time()
+        self.job_seconds: List[float] = []
+        self.sources: Dict[str, int] = {}
+        self.parse_failures = 0
+        self.calls: Dict[str, Dict] = {}
+
+    def _model(self, model: str) -> Dict:
+        stats = self.calls.get(model)
+        if stats is None:
+            stats = self.calls[model] = {
+                "latency": [], "queue_wait": [], "prompt_tokens": 0, "completion_tokens": 0,
+                "requests": 0, "errors": {}
+            }
+        return stats
+
+    def record_job(self, seconds: float, source: str) -> None:
+        """One finished job: its wall time and where the mapping came from."""
+        self.job_seconds.append(seconds)
+        self.sources[source] = self.sources.get(source, 0) + 1
+
+    def record_call(self, model: str, seconds: float, queue_wait: float = 0.0,
+                    prompt_tokens: int = 0, completion_tokens: int = 0, error: Optional[str] = None) -> None:
+        """One completion attempt; error is the exception class name for failed attempts."""
+        stats = self._model(model)
+        stats["requests"] += 1
+        stats["latency"].append(seconds)
+        stats["queue_wait"].append(queue_wait)
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        if error:
+            stats["errors"][error] = stats["errors"].get(error, 0) + 1
+
+    def record_parse_failure(self, count: int = 1) -> None:
+        self.parse_failures += count
+
+    def cost(self, model: str) -> Optional[float]:
+        """Estimated USD for a model's tokens so far, or None if the model has no pricing."""
+        price = self.pricing.get(model)
+        if not price:
+            return None
+        stats = self._model(model)
+        return (stats["prompt_tokens"] * price.get("prompt", 0.0)
+                + stats["completion_tokens"] * price.get("completion", 0.0)) / 1000
+
+    def summary(self) -> Dict:
+        models = {}
+        for model, stats in self.calls.items():
+            models[model] = {
+                "requests": stats["requests"],
+                "errors": dict(stats["errors"]),
+                "prompt_tokens": stats["prompt_tokens"],
+                "completion_tokens": stats["completion_tokens"],
+                "estimated_cost_usd": self.cost(model),
+                "latency_seconds": _latency_summary(stats["latency"]),
+                "queue_wait_seconds": _latency_summary(stats["queue_wait"]),
+            }
+        return {
+            "started_at": self.started,
+            "duration_seconds": time.time() - self.started,
+            "jobs": len(self.job_seconds),
+            "sources": dict(self.sources),
+            "parse_failures": self.parse_failures,
+            "job_seconds": _latency_summary(self.job_seconds),
+            "llm": models,
+            "estimated_cost_usd": sum(self.cost(m) or 0.0 for m in self.calls),
+        }
+
+    def write_json(self, path: str, extra: Optional[Dict] = None) -> None:
+        """Write the run summary (plus any extra sections) as JSON."""
+        summary = self.summary()
+        summary.update(extra or {})
+        _makedirs_for(path)
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    def prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{suffix}{{{label_text}}} {value}" if label_text else f"{name}{suffix} {value}")
+
+        def summary_samples(values: List[float], labels: Dict) -> List:
+            ordered = sorted(values)
+            samples = [("", {**labels, "quantile": str(q)}, percentile(ordered, q)) for q in QUANTILES]
+            samples.append(("_sum", labels, sum(ordered)))
+            samples.append(("_count", labels, len(ordered)))
+            return samples
+
+        metric("mapping_jobs_total", "counter", "Jobs mapped, by result source",
+               [("", {"source": s}, n) for s, n in sorted(self.sources.items())])
+        metric("mapping_parse_failures_total", "counter", "AI replies that could not be parsed",
+               [("", {}, self.parse_failures)])
+        metric("mapping_job_duration_seconds", "summary", "Wall time per mapped job",
+               summary_samples(self.job_seconds, {}))
+
+        models = sorted(self.calls)
+        metric("mapping_llm_requests_total", "counter", "Completion attempts, by model",
+               [("", {"model": m}, self.calls[m]["requests"]) for m in models])
+        metric("mapping_llm_errors_total", "counter", "Failed completion attempts, by model and error",
+               [("", {"model": m, "error": e}, n) for m in models for e, n in sorted(self.calls[m]["errors"].items())])
+        metric("mapping_llm_tokens_total", "counter", "Tokens used, by model and type",
+               [("", {"model": m, "type": t}, self.calls[m][f"{t}_tokens"])
+                for m in models for t in ("prompt", "completion")])
+        metric("mapping_llm_cost_usd_total", "counter", "Estimated spend in USD, by model",
+               [("", {"model": m}, self.cost(m)) for m in models if self.cost(m) is not None])
+        metric("mapping_llm_request_duration_seconds", "summary", "Completion call latency, by model",
+               [s for m in models for s in summary_samples(self.calls[m]["latency"], {"model": m})])
+        metric("mapping_llm_queue_wait_seconds", "summary",
+               "Time waiting for a concurrency slot and rate-limit budget, by model",
+               [s for m in models for s in summary_samples(self.calls[m]["queue_wait"], {"model": m})])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Write the Prometheus file atomically, for node_exporter's textfile collector."""
+        _makedirs_for(path)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(self.prometheus())
+        os.replace(temp_path, path)
+
+
+def _makedirs_for(path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
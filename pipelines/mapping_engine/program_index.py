@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Program Candidate Index
+Ranks defense programs against a job posting using the acronym, code name and keyword
+data in programs_dictionary.json and settings.program_mapping.program_keywords, so only
+the most likely programs are sent to the LLM.
+"""
+
+from typing import Dict, List, Tuple
+
+from config.knowledge_base import code_key
+from pipelines.mapping_engine.term_automaton import TermAutomaton
+
+# Identity terms name the program outright; keywords and skills only suggest it
+IDENTITY_WEIGHT = 3.0
+KEYWORD_WEIGHT = 2.0
+SKILL_WEIGHT = 1.0
+PRIME_WEIGHT = 1.5
+TITLE_MULTIPLIER = 2.0
+
+
+class ProgramIndex:
+    """Weighted program terms compiled into one automaton per dictionary load."""
+
+    def __init__(self, programs: Dict, program_keywords: Dict = None):
+        keywords_by_code = {code_key(code): terms for code, terms in (program_keywords or {}).items()}
+        self.primes: Dict[str, str] = {}
+        # (program code, lowercased term) -> weight
+        self.weights: Dict[Tuple[str, str], float] = {}
+        self.automaton = TermAutomaton()
+
+        for code, details in programs.items():
+            for weight, terms in (
+                (SKILL_WEIGHT, details.get("key_skills", [])),
+                (KEYWORD_WEIGHT, keywords_by_code.get(code_key(code), [])),
+                (IDENTITY_WEIGHT, [code, details.get("full_name", "")]
+                 + details.get("acronyms", []) + details.get("code_names", [])),
+            ):
+                for term in terms:
+                    key = (code, term.lower().strip())
+                    if self.automaton.add(key[1], key):
+                        self.weights[key] = max(weight, self.weights.get(key, 0.0))
+            self.primes[code] = details.get("prime_contractor", "").lower()
+        self.automaton.build()
+
+    def hits(self, text: str) -> Dict[str, Dict[str, int]]:
+        """Occurrences of each matched term, grouped by program code."""
+        by_program: Dict[str, Dict[str, int]] = {}
+        for (code, term), count in self.automaton.count(text).items():
+            by_program.setdefault(code, {})[term] = count
+        return by_program
+
+    def is_identity(self, code: str, term: str) -> bool:
+        """True for terms that name the program (code, full name, acronyms, code names)."""
+        return self.weights.get((code, term)) == IDENTITY_WEIGHT
+
+    def prime_matches(self, code: str, company: str) -> bool:
+        prime = self.primes.get(code)
+        return bool(prime) and prime in company.lower()
+
+    def score(self, job_data: Dict) -> Dict[str, float]:
+        """Relevance score per program; programs with no evidence are omitted."""
+        title_hits = self.hits(job_data.get("title") or "")
+        description_hits = self.hits(job_data.get("description") or "")
+        company = job_data.get("company") or ""
+
+        scores = {}
+        for code in title_hits.keys() | description_hits.keys():
+            title_terms = title_hits.get(code, {})
+            score = sum(self.weights[(code, term)] * TITLE_MULTIPLIER for term in title_terms)
+            score += sum(self.weights[(code, term)] for term in description_hits.get(code, {})
+                         if term not in title_terms)
+            if self.prime_matches(code, company):
+                score += PRIME_WEIGHT
+            scores[code] = score
+        return scores
+
+    def rank(self, job_data: Dict, top_k: int = 5) -> List[Tuple[str, float]]:
+        """The top_k (program code, score) pairs, best first."""
+        scores = self.score(job_data)
+        # Ties break on code so the rendered prompt (and its cache key) is stable
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Async Rate Limiter for LLM Requests
+
+Dual token bucket enforcing both requests/minute and tokens/minute limits
+for concurrent OpenAI calls.
+"""
+
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """Token buckets for requests and tokens, refilled continuously per minute."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.request_rate = requests_per_minute / 60.0
+        self.token_rate = tokens_per_minute / 60.0
+        self.request_capacity = float(requests_per_minute)
+        self.token_capacity = float(tokens_per_minute)
+        self.requests = self.request_capacity
+        self.tokens = self.token_capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        self.requests = min(self.request_capacity, self.requests + elapsed * self.request_rate)
+        self.tokens = min(self.token_capacity, self.tokens + elapsed * self.token_rate)
+
+    async def acquire(self, tokens: int) -> float:
+        """Wait until one request and `tokens` tokens are available; returns seconds waited."""
+        # A single request larger than the bucket could otherwise never run
+        tokens = min(tokens, self.token_capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.requests >= 1 and self.tokens >= tokens:
+                    self.requests -= 1
+                    self.tokens -= tokens
+                    return waited
+                wait = max(
+                    (1 - self.requests) / self.request_rate if self.requests < 1 else 0.0,
+                    (tokens - self.tokens) / self.token_rate if self.tokens < tokens else 0.0,
+                )
+                await asyncio.sleep(wait)
+                waited += wait
+
+    def adjust(self, token_delta: int) -> None:
+        """Correct a reservation once actual usage is known (negative refunds tokens)."""
+        self._refill()
+        self.tokens = min(self.token_capacity, self.tokens - token_delta)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Term Automaton
+Word-level Aho-Corasick automaton that finds every dictionary term in a text in one pass.
+"""
+
+import re
+from collections import deque
+from typing import Dict, Hashable, Iterator, List
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens; punctuation and spacing are ignored, so "F/A-18" is [f, a, 18]."""
+    return TOKEN_RE.findall(text.lower())
+
+
+class TermAutomaton:
+    """Aho-Corasick over word tokens, so matches always start and end on word boundaries.
+
+    Each term is added with a payload; scanning yields the payload of every
+    occurrence. Call build() after the last add().
+    """
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[List[Hashable]] = [[]]
+        self.built = False
+
+    def add(self, term: str, payload: Hashable) -> bool:
+        """Add a term; returns False if it has no alphanumeric tokens."""
+        tokens = tokenize(term)
+        if not tokens:
+            return False
+        node = 0
+        for token in tokens:
+            next_node = self.goto[node].get(token)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][token] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            node = next_node
+        if payload not in self.outputs[node]:
+            self.outputs[node].append(payload)
+        self.built = False
+        return True
+
+    def build(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them."""
+        queue = deque(self.goto[0].values())
+        for node in queue:
+            self.fail[node] = 0
+        while queue:
+            node = queue.popleft()
+            for token, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and token not in self.goto[state]:
+                    state = self.fail[state]
+                fallback = self.goto[state].get(token, 0)
+                self.fail[child] = fallback if fallback != child else 0
+                self.outputs[child].extend(p for p in self.outputs[self.fail[child]] if p not in self.outputs[child])
+        self.built = True
+
+    def scan(self, text: str) -> Iterator[Hashable]:
+        """Yield the payload of every term occurrence in text."""
+        if not self.built:
+            self.build()
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        node = 0
+        for token in TOKEN_RE.findall(text.lower()):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            if outputs[node]:
+                yield from outputs[node]
+
+    def count(self, text: str) -> Dict[Hashable, int]:
+        """Occurrences per payload."""
+        counts: Dict[Hashable, int] = {}
+        for payload in self.scan(text):
+            counts[payload] = counts.get(payload, 0) + 1
+        return counts
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Org Chart Reconstruction Engine for PrimeTime BD Intel
+Streams ZoomInfo contact exports, classifies titles into org levels and builds per-site and
+per-program hierarchy trees. State is kept between runs, so adding an export only rebuilds
+the company/department subtrees it touched.
+
+Usage:
+    python build_org_charts.py -i "docs/Ogden Contact Export.csv" -i docs/ --program GBSD
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.knowledge_base import load_knowledge_base
+from config.settings import load_settings
+from pipelines.common.files import expand_inputs, write_json
+from pipelines.org_engine.title_levels import TitleLevelClassifier
+
+logger = logging.getLogger(__name__)
+
+STATE_FORMAT = 1
+
+CONTACT_ID_RE = re.compile(r"/person/(\d+)")
+WORD_RE = re.compile(r"[a-z]+")
+STOPWORDS = {"and", "of", "the", "for", "to", "in", "at", "on", "a", "an", "ii", "iii", "iv"}
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping so "Engineering" and "Engineers" group with "Engineer"."""
+    if word.endswith("ing") and len(word) > 5:
+        return word[:-3]
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def iter_contacts(path: str) -> Iterator[Dict]:
+    """Stream a ZoomInfo export as raw contact dicts, one row at a time."""
+    with open(path, "r", newline="", encoding="utf-8-sig", errors="replace") as f:
+        for row in csv.DictReader(f):
+            title = (row.get("Job Title") or "").strip()
+            first = (row.get("First Name") or "").strip()
+            last = (row.get("Last Name") or "").strip()
+            if not title or not (first or last):
+                continue
+            contact_id = (row.get("ZoomInfo Contact ID") or "").strip()
+            if not contact_id:
+                # Some exports mangle the ID header; the profile URL carries the same ID
+                match = CONTACT_ID_RE.search(row.get("ZoomInfo Contact Profile URL") or "")
+                contact_id = match.group(1) if match else ""
+            email = (row.get("Email Address") or "").strip().lower()
+            city = (row.get("Person City") or "").strip()
+            state = (row.get("Person State") or "").strip()
+            yield {
+                "id": contact_id or email or f"{first} {last}|{title}".lower(),
+                "name": f"{first} {last}".strip(),
+                "title": title,
+                "management_level": (row.get("Management Level") or "").strip(),
+                "company": (row.get("Company Name") or "").strip() or "Unknown",
+                "department": ((row.get("Company Division Name") or "").strip()
+                               or (row.get("Department") or "").strip() or "Unassigned"),
+                "site": ", ".join(part for part in (city, state) if part) or "Unknown",
+                "email": email,
+            }
+
+
+class OrgChartBuilder:
+    """Incremental org trees keyed by (group, company, department).
+
+    A contact belongs to its site group ("site:Ogden, Utah") and to a program
+    group ("program:GBSD") for each program its title names or its export was
+    tagged with. Within a company department, each contact reports to a member
+    of a more senior managing level whose title shares its rarest function
+    word ("Software", "Test"), at the nearest level that has one; failing that,
+    to the nearest more senior level's only member, if it has exactly one;
+    otherwise directly to the department. Reporting chains stop at max_org_depth.
+    """
+
+    def __init__(self, settings: Dict, program_terms: Dict[str, List[str]], state: Optional[Dict] = None):
+        org_settings = settings.get("org_chart", {})
+        self.max_depth = org_settings.get("max_org_depth", 5)
+        self.classifier = TitleLevelClassifier(org_settings.get("title_patterns", {}),
+                                               org_settings.get("level_order"))
+        managing = org_settings.get("managing_levels", ["executive", "director", "manager", "lead"])
+        self.generic_share = org_settings.get("generic_word_share", 0.5)
+        self.managing = [level for level in self.classifier.levels if level in managing]
+        # Single words from the level patterns say how senior a title is, not what it does
+        self.level_words = {_stem(term.lower()) for terms in org_settings.get("title_patterns", {}).values()
+                            for term in terms if " " not in term}
+
+        self.program_terms = program_terms
+        terms = sorted(program_terms, key=len, reverse=True)
+        self.program_re = (re.compile(r"(?<![a-z0-9])(?:" + "|".join(re.escape(t) for t in terms) + r")(?![a-z0-9])")
+                           if terms else None)
+        self._title_programs: Dict[str, List[str]] = {}
+        self._title_words: Dict[str, List[str]] = {}
+
+        self.signature = hashlib.sha256(json.dumps(
+            [org_settings.get("max_org_depth"), org_settings.get("title_patterns"), org_settings.get("level_order"),
+             managing, self.generic_share, sorted(program_terms.items())], sort_keys=True).encode()).hexdigest()
+        self.files: Dict[str, List] = {}
+        self.contacts: Dict[str, Dict] = {}
+        self.buckets: Dict[Tuple[str, str, str], Set[str]] = {}
+        # Bucket -> [contact ID, manager ID or None] in seniority order
+        self.subtrees: Dict[Tuple[str, str, str], List[List[Optional[str]]]] = {}
+        self.dirty: Set[Tuple[str, str, str]] = set()
+        if state is not None:
+            self._restore(state)
+
+    def _restore(self, state: Dict) -> None:
+        if state.get("format") != STATE_FORMAT or state.get("signature") != self.signature:
+            # Levels or program terms changed: reclassify everything from the stored contacts
+            logger.info("Org settings changed since the last run; rebuilding all trees")
+            for contact in state.get("contacts", {}).values():
+                self.add_contact(contact, contact.get("tags", []))
+            self.files = state.get("files", {})
+            return
+        self.files = state["files"]
+        self.contacts = state["contacts"]
+        for contact_id, contact in self.contacts.items():
+            for key in self._bucket_keys(contact):
+                self.buckets.setdefault(key, set()).add(contact_id)
+        self.subtrees = {tuple(json.loads(key)): nodes for key, nodes in state["subtrees"].items()}
+
+    def to_state(self) -> Dict:
+        self.build()
+        return {
+            "format": STATE_FORMAT,
+            "signature": self.signature,
+            "files": self.files,
+            "contacts": self.contacts,
+            "subtrees": {json.dumps(key): nodes for key, nodes in self.subtrees.items()},
+        }
+
+    def programs_in(self, title: str) -> List[str]:
+        programs = self._title_programs.get(title)
+        if programs is None:
+            programs = []
+            if self.program_re is not None:
+                for match in self.program_re.finditer(title.lower()):
+                    programs.extend(code for code in self.program_terms[match.group()] if code not in programs)
+            self._title_programs[title] = programs
+        return programs
+
+    def function_words(self, title: str) -> List[str]:
+        words = self._title_words.get(title)
+        if words is None:
+            words = sorted({_stem(w) for w in WORD_RE.findall(title.lower())} - STOPWORDS - self.level_words)
+            self._title_words[title] = words
+        return words
+
+    def _bucket_keys(self, contact: Dict) -> List[Tuple[str, str, str]]:
+        groups = [f"site:{contact['site']}"] + [f"program:{code}" for code in contact["programs"]]
+        return [(group, contact["company"], contact["department"]) for group in groups]
+
+    def add_file(self, path: str, tags: Optional[List[str]] = None, force: bool = False) -> int:
+        """Stream one export into the trees; returns the number of new or changed contacts.
+
+        Files already added with the same size, mtime and tags are skipped unless force is set.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        # Tags are part of the signature so re-running an export with a new --program applies it
+        signature = [stat.st_mtime_ns, stat.st_size, sorted(set(tags or []))]
+        if not force and self.files.get(path) == signature:
+            logger.info(f"Skipping unchanged export {path}")
+            return 0
+        changed = sum(self.add_contact(contact, tags) for contact in iter_contacts(path))
+        self.files[path] = signature
+        return changed
+
+    def add_contact(self, contact: Dict, tags: Optional[List[str]] = None) -> bool:
+        """Insert or update one contact; returns False if it was already present unchanged."""
+        previous = self.contacts.get(contact["id"])
+        tags = sorted(set(tags or []) | set(previous.get("tags", []) if previous else []))
+        record = {
+            "id": contact["id"],
+            "name": contact["name"],
+            "title": contact["title"],
+            "management_level": contact.get("management_level", ""),
+            "level": self.classifier.classify(contact["title"], contact.get("management_level", "")),
+            "company": contact["company"],
+            "department": contact["department"],
+            "site": contact["site"],
+            "email": contact.get("email", ""),
+            "tags": tags,
+            "programs": self.programs_in(contact["title"]) + [code for code in tags
+                                                               if code not in self.programs_in(contact["title"])],
+        }
+        if record == previous:
+            return False
+        if previous is not None:
+            for key in self._bucket_keys(previous):
+                self.buckets[key].discard(previous["id"])
+                self.dirty.add(key)
+        self.contacts[record["id"]] = record
+        for key in self._bucket_keys(record):
+            self.buckets.setdefault(key, set()).add(record["id"])
+            self.dirty.add(key)
+        return True
+
+    def build(self) -> None:
+        """Rebuild the subtrees of buckets touched since the last build."""
+        for key in self.dirty:
+            members = self.buckets.get(key)
+            if members:
+                self.subtrees[key] = self._build_bucket(members)
+            else:
+                self.subtrees.pop(key, None)
+                self.buckets.pop(key, None)
+        if self.dirty:
+            logger.info(f"Rebuilt {len(self.dirty)} of {len(self.subtrees)} department subtrees")
+        self.dirty = set()
+
+    def _build_bucket(self, member_ids: Set[str]) -> List[List[Optional[str]]]:
+        """Reporting lines for one company department as [contact ID, manager ID] pairs."""
+        rank = self.classifier.rank
+        members = sorted((self.contacts[i] for i in member_ids), key=lambda c: (rank[c["level"]], c["id"]))
+        words_of = {contact["id"]: self.function_words(contact["title"]) for contact in members}
+        frequency: Dict[str, int] = {}
+        for words in words_of.values():
+            for word in words:
+                frequency[word] = frequency.get(word, 0) + 1
+        # Words in most of the department's titles ("Engineer" in Engineering) are no evidence
+        generic = max(2, len(members) * self.generic_share)
+        parents: List[List[Optional[str]]] = []
+        depth: Dict[str, int] = {}
+        # Eligible parents per managing level: all of them, and by function word with a round-robin cursor
+        placed: Dict[str, List[str]] = {level: [] for level in self.managing}
+        postings: Dict[str, Dict[str, List]] = {level: {} for level in self.managing}
+
+        # Evidence words per title, rarest first
+        evidence: Dict[str, List[str]] = {}
+        for contact in members:
+            words = words_of[contact["id"]]
+            higher = [postings[level] for level in reversed(self.managing) if rank[level] < rank[contact["level"]]]
+            ordered = evidence.get(contact["title"])
+            if ordered is None:
+                ordered = evidence[contact["title"]] = sorted((w for w in words if frequency[w] <= generic),
+                                                              key=lambda w: (frequency[w], w))
+            parent = None
+            # The rarest shared word is the most specific evidence, matched at the nearest level
+            # that has it; reports sharing it are spread evenly over that level's members
+            for word in ordered:
+                for level_postings in higher:
+                    posting = level_postings.get(word)
+                    if posting is not None:
+                        parent = posting[0][posting[1] % len(posting[0])]
+                        posting[1] += 1
+                        break
+                if parent is not None:
+                    break
+            if parent is None:
+                sole = next((placed[level] for level in reversed(self.managing)
+                             if rank[level] < rank[contact["level"]] and placed[level]), [])
+                parent = sole[0] if len(sole) == 1 else None
+            parents.append([contact["id"], parent])
+            depth[contact["id"]] = depth[parent] + 1 if parent else 1
+            if contact["level"] in placed and depth[contact["id"]] < self.max_depth:
+                placed[contact["level"]].append(contact["id"])
+                for word in words:
+                    if frequency[word] > generic:
+                        continue
+                    postings[contact["level"]].setdefault(word, [[], 0])[0].append(contact["id"])
+        return parents
+
+    def _nest(self, reporting: List[List[Optional[str]]]) -> List[Dict]:
+        """Nested node dicts from [contact ID, manager ID] pairs."""
+        nodes = {}
+        roots = []
+        for contact_id, parent in reporting:
+            contact = self.contacts[contact_id]
+            node = nodes[contact_id] = {"id": contact_id, "name": contact["name"], "title": contact["title"],
+                                        "level": contact["level"], "children": []}
+            (nodes[parent]["children"] if parent else roots).append(node)
+        return roots
+
+    def trees(self) -> List[Dict]:
+        """One tree per group: group -> company -> department -> reporting chains."""
+        self.build()
+        groups: Dict[str, Dict[str, Dict[str, List[List[Optional[str]]]]]] = {}
+        for (group, company, department), reporting in self.subtrees.items():
+            groups.setdefault(group, {}).setdefault(company, {})[department] = reporting
+        trees = []
+        for group in sorted(groups):
+            levels: Dict[str, int] = {}
+            companies = []
+            for company in sorted(groups[group]):
+                departments = []
+                for department in sorted(groups[group][company]):
+                    key = (group, company, department)
+                    for contact_id in self.buckets[key]:
+                        level = self.contacts[contact_id]["level"]
+                        levels[level] = levels.get(level, 0) + 1
+                    departments.append({"name": department, "contacts": len(self.buckets[key]),
+                                        "children": self._nest(groups[group][company][department])})
+                companies.append({"name": company, "departments": departments})
+            trees.append({
+                "group": group,
+                "contacts": sum(levels.values()),
+                "levels": {level: levels[level] for level in self.classifier.levels if level in levels},
+                "companies": companies,
+            })
+        return trees
+
+
+def program_terms_from(knowledge_base) -> Dict[str, List[str]]:
+    """Lowercased identity terms (codes, names, acronyms, code names) -> program codes."""
+    terms: Dict[str, List[str]] = {}
+    for code, details in knowledge_base.programs.items():
+        for term in [code, details.get("full_name", "")] + details.get("acronyms", []) + details.get("code_names", []):
+            term = term.lower().strip()
+            if term and code not in terms.setdefault(term, []):
+                terms[term].append(code)
+    return terms
+
+
+def format_tree(tree: Dict) -> str:
+    """Indented text rendering of one group tree."""
+    lines = [f"{tree['group']} ({tree['contacts']} contacts)"]
+
+    def walk(nodes: List[Dict], indent: int) -> None:
+        for node in nodes:
+            lines.append(f"{'  ' * indent}- {node['name']}, {node['title']} [{node['level']}]")
+            walk(node["children"], indent + 1)
+
+    for company in tree["companies"]:
+        lines.append(f"  {company['name']}")
+        for department in company["departments"]:
+            lines.append(f"    {department['name']} ({department['contacts']})")
+            walk(department["children"], 3)
+    return "\n".join(lines)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build org charts from ZoomInfo contact exports")
+    parser.add_argument("--input", "-i", action="append", required=True,
+                        help="Export CSV, directory of CSVs or glob (repeatable)")
+    parser.add_argument("--program", "-p", action="append", default=[],
+                        help="Program code to tag every contact in these inputs with (repeatable)")
+    parser.add_argument("--output", "-o", help="Org charts JSON (default: org_chart.output_path)")
+    parser.add_argument("--state", help="Incremental state file (default: org_chart.state_path)")
+    parser.add_argument("--config", "-c", default="config/settings.yaml", help="Configuration file")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore saved state and rebuild from the inputs")
+    parser.add_argument("--show", metavar="GROUP", help='Print one tree as text, e.g. "program:GBSD"')
+    args = parser.parse_args()
+
+    settings = load_settings(args.config)
+    org_settings = settings.get("org_chart", {})
+    output_path = args.output or org_settings.get("output_path", "data/org_structures/org_charts.json")
+    state_path = args.state or org_settings.get("state_path", "data/org_structures/org_state.json")
+
+    state = None
+    if not args.rebuild and os.path.exists(state_path):
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    builder = OrgChartBuilder(settings, program_terms_from(load_knowledge_base(args.config)), state)
+
+    for path in expand_inputs(args.input):
+        changed = builder.add_file(path, args.program, force=args.rebuild)
+        if changed:
+            logger.info(f"{path}: {changed} new or updated contacts")
+
+    trees = builder.trees()
+    write_json(state_path, builder.to_state())
+    write_json(output_path, trees)
+    logger.info(f"{len(builder.contacts)} contacts in {len(trees)} org charts saved to {output_path}")
+
+    if args.show:
+        tree = next((t for t in trees if t["group"] == args.show), None)
+        print(format_tree(tree) if tree else f"No org chart for {args.show}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Title Level Classifier
+Classifies job titles into org levels with settings.org_chart.title_patterns compiled into
+one word-bounded regex per level, checked from the most to the least senior level.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+INDIVIDUAL_LEVEL = "individual"
+
+# ZoomInfo "Management Level" values, used when the title itself names no level
+MANAGEMENT_LEVELS = {
+    "c-level": "executive",
+    "vp-level": "executive",
+    "director": "director",
+    "manager": "manager",
+    "non-manager": INDIVIDUAL_LEVEL,
+}
+
+
+class TitleLevelClassifier:
+    """Title -> level, most senior matching level first.
+
+    `level_order` ranks the levels from most to least senior and must include
+    INDIVIDUAL_LEVEL, the level of titles no pattern matches. Results are
+    memoized per title, since exports repeat the same few thousand titles.
+    """
+
+    def __init__(self, title_patterns: Dict[str, List[str]], level_order: Optional[List[str]] = None):
+        self.levels = list(level_order) if level_order else list(title_patterns) + [INDIVIDUAL_LEVEL]
+        if INDIVIDUAL_LEVEL not in self.levels:
+            raise ValueError(f"level_order must include {INDIVIDUAL_LEVEL!r}")
+        unknown = set(title_patterns) - set(self.levels)
+        if unknown:
+            raise ValueError(f"title_patterns levels missing from level_order: {', '.join(sorted(unknown))}")
+        self.rank = {level: rank for rank, level in enumerate(self.levels)}
+        self.patterns = []
+        for level in self.levels:
+            terms = title_patterns.get(level)
+            if terms:
+                # Longest first so "Sr Director" is not cut short by "Sr"
+                alternation = "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+                self.patterns.append((level, re.compile(rf"\b(?:{alternation})\b", re.IGNORECASE)))
+        self._memo: Dict[str, str] = {}
+
+    def classify(self, title: str, management_level: str = "") -> str:
+        """Level of a title, falling back to the export's management level, then INDIVIDUAL_LEVEL."""
+        level = self._memo.get(title)
+        if level is None:
+            level = next((name for name, pattern in self.patterns if pattern.search(title)), "")
+            self._memo[title] = level
+        if level:
+            return level
+        fallback = MANAGEMENT_LEVELS.get((management_level or "").strip().lower())
+        return fallback if fallback in self.rank else INDIVIDUAL_LEVEL
@@ -0,0 +1,622 @@
+#!/usr/bin/env python3
+"""
+HUMINT Playbook Builder for PrimeTime BD Intel
+Generates BD playbooks section by section from prompts/bd_playbook_prompt.md. Each section is a
+node hashed over the data it reads (jobs, contacts, org chart, scores, trends) and the sections it
+builds on; only nodes whose hash changed are regenerated, independent sections and programs run
+concurrently, and every output format is rendered from the cached section outputs.
+
+Usage:
+    python build_humint_playbook.py --company "Northrop Grumman" --program GBSD \
+        --output outputs/playbooks/ng_gbsd_playbook.md
+"""
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.knowledge_base import ProgramKnowledgeBase, code_key, load_knowledge_base, normalize
+from config.settings import load_settings, resolve_path
+from pipelines.common.files import load_records
+from pipelines.org_engine.title_levels import TitleLevelClassifier
+from pipelines.playbook_engine.playbook_render import render_playbook
+
+logger = logging.getLogger(__name__)
+
+PLAYBOOK_MODES = ("llm", "outline")
+
+# Data slices a section can depend on
+INPUT_NAMES = ("program", "jobs", "contacts", "org_chart", "scores", "trends")
+
+# Section key -> data inputs and earlier sections it builds on (settings.playbook.sections overrides)
+DEFAULT_SECTIONS = {
+    "executive_summary": {"inputs": ["program", "scores"],
+                          "after": ["target_company_analysis", "opportunity_assessment", "strategic_approach",
+                                    "action_plan"]},
+    "target_company_analysis": {"inputs": ["program", "jobs", "contacts", "org_chart"]},
+    "opportunity_assessment": {"inputs": ["program", "jobs", "scores", "trends"]},
+    "strategic_approach": {"inputs": ["program", "scores"],
+                           "after": ["target_company_analysis", "opportunity_assessment"]},
+    "action_plan": {"inputs": ["contacts", "trends"], "after": ["strategic_approach"]},
+    "risk_assessment": {"inputs": ["program", "trends"], "after": ["opportunity_assessment"]},
+}
+
+SECTION_HEADING_RE = re.compile(r"^###\s+\d+\.\s+(.+?)\s*$")
+
+
+def section_key(title: str) -> str:
+    """"Target Company Analysis" -> "target_company_analysis"."""
+    return re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_")
+
+
+def digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _markdown_section(text: str, heading: str) -> str:
+    """Body under a "## heading" line, up to the next level-2 heading."""
+    lines = text.splitlines()
+    try:
+        start = lines.index(f"## {heading}") + 1
+    except ValueError:
+        return ""
+    end = next((i for i in range(start, len(lines)) if lines[i].startswith("## ")), len(lines))
+    return "\n".join(lines[start:end]).strip()
+
+
+class PlaybookPrompt:
+    """System prompt, section outlines and output requirements from bd_playbook_prompt.md."""
+
+    def __init__(self, text: str):
+        self.system = _markdown_section(text, "System Prompt")
+        self.requirements = [line.lstrip("- ").strip() for line in _markdown_section(text, "Output Requirements")
+                             .splitlines() if line.strip().startswith("-")]
+        # Section key -> {"title", "guidance"}, in the order the prompt lists them
+        self.sections: Dict[str, Dict] = {}
+        current = None
+        for line in _markdown_section(text, "Playbook Structure").splitlines():
+            match = SECTION_HEADING_RE.match(line)
+            if match:
+                current = {"title": match.group(1), "guidance": []}
+                self.sections[section_key(match.group(1))] = current
+            elif current is not None and line.strip().startswith("-"):
+                current["guidance"].append(line.strip()[1:].strip())
+
+    @classmethod
+    def load(cls, path: str) -> "PlaybookPrompt":
+        with open(resolve_path(path), "r", encoding="utf-8") as f:
+            return cls(f.read())
+
+
+def section_graph(configured: Optional[Dict], prompt: PlaybookPrompt) -> Dict[str, Dict]:
+    """Validated section graph in dependency order (every section after the ones it builds on)."""
+    graph = {key: {"inputs": list(node.get("inputs", [])), "after": list(node.get("after", []))}
+             for key, node in (configured or DEFAULT_SECTIONS).items()}
+    for key, node in graph.items():
+        if key not in prompt.sections:
+            raise ValueError(f"Playbook section {key!r} is not in the playbook prompt "
+                             f"(have {', '.join(prompt.sections)})")
+        unknown = set(node["inputs"]) - set(INPUT_NAMES)
+        if unknown:
+            raise ValueError(f"Playbook section {key!r} has unknown inputs: {', '.join(sorted(unknown))}")
+        missing = set(node["after"]) - set(graph)
+        if missing:
+            raise ValueError(f"Playbook section {key!r} builds on undefined sections: {', '.join(sorted(missing))}")
+
+    ordered: Dict[str, Dict] = {}
+    visiting = set()
+
+    def visit(key: str) -> None:
+        if key in ordered:
+            return
+        if key in visiting:
+            raise ValueError(f"Playbook sections form a cycle through {key!r}")
+        visiting.add(key)
+        for upstream in graph[key]["after"]:
+            visit(upstream)
+        visiting.discard(key)
+        ordered[key] = graph[key]
+
+    for key in graph:
+        visit(key)
+    return ordered
+
+
+def _load_json(path: Optional[str], what: str):
+    if not path or not os.path.exists(path):
+        if path:
+            logger.warning(f"No {what} at {path}; playbooks will go without it")
+        return None
+    return load_records(path)
+
+
+def _top(counter: Counter, limit: int) -> List[List]:
+    return [[value, count] for value, count in sorted(counter.items(), key=lambda item: (-item[1], item[0]))[:limit]]
+
+
+class PlaybookData:
+    """Loads the shared datasets once and slices them per (company, program) playbook input."""
+
+    def __init__(self, settings: Dict, knowledge_base: ProgramKnowledgeBase, mappings_path: Optional[str] = None,
+                 jobs_path: Optional[str] = None):
+        playbook = settings.get("playbook", {})
+        scoring = settings.get("scoring", {})
+        org_settings = settings.get("org_chart", {})
+        self.settings = settings
+        self.knowledge_base = knowledge_base
+        self.limit = playbook.get("max_bullet_points", 15)
+        self.include_contact_info = playbook.get("include_contact_info", True)
+
+        mappings = _load_json(mappings_path or scoring.get("mappings_path"), "job mappings") or []
+        jobs = _load_json(jobs_path or scoring.get("jobs_path"), "normalized jobs") or []
+        jobs_by_id = {str(job.get("job_id")): job for job in jobs}
+        # Program -> its mapped jobs (joined with the normalized posting where available)
+        self.program_jobs: Dict[str, List[Dict]] = {}
+        codes = {code_key(code): code for code in knowledge_base.programs}
+        for mapping in mappings:
+            job = dict(jobs_by_id.get(str(mapping.get("job_id")), {}), **{"job_id": mapping.get("job_id")})
+            for code in mapping.get("mapped_programs") or []:
+                self.program_jobs.setdefault(codes.get(code_key(str(code)), str(code)), []).append(job)
+
+        contacts_path = settings.get("entity_resolution", {}).get("output_path", "data/contacts/contacts_resolved.csv")
+        self.contacts: List[Dict] = []
+        if os.path.exists(contacts_path):
+            with open(contacts_path, "r", encoding="utf-8", newline="") as f:
+                self.contacts = list(csv.DictReader(f))
+        self.classifier = TitleLevelClassifier(org_settings.get("title_patterns", {}), org_settings.get("level_order"))
+
+        self.org_charts = {tree["group"]: tree for tree in
+                           _load_json(org_settings.get("output_path", "data/org_structures/org_charts.json"),
+                                      "org charts") or []}
+        scores = _load_json(scoring.get("output_path", "data/program_scores.json"), "program scores") or {}
+        self.scores = {record["program"]: record for record in scores.get("programs", [])}
+        self.trend_store = None
+        trend_path = settings.get("hiring_trends", {}).get("path", "data/hiring_trends.sqlite")
+        if os.path.exists(trend_path):
+            from pipelines.trend_engine.hiring_trends import store_from_settings
+            self.trend_store = store_from_settings(settings)
+
+    @staticmethod
+    def _company_matches(company: str, target: str) -> bool:
+        company, target = normalize(company), normalize(target)
+        return bool(company) and (target in company or company in target)
+
+    def inputs(self, company: str, program: str) -> Dict[str, Dict]:
+        """Every INPUT_NAMES slice for one playbook, as JSON-serializable dicts."""
+        return {
+            "program": self._program(program),
+            "jobs": self._jobs(program),
+            "contacts": self._contacts(company, program),
+            "org_chart": self._org_chart(company, program),
+            "scores": self.scores.get(program, {}),
+            "trends": self._trends(program),
+        }
+
+    def _program(self, program: str) -> Dict:
+        details = dict(self.knowledge_base.programs.get(program, {}))
+        prime = self.knowledge_base.prime_contractors.get(details.get("prime_contractor", ""), {})
+        details.update({
+            "code": program,
+            "subcontractors": prime.get("subcontractors", {}).get(program, []),
+            "prime_locations": prime.get("key_locations", []),
+            "contract_vehicles": prime.get("contract_vehicles", []),
+        })
+        return details
+
+    def _jobs(self, program: str) -> Dict:
+        jobs = self.program_jobs.get(program, [])
+        latest = sorted(jobs, key=lambda job: (str(job.get("posted_date") or ""), str(job.get("job_id"))),
+                        reverse=True)[:self.limit]
+        return {
+            "total": len(jobs),
+            "titles": _top(Counter(job.get("title") or "Unknown" for job in jobs), self.limit),
+            "locations": _top(Counter(job.get("location") or "Unknown" for job in jobs), self.limit),
+            "clearances": _top(Counter(job.get("clearance_level") or "None" for job in jobs), self.limit),
+            "companies": _top(Counter(job.get("company") or "Unknown" for job in jobs), self.limit),
+            "latest": [[job.get("title", ""), job.get("company", ""), job.get("location", ""),
+                        job.get("posted_date", "")] for job in latest],
+        }
+
+    def _contacts(self, company: str, program: str) -> Dict:
+        matches = [row for row in self.contacts
+                   if self._company_matches(row.get("company", ""), company) or row.get("program") == program]
+        rank = self.classifier.rank
+        matches.sort(key=lambda row: (rank[self.classifier.classify(row.get("title", ""))], row.get("name", "")))
+        fields = ["name", "title", "department", "city", "state"]
+        if self.include_contact_info:
+            fields += ["email", "phone", "linkedin"]
+        return {
+            "total": len(matches),
+            "levels": dict(Counter(self.classifier.classify(row.get("title", "")) for row in matches)),
+            "people": [{field: row.get(field, "") for field in fields if row.get(field)}
+                       for row in matches[:self.limit]],
+        }
+
+    def _org_chart(self, company: str, program: str) -> Dict:
+        tree = self.org_charts.get(f"program:{program}")
+        if tree is None:
+            return {}
+        companies = [c for c in tree["companies"] if self._company_matches(c["name"], company)] or tree["companies"]
+        departments = []
+        for entry in companies:
+            for department in entry["departments"]:
+                departments.append({
+                    "company": entry["name"],
+                    "department": department["name"],
+                    "contacts": department["contacts"],
+                    "leaders": [f"{node['name']}, {node['title']}" for node in department["children"][:3]],
+                })
+        departments.sort(key=lambda d: -d["contacts"])
+        return {"contacts": tree["contacts"], "levels": tree["levels"], "departments": departments[:self.limit]}
+
+    def _trends(self, program: str) -> Dict:
+        store = self.trend_store
+        if store is None:
+            return {}
+        return {
+            "jobs_by_window": {f"{window}d": sum(row["jobs"] for row in store.counts(window, (), program=program))
+                               for window in store.windows},
+            "locations": store.counts(store.windows[min(1, len(store.windows) - 1)], ("location",),
+                                      program=program)[:self.limit],
+            "surges": store.surges(("location", "clearance"), program=program)[:self.limit],
+            "chronic": store.chronic(("location",), program=program)[:self.limit],
+        }
+
+
+class PlaybookSectionCache:
+    """SQLite store of the latest generated text per (company, program, section) and its node hash."""
+
+    def __init__(self, path: str = "data/playbooks/sections.sqlite"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS sections (
+                company TEXT NOT NULL,
+                program TEXT NOT NULL,
+                section TEXT NOT NULL,
+                node_hash TEXT NOT NULL,
+                content TEXT NOT NULL,
+                generated_at REAL NOT NULL,
+                PRIMARY KEY (company, program, section)
+            )"""
+        )
+
+    def get(self, company: str, program: str, section: str) -> Optional[Tuple[str, str]]:
+        """(node_hash, content) last stored for a section, or None."""
+        return self.conn.execute("SELECT node_hash, content FROM sections WHERE company = ? AND program = ? "
+                                 "AND section = ?", (company, program, section)).fetchone()
+
+    def put(self, company: str, program: str, section: str, node_hash: str, content: str) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO sections (company, program, section, node_hash, content, "
+                          "generated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                          (company, program, section, node_hash, content, time.time()))
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class PlaybookBuilder:
+    """Builds playbooks as a graph of section nodes, regenerating only changed nodes.
+
+    A node's hash covers its section outline, the generation settings, the
+    hashes of the data inputs it reads and the text of the sections it builds
+    on. An upstream section that regenerates to the same text therefore does
+    not invalidate its dependents. Mode "outline" drafts sections from the
+    data alone, without the LLM.
+    """
+
+    def __init__(self, config_path: str = "config/settings.yaml", mode: str = "llm",
+                 mappings_path: Optional[str] = None, jobs_path: Optional[str] = None):
+        self.settings = load_settings(config_path)
+        self.mode = mode
+        playbook = self.settings.get("playbook", {})
+        self.playbook_settings = playbook
+        self.knowledge_base = load_knowledge_base(config_path)
+        self.prompt = PlaybookPrompt.load(playbook.get("prompt_path", "prompts/bd_playbook_prompt.md"))
+        self.graph = section_graph(playbook.get("sections"), self.prompt)
+        self.data = PlaybookData(self.settings, self.knowledge_base, mappings_path, jobs_path)
+        self.cache = PlaybookSectionCache(playbook.get("cache_path", "data/playbooks/sections.sqlite"))
+        self.stats = Counter()
+
+    def targets(self, company: Optional[str], programs: List[str], all_programs: bool = False) -> List[Tuple[str, str]]:
+        """(company, program) pairs to build; company defaults to each program's prime."""
+        known = {code_key(code): code for code in self.knowledge_base.programs}
+        if all_programs:
+            programs = list(self.knowledge_base.programs)
+        elif not programs and company:
+            programs = (self.knowledge_base.programs_for_prime(company)
+                        + self.knowledge_base.programs_for_subcontractor(company))
+        pairs = []
+        for program in programs:
+            code = known.get(code_key(program))
+            if code is None:
+                raise ValueError(f"Unknown program {program!r}")
+            pair = (company or self.knowledge_base.programs[code].get("prime_contractor", ""), code)
+            if pair not in pairs:
+                pairs.append(pair)
+        return pairs
+
+    def _generation_settings(self) -> Dict:
+        if self.mode != "llm":
+            return {"mode": self.mode}
+        openai_settings = self.settings["apis"]["openai"]
+        return {"mode": self.mode, "model": openai_settings["model"], "temperature": openai_settings["temperature"],
+                "max_tokens": openai_settings["max_tokens"]}
+
+    def node_hash(self, company: str, program: str, section: str, input_hashes: Dict[str, str],
+                  upstream: Dict[str, str]) -> str:
+        outline = self.prompt.sections[section]
+        return digest({
+            "section": section,
+            "title": outline["title"],
+            "guidance": outline["guidance"],
+            "system": self.prompt.system,
+            "requirements": self.prompt.requirements,
+            "generation": self._generation_settings(),
+            "max_bullet_points": self.data.limit,
+            "company": company,
+            "program": program,
+            "inputs": {name: input_hashes[name] for name in self.graph[section]["inputs"]},
+            "after": {name: digest(text) for name, text in upstream.items()},
+        })
+
+    def section_prompt(self, company: str, program: str, section: str, inputs: Dict[str, Dict],
+                       upstream: Dict[str, str]) -> str:
+        outline = self.prompt.sections[section]
+        full_name = self.knowledge_base.programs.get(program, {}).get("full_name", program)
+        lines = [f'Write the "{outline["title"]}" section of a BD playbook for {company} on the '
+                 f"{program} program ({full_name}).", "", "Cover:"]
+        lines += [f"- {item}" for item in outline["guidance"]]
+        lines += ["", f"Use at most {self.data.limit} bullet points. Return markdown for the section body only, "
+                      f"without the section heading.", "", "Output requirements:"]
+        lines += [f"- {item}" for item in self.prompt.requirements]
+        for name in self.graph[section]["inputs"]:
+            if inputs[name]:
+                lines += ["", f"## Data: {name}", json.dumps(inputs[name], indent=1, default=str)]
+        for name, text in upstream.items():
+            lines += ["", f"## Earlier section: {self.prompt.sections[name]['title']}", text]
+        return "\n".join(lines)
+
+    def outline_section(self, section: str, inputs: Dict[str, Dict], upstream: Dict[str, str]) -> str:
+        """Offline draft: the section's guidance followed by the data it would be written from."""
+        guidance = "; ".join(self.prompt.sections[section]["guidance"])
+        lines = [f"_Draft generated without the LLM. To cover: {guidance}._", ""]
+        for name in self.graph[section]["inputs"]:
+            value = inputs[name]
+            if not value:
+                lines.append(f"- **{name.replace('_', ' ').title()}**: no data")
+                continue
+            lines.append(f"- **{name.replace('_', ' ').title()}**")
+            for key, item in value.items():
+                if isinstance(item, list) and item and isinstance(item[0], (list, dict)):
+                    lines.append(f"  - {key.replace('_', ' ')}:")
+                    lines += [f"    - {self._outline_entry(entry)}" for entry in item[:self.data.limit]]
+                elif item not in ("", None, [], {}):
+                    lines.append(f"  - {key.replace('_', ' ')}: {self._outline_entry(item)}")
+        if upstream:
+            lines.append(f"- **Builds on**: {', '.join(self.prompt.sections[name]['title'] for name in upstream)}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _outline_entry(entry) -> str:
+        if isinstance(entry, dict):
+            return ", ".join(f"{k.replace('_', ' ')}: {PlaybookBuilder._outline_entry(v)}" for k, v in entry.items())
+        if isinstance(entry, list):
+            return "; ".join(map(str, entry)) if any(isinstance(e, str) and "," in e for e in entry) else \
+                ", ".join(map(str, entry))
+        return str(entry)
+
+    async def _generate(self, session: Dict, prompt: str, label: str) -> Optional[str]:
+        """Completion text for a section prompt, retrying throttled and transient failures."""
+        import openai
+
+        openai_settings = self.settings["apis"]["openai"]
+        request = {
+            "model": openai_settings["model"],
+            "messages": [{"role": "system", "content": self.prompt.system}, {"role": "user", "content": prompt}],
+            "max_tokens": openai_settings["max_tokens"],
+            "temperature": openai_settings["temperature"],
+        }
+        max_retries = openai_settings.get("max_retries", 5)
+        base_delay = openai_settings.get("retry_base_delay", 1.0)
+        estimated_tokens = len(prompt) // 4 + openai_settings["max_tokens"]
+        retryable = (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError)
+        async with session["semaphore"]:
+            for attempt in range(max_retries + 1):
+                await session["limiter"].acquire(estimated_tokens)
+                try:
+                    response = await session["client"].chat.completions.create(**request)
+                except retryable as e:
+                    if attempt == max_retries:
+                        logger.error(f"Error generating {label}: giving up after {attempt + 1} attempts: {e}")
+                        return None
+                    delay = base_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
+                    logger.warning(f"Retrying {label} in {delay:.1f}s ({type(e).__name__})")
+                    await asyncio.sleep(delay)
+                    continue
+                except Exception as e:
+                    logger.error(f"Error generating {label}: {e}")
+                    return None
+                if response.usage is not None:
+                    self.stats["prompt_tokens"] += response.usage.prompt_tokens
+                    self.stats["completion_tokens"] += response.usage.completion_tokens
+                    session["limiter"].adjust(response.usage.total_tokens - estimated_tokens)
+                return (response.choices[0].message.content or "").strip() or None
+        return None
+
+    async def _node(self, session: Dict, company: str, program: str, section: str, inputs: Dict[str, Dict],
+                    input_hashes: Dict[str, str], upstream_tasks: Dict[str, "asyncio.Task"]) -> Optional[str]:
+        """Text of one section: cached if its hash is unchanged, otherwise generated and stored."""
+        label = f"{program}/{section}"
+        upstream = dict(zip(upstream_tasks, await asyncio.gather(*upstream_tasks.values())))
+        if any(text is None for text in upstream.values()):
+            self.stats["skipped"] += 1
+            logger.warning(f"Skipping {label}: a section it builds on was not generated")
+            return None
+        node_hash = self.node_hash(company, program, section, input_hashes, upstream)
+        cached = self.cache.get(company, program, section)
+        if cached is not None and cached[0] == node_hash:
+            self.stats["cached"] += 1
+            return cached[1]
+
+        if self.mode == "outline":
+            text = self.outline_section(section, inputs, upstream)
+        else:
+            text = await self._generate(session, self.section_prompt(company, program, section, inputs, upstream),
+                                        label)
+        if text is None:
+            self.stats["failed"] += 1
+            return None
+        self.cache.put(company, program, section, node_hash, text)
+        self.stats["generated"] += 1
+        logger.info(f"Generated {label}")
+        return text
+
+    async def build_async(self, targets: List[Tuple[str, str]], max_concurrent: Optional[int] = None) -> None:
+        """Bring every section of every target up to date, running independent nodes concurrently."""
+        session: Dict = {}
+        client = None
+        if self.mode == "llm":
+            import openai
+            from pipelines.mapping_engine.rate_limiter import AsyncRateLimiter
+
+            openai_settings = self.settings["apis"]["openai"]
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY environment variable not set")
+            if max_concurrent is None:
+                max_concurrent = self.playbook_settings.get(
+                    "max_concurrent", self.settings.get("job_processing", {}).get("max_concurrent_jobs", 10))
+            # Retries are handled in _generate, so the client must not retry on its own
+            client = openai.AsyncOpenAI(api_key=api_key, base_url=openai_settings.get("base_url"),
+                                        timeout=openai_settings.get("timeout", 60), max_retries=0)
+            session = {
+                "client": client,
+                "limiter": AsyncRateLimiter(openai_settings.get("requests_per_minute", 500),
+                                            openai_settings.get("tokens_per_minute", 300000)),
+                "semaphore": asyncio.Semaphore(max(1, max_concurrent)),
+            }
+        try:
+            tasks = []
+            for company, program in targets:
+                inputs = self.data.inputs(company, program)
+                input_hashes = {name: digest(value) for name, value in inputs.items()}
+                nodes: Dict[str, asyncio.Task] = {}
+                # The graph is in dependency order, so upstream tasks already exist
+                for section, node in self.graph.items():
+                    nodes[section] = asyncio.ensure_future(self._node(
+                        session, company, program, section, inputs, input_hashes,
+                        {name: nodes[name] for name in node["after"]}))
+                tasks.extend(nodes.values())
+            await asyncio.gather(*tasks)
+        finally:
+            if client is not None:
+                await client.close()
+
+    def assemble(self, company: str, program: str) -> str:
+        """Markdown playbook from the cached section texts, in prompt order."""
+        full_name = self.knowledge_base.programs.get(program, {}).get("full_name", "")
+        lines = [f"# BD Playbook: {company} - {program} Program", ""]
+        if full_name:
+            lines += [f"_{full_name}_", ""]
+        max_sections = self.playbook_settings.get("max_sections")
+        sections = [key for key in self.prompt.sections if key in self.graph][:max_sections]
+        for section in sections:
+            title = self.prompt.sections[section]["title"]
+            cached = self.cache.get(company, program, section)
+            lines += [f"## {title}", ""]
+            if cached is None:
+                lines += ["_Not generated yet._", ""]
+                continue
+            body = cached[1].strip()
+            # Models sometimes repeat the heading they were told to leave out
+            first, _, rest = body.partition("\n")
+            if first.lstrip("#").strip().lower() == title.lower():
+                body = rest.strip()
+            lines += [body, ""]
+        return "\n".join(lines)
+
+    def render(self, company: str, program: str, base_path: str, formats: Optional[List[str]] = None) -> List[str]:
+        formats = formats or self.playbook_settings.get("output_formats", ["markdown"])
+        return render_playbook(self.assemble(company, program), f"BD Playbook: {company} - {program}",
+                               base_path, formats)
+
+    def close(self) -> None:
+        self.cache.close()
+        if self.data.trend_store is not None:
+            self.data.trend_store.close()
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Generate BD playbooks per company and program")
+    parser.add_argument("--company", help="Target company (default: each program's prime contractor)")
+    parser.add_argument("--program", "-p", action="append", default=[], help="Program code (repeatable)")
+    parser.add_argument("--all", action="store_true", help="Build a playbook for every program")
+    parser.add_argument("--output", "-o",
+                        help="Output path for a single playbook; other formats use the same name with their extension")
+    parser.add_argument("--formats", help="Comma-separated formats (default: playbook.output_formats)")
+    parser.add_argument("--mode", "-m", choices=PLAYBOOK_MODES, default="llm",
+                        help="llm: generate with OpenAI; outline: offline drafts from the data, no API key needed")
+    parser.add_argument("--render-only", action="store_true", help="Render cached sections without generating")
+    parser.add_argument("--max-concurrent", type=int, help="In-flight request limit (default: playbook.max_concurrent)")
+    parser.add_argument("--mappings", help="Job mappings JSON/JSONL (default: scoring.mappings_path)")
+    parser.add_argument("--jobs", help="Normalized jobs JSON (default: scoring.jobs_path)")
+    parser.add_argument("--config", "-c", default="config/settings.yaml", help="Configuration file")
+    args = parser.parse_args()
+
+    builder = PlaybookBuilder(args.config, mode=args.mode, mappings_path=args.mappings, jobs_path=args.jobs)
+    try:
+        targets = builder.targets(args.company, args.program, args.all)
+        if not targets:
+            parser.error("Nothing to build: pass --program, a --company with known programs, or --all")
+        if args.output and len(targets) > 1:
+            parser.error("--output names a single playbook; omit it to write one per program to playbook.output_dir")
+
+        if not args.render_only:
+            started = time.perf_counter()
+            asyncio.run(builder.build_async(targets, args.max_concurrent))
+            stats = builder.stats
+            logger.info(f"Sections: {stats['generated']} generated, {stats['cached']} unchanged, "
+                        f"{stats['failed']} failed, {stats['skipped']} skipped "
+                        f"({time.perf_counter() - started:.1f}s"
+                        + (f", {stats['prompt_tokens']} prompt + {stats['completion_tokens']} completion tokens)"
+                           if stats["prompt_tokens"] else ")"))
+            if stats["failed"] or stats["skipped"]:
+                logger.warning("Failed sections keep their last generated text in the rendered playbooks")
+
+        formats = [f.strip() for f in args.formats.split(",")] if args.formats else None
+        output_dir = builder.playbook_settings.get("output_dir", "outputs/playbooks")
+        for company, program in targets:
+            base_path = (os.path.splitext(args.output)[0] if args.output
+                         else os.path.join(output_dir, f"{_slug(company)}_{_slug(program)}_playbook"))
+            for path in builder.render(company, program, base_path, formats):
+                print(f"Playbook saved to: {path}")
+    finally:
+        builder.close()
+
+
+if __name__ == "__main__":
+    main()
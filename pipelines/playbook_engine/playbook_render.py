@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Playbook Renderers
+Writes an assembled markdown playbook to the settings.playbook.output_formats. Markdown and HTML
+need nothing beyond the standard library; DOCX uses python-docx and PDF uses reportlab, each
+imported only when that format is requested.
+"""
+
+import html
+import logging
+import os
+import re
+from typing import Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+BULLET_RE = re.compile(r"^(\s*)[-*+]\s+(.*)$")
+NUMBERED_RE = re.compile(r"^(\s*)\d+[.)]\s+(.*)$")
+# **bold**, or _italic_ / *italic* not inside a word (so snake_case names stay intact)
+INLINE_RE = re.compile(r"\*\*(.+?)\*\*|(?<![\w*])[_*](?![_*\s])(.+?)(?<![\s_*])[_*](?![\w*])")
+
+# (kind, level, text): kind is heading, bullet, number or paragraph; level is the heading
+# depth or list nesting (0 for top-level items)
+Block = Tuple[str, int, str]
+
+
+def parse_markdown(text: str) -> List[Block]:
+    """Block structure of the markdown subset playbooks use (headings, lists, paragraphs)."""
+    blocks: List[Block] = []
+    paragraph: List[str] = []
+
+    def flush() -> None:
+        if paragraph:
+            blocks.append(("paragraph", 0, " ".join(paragraph)))
+            paragraph.clear()
+
+    in_fence = False
+    for line in text.splitlines():
+        if line.strip().startswith("```"):
+            flush()
+            in_fence = not in_fence
+            continue
+        if in_fence or not line.strip():
+            if in_fence and line.strip():
+                blocks.append(("paragraph", 0, line.strip()))
+            else:
+                flush()
+            continue
+        for kind, pattern in (("heading", HEADING_RE), ("bullet", BULLET_RE), ("number", NUMBERED_RE)):
+            match = pattern.match(line)
+            if match:
+                flush()
+                level = len(match.group(1)) if kind == "heading" else len(match.group(1).expandtabs(4)) // 2
+                blocks.append((kind, level, match.group(2).strip()))
+                break
+        else:
+            paragraph.append(line.strip())
+    flush()
+    return blocks
+
+
+def inline_runs(text: str) -> List[Tuple[str, bool, bool]]:
+    """(text, bold, italic) runs of a line with markdown emphasis."""
+    runs = []
+    position = 0
+    for match in INLINE_RE.finditer(text):
+        if match.start() > position:
+            runs.append((text[position:match.start()], False, False))
+        if match.group(1) is not None:
+            runs.append((match.group(1), True, False))
+        else:
+            runs.append((match.group(2), False, True))
+        position = match.end()
+    if position < len(text):
+        runs.append((text[position:], False, False))
+    return runs
+
+
+def _inline_markup(text: str, bold: Tuple[str, str], italic: Tuple[str, str]) -> str:
+    parts = []
+    for run, is_bold, is_italic in inline_runs(text):
+        run = html.escape(run, quote=False)
+        tags = bold if is_bold else italic if is_italic else ("", "")
+        parts.append(f"{tags[0]}{run}{tags[1]}")
+    return "".join(parts)
+
+
+def render_html(markdown_text: str, title: str) -> str:
+    """Standalone HTML page for a markdown playbook."""
+    body: List[str] = []
+    # Open list tags; each has an <li> still open, so nested lists land inside it
+    open_lists: List[str] = []
+
+    def close_lists(depth: int = 0) -> None:
+        while len(open_lists) > depth:
+            body.append(f"</li></{open_lists.pop()}>")
+
+    for kind, level, text in parse_markdown(markdown_text):
+        markup = _inline_markup(text, ("<strong>", "</strong>"), ("<em>", "</em>"))
+        if kind in ("bullet", "number"):
+            tag = "ul" if kind == "bullet" else "ol"
+            close_lists(level + 1)
+            if len(open_lists) == level + 1 and open_lists[-1] != tag:
+                close_lists(level)
+            if len(open_lists) == level + 1:
+                body.append("</li>")
+            while len(open_lists) < level + 1:
+                open_lists.append(tag)
+                body.append(f"<{tag}>")
+            body.append(f"<li>{markup}")
+            continue
+        close_lists()
+        if kind == "heading":
+            body.append(f"<h{level}>{markup}</h{level}>")
+        else:
+            body.append(f"<p>{markup}</p>")
+    close_lists()
+    return (f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>{html.escape(title)}</title>\n"
+            f"</head>\n<body>\n" + "\n".join(body) + "\n</body>\n</html>\n")
+
+
+def _write_markdown(markdown_text: str, title: str, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(markdown_text)
+
+
+def _write_html(markdown_text: str, title: str, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_html(markdown_text, title))
+
+
+def _write_docx(markdown_text: str, title: str, path: str) -> None:
+    import docx
+
+    document = docx.Document()
+    document.core_properties.title = title
+    for kind, level, text in parse_markdown(markdown_text):
+        if kind == "heading":
+            document.add_heading("".join(run for run, _, _ in inline_runs(text)), level=min(level - 1, 9))
+            continue
+        style = {"bullet": "List Bullet", "number": "List Number"}.get(kind)
+        if style and level:
+            style = f"{style} {min(level + 1, 3)}"
+        paragraph = document.add_paragraph(style=style)
+        for run, bold, italic in inline_runs(text):
+            added = paragraph.add_run(run)
+            added.bold = bold
+            added.italic = italic
+    document.save(path)
+
+
+def _write_pdf(markdown_text: str, title: str, path: str) -> None:
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    styles = getSampleStyleSheet()
+    story = []
+    for kind, level, text in parse_markdown(markdown_text):
+        markup = _inline_markup(text, ("<b>", "</b>"), ("<i>", "</i>"))
+        if kind == "heading":
+            story.append(Paragraph(markup, styles[f"Heading{min(level, 6)}"]))
+        elif kind in ("bullet", "number"):
+            bullet = "•" if kind == "bullet" else "-"
+            story.append(Paragraph(markup, styles["Normal"], bulletText=bullet))
+        else:
+            story.append(Paragraph(markup, styles["Normal"]))
+            story.append(Spacer(1, 6))
+    SimpleDocTemplate(path, title=title).build(story)
+
+
+RENDERERS: Dict[str, Tuple[str, Callable[[str, str, str], None]]] = {
+    "markdown": ("md", _write_markdown),
+    "html": ("html", _write_html),
+    "docx": ("docx", _write_docx),
+    "pdf": ("pdf", _write_pdf),
+}
+
+
+def render_playbook(markdown_text: str, title: str, base_path: str, formats: List[str]) -> List[str]:
+    """Write the playbook as base_path.<ext> for each format; returns the paths written.
+
+    Formats whose optional library is not installed are skipped with a warning.
+    """
+    directory = os.path.dirname(base_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    written = []
+    for name in formats:
+        if name not in RENDERERS:
+            logger.warning(f"Unknown playbook output format {name!r} (expected one of {', '.join(RENDERERS)})")
+            continue
+        extension, write = RENDERERS[name]
+        path = f"{base_path}.{extension}"
+        try:
+            write(markdown_text, title, path)
+        except ImportError as e:
+            logger.warning(f"Skipping {name} output: {e.name} is not installed")
+            continue
+        written.append(path)
+    return written
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Program Scoring Engine for PrimeTime BD Intel
+Builds a programs x factors matrix from job mappings, normalized jobs and the program knowledge
+base, then scores every program 0-100 against settings.scoring.program_weights in one matrix
+product. What-if weight sets are scored together as a second matrix.
+
+Usage:
+    python score_programs.py -m data/job_mappings.json -j data/jobs_normalized.json --what-if what_if.yaml
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import yaml
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.knowledge_base import ProgramKnowledgeBase, code_key, load_knowledge_base, normalize
+from config.settings import load_settings
+from pipelines.common.files import load_records
+
+logger = logging.getLogger(__name__)
+
+# Columns of the factor matrix; settings.scoring.program_weights names any subset of them
+FACTORS = ("contract_value", "clearance_level", "location_match", "skill_match", "company_reputation",
+           "job_demand")
+
+# Numbers glued to letters ("FY2025", "F-35A") are not amounts
+CONTRACT_VALUE_RE = re.compile(r"(\$)?\s*(?<![\w.])([\d,]*\.?\d+)\s*(k|m|b|t|thousand|million|billion|trillion)?\b",
+                               re.IGNORECASE)
+MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "m": 1e6, "million": 1e6, "b": 1e9, "billion": 1e9,
+               "t": 1e12, "trillion": 1e12}
+# Contract values are compared on a log scale from $1M up to the largest program
+CONTRACT_VALUE_FLOOR = 1e6
+# Mapping confidence weights a job's contribution; keep unscored mappings from vanishing
+MIN_CONFIDENCE = 0.05
+
+
+def parse_contract_value(text) -> float:
+    """Dollars in a contract value like "13.3B", "$1.7 trillion" or "850M" (0.0 if unparsable).
+
+    The first amount with a "$" or a magnitude wins over bare numbers, so "FY2025 $500M" is 500M.
+    """
+    if isinstance(text, (int, float)):
+        return float(text)
+    matches = list(CONTRACT_VALUE_RE.finditer(str(text or "")))
+    if not matches:
+        return 0.0
+    match = next((m for m in matches if m.group(1) or m.group(3)), matches[0])
+    value = float(match.group(2).replace(",", ""))
+    return value * MULTIPLIERS.get((match.group(3) or "").lower(), 1.0)
+
+
+def clearance_key(level: str) -> str:
+    """settings.scoring.clearance_scores key for a clearance level ("TS/SCI" -> "TS_SCI")."""
+    return re.sub(r"[^A-Za-z0-9]+", "_", (level or "").strip()) or "None"
+
+
+def load_mappings(path: str) -> List[Dict]:
+    """Mapping results from a JSON array or a JSONL checkpoint."""
+    return load_records(path)
+
+
+class LocationScorer:
+    """Job location -> settings.scoring.location_scores tier, memoized per location string."""
+
+    def __init__(self, knowledge_base: ProgramKnowledgeBase, location_scores: Dict[str, float]):
+        locations = knowledge_base.locations
+        self.primary = {normalize(s) for s in locations.get("primary_states", [])}
+        self.secondary = {normalize(s) for s in locations.get("secondary_states", [])}
+        hubs = list(locations.get("clearance_hubs", [])) + list(knowledge_base.clearance_hubs)
+        self.hubs = sorted({normalize(h) for h in hubs})
+        self.scores = location_scores
+        self._memo: Dict[str, float] = {}
+
+    def score(self, location: str) -> float:
+        score = self._memo.get(location)
+        if score is None:
+            key = normalize(location)
+            parts = {part.strip() for part in key.split(",")} | {key}
+            tiers = ["other"]
+            if any(hub in key for hub in self.hubs):
+                tiers.append("clearance_hub")
+            if parts & self.primary:
+                tiers.append("primary_state")
+            if parts & self.secondary:
+                tiers.append("secondary_state")
+            score = max(float(self.scores.get(tier, 0.0)) for tier in tiers) if key else 0.0
+            self._memo[location] = score
+        return score
+
+
+class ProgramFactors:
+    """Programs x FACTORS matrix with every factor scaled to [0, 1].
+
+    Job-derived factors (clearance, location, skills, demand) are
+    confidence-weighted over the (job, program) pairs of the mappings, built
+    as flat columns and reduced with np.bincount. Programs whose mapped jobs
+    state no clearance or location fall back to the highest-scoring clearance
+    level or location in programs_dictionary.json.
+    """
+
+    def __init__(self, codes: List[str], matrix: np.ndarray, job_counts: np.ndarray):
+        self.codes = codes
+        self.matrix = matrix
+        self.job_counts = job_counts
+
+    @classmethod
+    def build(cls, knowledge_base: ProgramKnowledgeBase, scoring: Dict, mappings: Sequence[Dict] = (),
+              jobs: Sequence[Dict] = ()) -> "ProgramFactors":
+        programs = knowledge_base.programs
+        codes = list(programs)
+        index = {code_key(code): i for i, code in enumerate(codes)}
+        clearance_scores = scoring.get("clearance_scores", {})
+        locations = LocationScorer(knowledge_base, scoring.get("location_scores", {}))
+        matrix = np.zeros((len(codes), len(FACTORS)))
+        column = {name: i for i, name in enumerate(FACTORS)}
+
+        # Dictionary factors
+        values = np.array([parse_contract_value(programs[code].get("contract_value")) for code in codes])
+        if len(values) and values.max() > CONTRACT_VALUE_FLOOR:
+            scaled = np.log10(np.maximum(values, CONTRACT_VALUE_FLOOR) / CONTRACT_VALUE_FLOOR)
+            matrix[:, column["contract_value"]] = scaled / scaled.max()
+        prime_sizes = np.array([len(knowledge_base.programs_for_prime(programs[code].get("prime_contractor", "")))
+                                for code in codes], dtype=float)
+        if len(prime_sizes) and prime_sizes.max() > 0:
+            matrix[:, column["company_reputation"]] = prime_sizes / prime_sizes.max()
+        default_clearance = np.array([max([float(clearance_scores.get(clearance_key(level), 0.0))
+                                           for level in programs[code].get("clearance_levels", [])] or [0.0])
+                                      for code in codes])
+        default_location = np.array([max([locations.score(loc) for loc in programs[code].get("locations", [])]
+                                         or [0.0]) for code in codes])
+
+        # Job factors, as one row per (mapping, program) pair
+        jobs_by_id = {str(job.get("job_id")): job for job in jobs}
+        pair_program: List[int] = []
+        pair_mapping: List[int] = []
+        confidence: List[float] = []
+        job_clearance: List[str] = []
+        job_location: List[str] = []
+        # Mappings repeat a handful of spellings per program; resolve each once
+        resolved: Dict[str, Optional[int]] = {}
+        for m, mapping in enumerate(mappings):
+            job = jobs_by_id.get(str(mapping.get("job_id"))) or {}
+            for code in mapping.get("mapped_programs") or []:
+                p = resolved.get(code, -1)
+                if p == -1:
+                    p = resolved[code] = index.get(code_key(str(code)))
+                if p is None:
+                    continue
+                pair_program.append(p)
+                pair_mapping.append(m)
+                confidence.append(float(mapping.get("confidence_score") or 0.0))
+                job_clearance.append(job.get("clearance_level") or "")
+                job_location.append(job.get("location") or "")
+
+        pair_program_arr = np.array(pair_program, dtype=np.intp)
+        weights = np.clip(np.array(confidence), MIN_CONFIDENCE, 1.0)
+        demand = np.bincount(pair_program_arr, weights=weights, minlength=len(codes))
+        job_counts = np.bincount(pair_program_arr, minlength=len(codes))
+        if demand.max(initial=0.0) > 0:
+            matrix[:, column["job_demand"]] = np.log1p(demand) / np.log1p(demand.max())
+
+        # Clearance and location: score each distinct value once, then gather per pair.
+        # Jobs that do not state one count as unknown rather than as a zero score.
+        for name, raw, default, scorer in (
+                ("clearance_level", job_clearance, default_clearance,
+                 lambda v: float(clearance_scores.get(clearance_key(v), 0.0))),
+                ("location_match", job_location, default_location, locations.score)):
+            known_total = np.zeros(len(codes))
+            totals = np.zeros(len(codes))
+            if raw:
+                distinct, inverse = np.unique(np.array(raw), return_inverse=True)
+                known_weights = np.where(distinct[inverse] != "", weights, 0.0)
+                pair_scores = np.array([scorer(value) if value else 0.0 for value in distinct])[inverse]
+                known_total = np.bincount(pair_program_arr, weights=known_weights, minlength=len(codes))
+                totals = np.bincount(pair_program_arr, weights=known_weights * pair_scores, minlength=len(codes))
+            mean = np.divide(totals, known_total, out=np.zeros(len(codes)), where=known_total > 0)
+            matrix[:, column[name]] = np.where(known_total > 0, mean, default)
+
+        # Skills: share of each program's skill terms seen in its mapped jobs
+        matrix[:, column["skill_match"]] = cls._skill_coverage(knowledge_base, codes, mappings,
+                                                               pair_program_arr, np.array(pair_mapping, dtype=np.intp))
+        return cls(codes, matrix, job_counts)
+
+    @staticmethod
+    def _skill_coverage(knowledge_base: ProgramKnowledgeBase, codes: List[str], mappings: Sequence[Dict],
+                        pair_program: np.ndarray, pair_mapping: np.ndarray) -> np.ndarray:
+        terms: Dict[str, int] = {}
+        program_terms: List[Tuple[int, int]] = []
+        for p, code in enumerate(codes):
+            details = knowledge_base.programs[code]
+            for term in details.get("key_skills", []) + knowledge_base.program_keywords.get(code, []):
+                program_terms.append((p, terms.setdefault(normalize(term), len(terms))))
+        coverage = np.zeros(len(codes))
+        if not terms or not len(pair_program):
+            return coverage
+        skills = np.zeros((len(codes), len(terms)), dtype=bool)
+        skills[tuple(np.array(program_terms).T)] = True
+
+        # Terms found per mapping, flattened in mapping order (CSR style)
+        hit_mapping: List[int] = []
+        hit_term: List[int] = []
+        term_ids: Dict[str, Optional[int]] = {}
+        for m, mapping in enumerate(mappings):
+            for keyword in mapping.get("keywords_found") or []:
+                t = term_ids.get(keyword, -1)
+                if t == -1:
+                    t = term_ids[keyword] = terms.get(normalize(keyword))
+                if t is not None:
+                    hit_mapping.append(m)
+                    hit_term.append(t)
+        seen = np.zeros((len(codes), len(terms)), dtype=bool)
+        if hit_term:
+            per_mapping = np.bincount(hit_mapping, minlength=len(mappings))
+            starts = np.cumsum(per_mapping) - per_mapping
+            # Join pairs to their mapping's terms: one row per (pair, term)
+            lengths = per_mapping[pair_mapping]
+            rows = np.repeat(np.arange(len(pair_mapping)), lengths)
+            offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            seen[pair_program[rows], np.array(hit_term)[starts[pair_mapping][rows] + offsets]] = True
+        counts = skills.sum(axis=1)
+        return np.divide((seen & skills).sum(axis=1), counts, out=coverage, where=counts > 0)
+
+
+class ProgramScorer:
+    """0-100 program scores as factors @ normalized weights, for one or many weight sets."""
+
+    def __init__(self, factors: ProgramFactors):
+        self.factors = factors
+
+    @staticmethod
+    def weight_matrix(weight_sets: Sequence[Dict[str, float]]) -> np.ndarray:
+        """Weight sets x FACTORS, each row scaled to sum to 1 (absent factors weigh 0)."""
+        weights = np.zeros((len(weight_sets), len(FACTORS)))
+        for row, weight_set in enumerate(weight_sets):
+            unknown = set(weight_set) - set(FACTORS)
+            if unknown:
+                raise ValueError(f"Unknown scoring factors: {', '.join(sorted(unknown))} "
+                                 f"(expected some of {', '.join(FACTORS)})")
+            for name, value in weight_set.items():
+                weights[row, FACTORS.index(name)] = float(value)
+        if (weights < 0).any():
+            raise ValueError("Scoring weights must not be negative")
+        totals = weights.sum(axis=1, keepdims=True)
+        return np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+
+    def score(self, weights: Dict[str, float]) -> np.ndarray:
+        """Score per program for one weight set."""
+        return self.score_many([weights])[0]
+
+    def score_many(self, weight_sets: Sequence[Dict[str, float]]) -> np.ndarray:
+        """Weight sets x programs score matrix, in one matrix product."""
+        return 100.0 * self.weight_matrix(weight_sets) @ self.factors.matrix.T
+
+    @staticmethod
+    def ranking(scores: np.ndarray) -> np.ndarray:
+        """Program indices from best to worst, per row of scores (stable on ties)."""
+        return np.argsort(-scores, axis=-1, kind="stable")
+
+    def results(self, scores: np.ndarray, top: Optional[int] = None, with_factors: bool = True) -> List[Dict]:
+        """Ranked program records for one row of scores."""
+        order = self.ranking(scores)[:top]
+        records = []
+        for rank, p in enumerate(order, 1):
+            record = {"program": self.factors.codes[p], "rank": rank, "score": round(float(scores[p]), 2)}
+            if with_factors:
+                record["job_count"] = int(self.factors.job_counts[p])
+                record["factors"] = {name: round(float(value), 4)
+                                     for name, value in zip(FACTORS, self.factors.matrix[p])}
+            records.append(record)
+        return records
+
+
+def load_what_if(path: str) -> Dict[str, Dict[str, float]]:
+    """Named weight sets from a YAML/JSON mapping of name -> {factor: weight}."""
+    with open(path, "r", encoding="utf-8") as f:
+        weight_sets = yaml.safe_load(f) or {}
+    if not isinstance(weight_sets, dict) or not all(isinstance(w, dict) for w in weight_sets.values()):
+        raise ValueError(f"{path} must map scenario names to {{factor: weight}} sets")
+    return weight_sets
+
+
+def _optional_json(path: Optional[str], what: str) -> List[Dict]:
+    if not path:
+        return []
+    if not os.path.exists(path):
+        logger.warning(f"No {what} at {path}; scoring from the programs dictionary only")
+        return []
+    return load_mappings(path)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Score defense programs by opportunity potential")
+    parser.add_argument("--mappings", "-m", help="Job mappings JSON/JSONL (default: scoring.mappings_path)")
+    parser.add_argument("--jobs", "-j", help="Normalized jobs JSON (default: scoring.jobs_path)")
+    parser.add_argument("--output", "-o", help="Scores JSON (default: scoring.output_path)")
+    parser.add_argument("--what-if", "-w", help="YAML/JSON file of named weight sets to score alongside")
+    parser.add_argument("--top", "-n", type=int, help="Only report the top N programs")
+    parser.add_argument("--config", "-c", default="config/settings.yaml", help="Configuration file")
+    args = parser.parse_args()
+
+    settings = load_settings(args.config)
+    scoring = settings.get("scoring", {})
+    mappings = _optional_json(args.mappings or scoring.get("mappings_path"), "job mappings")
+    jobs = _optional_json(args.jobs or scoring.get("jobs_path"), "normalized jobs")
+    output_path = args.output or scoring.get("output_path", "data/program_scores.json")
+
+    factors = ProgramFactors.build(load_knowledge_base(args.config), scoring, mappings, jobs)
+    scorer = ProgramScorer(factors)
+    weights = scoring.get("program_weights", {})
+    what_if = load_what_if(args.what_if) if args.what_if else {}
+    # Configured weights first, then every scenario, in one pass
+    scores = scorer.score_many([weights] + list(what_if.values()))
+
+    report = {
+        "weights": weights,
+        "programs": scorer.results(scores[0], args.top),
+        "what_if": {name: {"weights": weight_set, "programs": scorer.results(row, args.top, with_factors=False)}
+                    for (name, weight_set), row in zip(what_if.items(), scores[1:])},
+    }
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Scored {len(factors.codes)} programs from {len(mappings)} mappings; saved to {output_path}")
+
+    for record in report["programs"]:
+        print(f"{record['rank']:>3}. {record['program']:<12} {record['score']:6.2f}  ({record['job_count']} jobs)")
+    for name, scenario in report["what_if"].items():
+        ranked = ", ".join(f"{r['program']} {r['score']:.1f}" for r in scenario["programs"][:5])
+        print(f"What-if {name}: {ranked}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Normalizer Micro-Benchmark
+Measures JobNormalizer throughput (jobs/sec) against the original per-call implementation.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from pipelines.scraper_engine.date_parser import DateParser
+from pipelines.scraper_engine.normalize_jobs import JobNormalizer
+
+SAMPLE_LOCATIONS = [
+    'Roy, UT', 'Palmdale,  CA', 'Fort Worth, TX', 'Huntsville, AL',
+    'Colorado Springs, CO', 'Chantilly, VA', 'Annapolis Junction, MD',
+    'Washington, DC', 'San Juan, PR', 'Remote', 'Ogden, UT 84401',
+]
+
+SAMPLE_TITLES = [
+    'Systems Engineer', 'Sr. Software Engineer  (TS/SCI)', 'Cyber Security Analyst',
+    'Network Administrator', 'ISSO', 'Program Manager - Sentinel',
+]
+
+SAMPLE_DESCRIPTIONS = [
+    '<p>Support the GBSD program. Active <b>TS/SCI</b> clearance required.</p>',
+    '<div>Must hold a Top Secret clearance with polygraph &amp; be able to travel.</div>',
+    'Secret clearance or ability to obtain. Experience with Windows &amp; Linux.',
+    '<ul><li>Confidential clearance</li><li>5+ years experience</li></ul>',
+    'No clearance mentioned; government contracts experience preferred.',
+]
+
+SAMPLE_DATES = ['2024-03-01', '03/15/2024', 'March 01, 2024', 'Posted 3 days ago', '']
+
+LEGACY_DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%B %d, %Y', '%b %d, %Y']
+
+
+class LegacyJobNormalizer(JobNormalizer):
+    """The pre-compilation hot paths, kept only as a benchmark baseline."""
+
+    legacy_clearance_patterns = {
+        'TS/SCI': r'\b(?:TS/SCI|Top\s+Secret/SCI|Top\s+Secret\s+SCI)\b',
+        'TS': r'\b(?:TS|Top\s+Secret)\b',
+        'Secret': r'\b(?:Secret|SECRET)\b',
+        'Confidential': r'\b(?:Confidential|CONFIDENTIAL)\b'
+    }
+
+    def _normalize_date(self, date_str: str, scraped_at: Optional[str] = None) -> str:
+        return legacy_normalize_date(date_str)
+
+    def _normalize_company(self, company: str) -> str:
+        if not company:
+            return ""
+        company_mappings = {
+            'apex systems': 'Apex Systems',
+            'insight global': 'Insight Global',
+            'clearancejobs': 'ClearedJobs',
+            'clearedjobs.com': 'ClearedJobs'
+        }
+        normalized = company.strip().lower()
+        return company_mappings.get(normalized, company.strip())
+
+    def _normalize_location(self, location: str) -> str:
+        if not location:
+            return ""
+        normalized = re.sub(r'\s+', ' ', location.strip())
+        state_mappings = {
+            'CA': 'California', 'TX': 'Texas', 'VA': 'Virginia', 'MD': 'Maryland',
+            'FL': 'Florida', 'WA': 'Washington', 'MO': 'Missouri',
+            'CT': 'Connecticut', 'UT': 'Utah', 'CO': 'Colorado'
+        }
+        for abbr, full_name in state_mappings.items():
+            normalized = re.sub(rf'\b{abbr}\b', full_name, normalized, flags=re.IGNORECASE)
+        return normalized
+
+    def _extract_clearance(self, description: str) -> Optional[str]:
+        if not description:
+            return None
+        description_upper = description.upper()
+        for clearance, pattern in self.legacy_clearance_patterns.items():
+            if re.search(pattern, description_upper):
+                return clearance
+        return None
+
+    def _clean_description(self, description: str) -> str:
+        if not description:
+            return ""
+        cleaned = re.sub(r'<[^>]+>', '', description)
+        cleaned = re.sub(r'\s+', ' ', cleaned)
+        cleaned = re.sub(r'[^\w\s\-.,!?()]', '', cleaned)
+        return cleaned.strip()
+
+
+def legacy_normalize_date(date_str: str) -> str:
+    """The original strptime loop from JobNormalizer._normalize_date."""
+    if not date_str:
+        return datetime.now().isoformat()
+    for fmt in LEGACY_DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt).isoformat()
+        except ValueError:
+            continue
+    return datetime.now().isoformat()
+
+
+def make_jobs(count: int, seed: int = 42) -> List[Dict]:
+    """Build a synthetic batch of raw jobs shaped like the spider output."""
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(count):
+        jobs.append({
+            'job_id': f"insight_{100000 + i}",
+            'title': rng.choice(SAMPLE_TITLES),
+            'company': rng.choice(['Insight Global', 'apex systems', 'Northrop Grumman']),
+            'location': rng.choice(SAMPLE_LOCATIONS),
+            'description': ' '.join(rng.choice(SAMPLE_DESCRIPTIONS) for _ in range(8)),
+            'url': f"https://jobs.insightglobal.com/job/{100000 + i}",
+            'posted_date': rng.choice(SAMPLE_DATES),
+            'source': 'Insight Global',
+            'scraped_at': '2024-03-04T12:00:00',
+        })
+    return jobs
+
+
+def time_normalizer(normalizer: JobNormalizer, jobs: List[Dict], repeat: int) -> float:
+    """Return the best jobs/sec over `repeat` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for job in jobs:
+            normalizer.normalize_job(job)
+        best = min(best, time.perf_counter() - start)
+    return len(jobs) / best
+
+
+def time_parallel(normalizer: JobNormalizer, jobs: List[Dict], workers: int) -> float:
+    """Return jobs/sec for normalize_many() across `workers` processes."""
+    start = time.perf_counter()
+    for _ in normalizer.normalize_many(jobs, workers=workers):
+        pass
+    return len(jobs) / (time.perf_counter() - start)
+
+
+def time_dates(dates: List[str], repeat: int) -> Dict[str, float]:
+    """Return dates/sec for the legacy strptime loop and for DateParser."""
+    reference = datetime(2024, 3, 4, 12, 0)
+    rates = {}
+    for label, parse in (
+        ('legacy', legacy_normalize_date),
+        ('parser', lambda value, parser=DateParser(): parser.parse(value, reference)),
+    ):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for value in dates:
+                parse(value)
+            best = min(best, time.perf_counter() - start)
+        rates[label] = len(dates) / best
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark job normalization throughput')
+    parser.add_argument('--jobs', '-n', type=int, default=20000, help='Number of synthetic jobs')
+    parser.add_argument('--repeat', '-r', type=int, default=3, help='Timing repetitions (best is reported)')
+    parser.add_argument('--workers', '-w', type=int, default=0,
+                        help='Also time normalize_many() with this many worker processes')
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.jobs)
+    before = time_normalizer(LegacyJobNormalizer(), jobs, args.repeat)
+    after = time_normalizer(JobNormalizer(), jobs, args.repeat)
+
+    print(f"jobs:    {len(jobs)}")
+    print(f"before:  {before:,.0f} jobs/sec")
+    print(f"after:   {after:,.0f} jobs/sec")
+    print(f"speedup: {after / before:.2f}x")
+
+    dates = [job['posted_date'] for job in jobs]
+    date_rates = time_dates(dates, args.repeat)
+    print(f"dates:   {date_rates['legacy']:,.0f} -> {date_rates['parser']:,.0f} dates/sec "
+          f"({date_rates['parser'] / date_rates['legacy']:.2f}x)")
+
+    if args.workers > 1:
+        parallel = time_parallel(JobNormalizer(), jobs, args.workers)
+        print(f"workers: {args.workers} -> {parallel:,.0f} jobs/sec ({parallel / after:.2f}x single core)")
+
+
+if __name__ == "__main__":
+    main()
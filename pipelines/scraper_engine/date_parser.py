@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Posted Date Parser
+Parses scraped posting dates, including relative phrases such as "Posted 3 days ago".
+"""
+
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
+
+DATE_CACHE_SIZE = 4096
+
+ISO_DATE_RE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})(?:[T ].*)?$')
+SLASH_DATE_RE = re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{4})$')
+MONTH_NAME_DATE_RE = re.compile(r'^([A-Za-z]+)\.?\s+(\d{1,2}),?\s+(\d{4})$')
+RELATIVE_DATE_RE = re.compile(
+    r'\b(\d+|an?|one)\+?\s*(minute|min|hour|hr|day|week|wk|month|year)s?\s+ago\b',
+    re.IGNORECASE
+)
+TODAY_RE = re.compile(r'\b(?:today|just\s+posted)\b', re.IGNORECASE)
+YESTERDAY_RE = re.compile(r'\byesterday\b', re.IGNORECASE)
+
+MONTHS = {
+    name: number
+    for number, names in enumerate([
+        ('jan', 'january'), ('feb', 'february'), ('mar', 'march'), ('apr', 'april'),
+        ('may',), ('jun', 'june'), ('jul', 'july'), ('aug', 'august'),
+        ('sep', 'sept', 'september'), ('oct', 'october'), ('nov', 'november'), ('dec', 'december'),
+    ], start=1)
+    for name in names
+}
+
+# Relative units resolved to a timedelta; months and years are approximated
+RELATIVE_UNITS = {
+    'minute': timedelta(minutes=1), 'min': timedelta(minutes=1),
+    'hour': timedelta(hours=1), 'hr': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1), 'wk': timedelta(weeks=1),
+    'month': timedelta(days=30),
+    'year': timedelta(days=365),
+}
+SUB_DAY_UNITS = {'minute', 'min', 'hour', 'hr'}
+
+
+class DateParser:
+    """Parses posted dates with a format-sniffing fast path and an LRU cache.
+
+    Parse results are cached by raw string. Relative phrases are cached as an
+    offset and resolved against the caller's reference time (normally the
+    record's `scraped_at`), so one cache entry serves every scrape run.
+    """
+
+    def __init__(self, cache_size: int = DATE_CACHE_SIZE):
+        self._parse_cached = lru_cache(maxsize=cache_size)(self._parse_raw)
+
+    def parse(self, date_str: str, reference: Optional[datetime] = None) -> Optional[datetime]:
+        """Return the posting datetime, or None if the string is not recognized."""
+        if not date_str:
+            return None
+
+        kind, value = self._parse_cached(date_str)
+        if kind == 'absolute':
+            return value
+        if kind == 'relative':
+            offset, sub_day = value
+            resolved = (reference or datetime.now()) - offset
+            if not sub_day:
+                resolved = resolved.replace(hour=0, minute=0, second=0, microsecond=0)
+            return resolved
+        return None
+
+    def cache_info(self):
+        """Expose the underlying lru_cache statistics."""
+        return self._parse_cached.cache_info()
+
+    def _parse_raw(self, date_str: str) -> Tuple[str, object]:
+        """Classify and parse a raw date string; result is independent of the reference."""
+        text = date_str.strip()
+
+        match = ISO_DATE_RE.match(text)
+        if match:
+            parsed = self._build(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+            if parsed:
+                return 'absolute', parsed
+
+        match = SLASH_DATE_RE.match(text)
+        if match:
+            first, second, year = int(match.group(1)), int(match.group(2)), int(match.group(3))
+            # US month/day first, then day/month for values that cannot be a month
+            parsed = self._build(year, first, second) or self._build(year, second, first)
+            if parsed:
+                return 'absolute', parsed
+
+        match = MONTH_NAME_DATE_RE.match(text)
+        if match:
+            month = MONTHS.get(match.group(1).lower())
+            if month:
+                parsed = self._build(int(match.group(3)), month, int(match.group(2)))
+                if parsed:
+                    return 'absolute', parsed
+
+        match = RELATIVE_DATE_RE.search(text)
+        if match:
+            amount = match.group(1).lower()
+            count = 1 if amount in ('a', 'an', 'one') else int(amount)
+            unit = match.group(2).lower()
+            return 'relative', (RELATIVE_UNITS[unit] * count, unit in SUB_DAY_UNITS)
+
+        if YESTERDAY_RE.search(text):
+            return 'relative', (timedelta(days=1), False)
+        if TODAY_RE.search(text):
+            return 'relative', (timedelta(0), False)
+
+        return 'unknown', None
+
+    @staticmethod
+    def _build(year: int, month: int, day: int) -> Optional[datetime]:
+        try:
+            return datetime(year, month, day)
+        except ValueError:
+            return None
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Duplicate Detector
+Groups near-duplicate job postings (e.g. staffing-firm reposts of the same prime requirement)
+into clusters using shingled MinHash signatures and LSH banding.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import zlib
+from array import array
+from typing import Dict, Iterable, List, TextIO, Tuple
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from pipelines.scraper_engine.normalize_jobs import iter_raw_jobs
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+DENSIFY_OFFSET = 0x9E3779B1
+TOKEN_RE = re.compile(r'\w+')
+
+
+class DuplicateDetector:
+    """Online MinHash/LSH clustering of job postings.
+
+    Each posting is shingled (word n-grams over title, description and
+    location) and reduced to a one-permutation MinHash signature. The
+    signature is split into bands; postings that share a band bucket with an
+    earlier posting are verified by estimated Jaccard similarity and merged
+    into its cluster.
+    Each bucket keeps a single representative, so a posting is compared with
+    at most `bands` others and the total work grows linearly with input size.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.8,
+                 shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.logger = logging.getLogger(__name__)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        rng = random.Random(seed)
+        self.mixer = (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+
+        self.buckets: List[Dict[Tuple[int, ...], int]] = [{} for _ in range(bands)]
+        self.signatures: Dict[int, array] = {}
+        self.parents: List[int] = []
+        self.job_ids: List[str] = []
+
+    def shingles(self, job_data: Dict) -> set:
+        """Word n-gram shingles over title, description and location."""
+        text = ' '.join(
+            job_data.get(field) or '' for field in ('title', 'description', 'location')
+        ).lower()
+        tokens = TOKEN_RE.findall(text)
+        size = self.shingle_size
+        if len(tokens) <= size:
+            return {' '.join(tokens)} if tokens else set()
+        return {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+    def signature(self, shingles: set) -> array:
+        """One-permutation MinHash signature with rotation densification.
+
+        Each shingle is hashed once and routed to one of `num_perm` bins,
+        keeping the minimum per bin, so the cost is O(shingles + num_perm)
+        rather than O(shingles * num_perm). Empty bins borrow the value of the
+        next non-empty bin (offset by distance) so short postings still get a
+        full-length, comparable signature.
+        """
+        num_perm = self.num_perm
+        if not shingles:
+            return array('Q', [MAX_HASH] * num_perm)
+
+        a, b = self.mixer
+        prime = MERSENNE_PRIME
+        bins = [None] * num_perm
+        for shingle in shingles:
+            mixed = (a * zlib.crc32(shingle.encode('utf-8')) + b) % prime
+            slot = mixed % num_perm
+            value = mixed // num_perm
+            current = bins[slot]
+            if current is None or value < current:
+                bins[slot] = value
+
+        signature = array('Q', [0] * num_perm)
+        for slot in range(num_perm):
+            value = bins[slot]
+            distance = 0
+            while value is None:
+                distance += 1
+                value = bins[(slot + distance) % num_perm]
+            signature[slot] = (value + distance * DENSIFY_OFFSET) & MAX_HASH
+        return signature
+
+    def similarity(self, left: array, right: array) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return sum(1 for x, y in zip(left, right) if x == y) / self.num_perm
+
+    def add(self, job_data: Dict) -> int:
+        """Add a posting and return its index; cluster membership is read via cluster_of()."""
+        index = len(self.parents)
+        self.parents.append(index)
+        self.job_ids.append(job_data.get('job_id', str(index)))
+
+        shingles = self.shingles(job_data)
+        if not shingles:
+            # Postings with no text share nothing; each stays its own cluster
+            return index
+
+        signature = self.signature(shingles)
+        is_representative = False
+        rows = self.rows
+        for band, bucket in enumerate(self.buckets):
+            key = tuple(signature[band * rows:(band + 1) * rows])
+            other = bucket.get(key)
+            if other is None:
+                bucket[key] = index
+                is_representative = True
+            elif self._find(other) != self._find(index) and \
+                    self.similarity(signature, self.signatures[other]) >= self.threshold:
+                self._union(other, index)
+
+        if is_representative:
+            self.signatures[index] = signature
+        return index
+
+    def add_many(self, jobs: Iterable[Dict]) -> int:
+        """Add postings in order; returns how many were added."""
+        count = 0
+        for job in jobs:
+            self.add(job)
+            count += 1
+        return count
+
+    def cluster_of(self, index: int) -> int:
+        """Index of the cluster's canonical (earliest-seen) posting."""
+        return self._find(index)
+
+    def cluster_id(self, index: int) -> str:
+        """Stable cluster ID derived from the canonical posting's job ID."""
+        return f"dup_{self.job_ids[self._find(index)]}"
+
+    def cluster_sizes(self) -> Dict[int, int]:
+        sizes: Dict[int, int] = {}
+        for index in range(len(self.parents)):
+            root = self._find(index)
+            sizes[root] = sizes.get(root, 0) + 1
+        return sizes
+
+    def _find(self, index: int) -> int:
+        parents = self.parents
+        root = index
+        while parents[root] != root:
+            root = parents[root]
+        while parents[index] != root:
+            parents[index], index = root, parents[index]
+        return root
+
+    def _union(self, left: int, right: int) -> None:
+        # The smaller index wins so the earliest posting stays canonical
+        left_root, right_root = self._find(left), self._find(right)
+        if left_root < right_root:
+            self.parents[right_root] = left_root
+        elif right_root < left_root:
+            self.parents[left_root] = right_root
+
+
+def cluster_and_spool(detector: DuplicateDetector, jobs: Iterable[Dict], spool: TextIO) -> int:
+    """First pass: cluster postings while copying them to spool as JSON lines.
+
+    The annotation pass then reads the spool instead of the input, so the
+    input is consumed once and may be a pipe. Returns how many were added.
+    """
+    count = 0
+    for job in jobs:
+        detector.add(job)
+        spool.write(json.dumps(job, ensure_ascii=False))
+        spool.write('\n')
+        count += 1
+    spool.flush()
+    spool.seek(0)
+    return count
+
+
+def annotate(detector: DuplicateDetector, jobs: Iterable[Dict],
+             canonical_only: bool = False) -> Iterable[Dict]:
+    """Second pass: attach cluster_id, is_canonical and cluster_size to each posting."""
+    sizes = detector.cluster_sizes()
+    for index, job in enumerate(jobs):
+        root = detector.cluster_of(index)
+        is_canonical = root == index
+        if canonical_only and not is_canonical:
+            continue
+        job['cluster_id'] = detector.cluster_id(index)
+        job['is_canonical'] = is_canonical
+        job['cluster_size'] = sizes[root]
+        yield job
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cluster near-duplicate job postings')
+    parser.add_argument('--input', '-i', required=True, help="Normalized jobs JSON/JSONL file ('-' for stdin)")
+    parser.add_argument('--output', '-o', required=True, help="Output JSONL file ('-' for stdout)")
+    parser.add_argument('--threshold', '-t', type=float, default=0.8,
+                        help='Minimum estimated Jaccard similarity for duplicates (default: 0.8)')
+    parser.add_argument('--canonical-only', action='store_true',
+                        help='Only write one representative per cluster (for the mapper)')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+    detector = DuplicateDetector(threshold=args.threshold)
+
+    try:
+        # Pass 1 clusters and spools the postings to disk; pass 2 annotates from the spool
+        infile = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as spool:
+            try:
+                total = cluster_and_spool(detector, iter_raw_jobs(infile), spool)
+            finally:
+                if infile is not sys.stdin:
+                    infile.close()
+
+            clusters = len(detector.cluster_sizes())
+            logger.info(f"Clustered {total} jobs into {clusters} clusters "
+                        f"({total - clusters} near-duplicates)")
+
+            outfile = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+            try:
+                spooled = (json.loads(line) for line in spool)
+                for job in annotate(detector, spooled, args.canonical_only):
+                    outfile.write(json.dumps(job, ensure_ascii=False))
+                    outfile.write('\n')
+            finally:
+                if outfile is not sys.stdout:
+                    outfile.close()
+
+        logger.info(f"Saved clustered jobs to {args.output}")
+
+    except Exception as e:
+        logger.error(f"Error detecting duplicates: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
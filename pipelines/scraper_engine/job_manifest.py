@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Job Manifest
+Persistent record of which raw postings have already been normalized, keyed by job ID and content hash.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Optional
+
+# Fields that change on every scrape without the posting itself changing
+VOLATILE_FIELDS = ('scraped_at', 'raw_data', 'raw_html_hash')
+
+
+class JobManifest:
+    """SQLite-backed manifest of (job_id, content_hash) pairs seen by the normalizer."""
+
+    def __init__(self, path: str = "data/jobs_manifest.sqlite"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        # One row per distinct version of a posting, so older raw files that
+        # still carry a superseded version do not trigger re-normalization
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                source_file TEXT,
+                processed_at TEXT NOT NULL,
+                PRIMARY KEY (job_id, content_hash)
+            )"""
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def content_hash(job_data: Dict) -> str:
+        """Hash the posting content, ignoring scrape-time bookkeeping fields."""
+        content = {k: v for k, v in job_data.items() if k not in VOLATILE_FIELDS}
+        canonical = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def is_unchanged(self, job_id: str, content_hash: str) -> bool:
+        """True if this exact posting content was already processed."""
+        row = self.conn.execute(
+            "SELECT 1 FROM jobs WHERE job_id = ? AND content_hash = ?", (job_id, content_hash)
+        ).fetchone()
+        return row is not None
+
+    def record(self, job_id: str, content_hash: str, source_file: Optional[str] = None) -> None:
+        """Mark a posting version as processed; committed on commit()."""
+        self.conn.execute(
+            "INSERT OR IGNORE INTO jobs (job_id, content_hash, source_file, processed_at) "
+            "VALUES (?, ?, ?, ?)",
+            (job_id, content_hash, source_file, datetime.now().isoformat())
+        )
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(DISTINCT job_id) FROM jobs").fetchone()[0]
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Leave uncommitted records out so the delta is retried next run
+            self.conn.rollback()
+            self.conn.close()
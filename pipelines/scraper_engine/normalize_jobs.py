@@ -7,28 +7,108 @@ Normalizes scraped job data into a consistent format for further processing.
 import json
 import re
 import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 import argparse
 import os
 import sys
 
 # Add project root to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from pipelines.scraper_engine.date_parser import DateParser
+from pipelines.scraper_engine.job_manifest import JobManifest
+
+# USPS abbreviations for all 50 states, DC and the inhabited territories
+STATE_ABBREVIATIONS = {
+    'AL': 'Alabama', 'AK': 'Alaska', 'AZ': 'Arizona', 'AR': 'Arkansas',
+    'CA': 'California', 'CO': 'Colorado', 'CT': 'Connecticut', 'DE': 'Delaware',
+    'FL': 'Florida', 'GA': 'Georgia', 'HI': 'Hawaii', 'ID': 'Idaho',
+    'IL': 'Illinois', 'IN': 'Indiana', 'IA': 'Iowa', 'KS': 'Kansas',
+    'KY': 'Kentucky', 'LA': 'Louisiana', 'ME': 'Maine', 'MD': 'Maryland',
+    'MA': 'Massachusetts', 'MI': 'Michigan', 'MN': 'Minnesota', 'MS': 'Mississippi',
+    'MO': 'Missouri', 'MT': 'Montana', 'NE': 'Nebraska', 'NV': 'Nevada',
+    'NH': 'New Hampshire', 'NJ': 'New Jersey', 'NM': 'New Mexico', 'NY': 'New York',
+    'NC': 'North Carolina', 'ND': 'North Dakota', 'OH': 'Ohio', 'OK': 'Oklahoma',
+    'OR': 'Oregon', 'PA': 'Pennsylvania', 'RI': 'Rhode Island', 'SC': 'South Carolina',
+    'SD': 'South Dakota', 'TN': 'Tennessee', 'TX': 'Texas', 'UT': 'Utah',
+    'VT': 'Vermont', 'VA': 'Virginia', 'WA': 'Washington', 'WV': 'West Virginia',
+    'WI': 'Wisconsin', 'WY': 'Wyoming',
+    'DC': 'District of Columbia',
+    'AS': 'American Samoa', 'GU': 'Guam', 'MP': 'Northern Mariana Islands',
+    'PR': 'Puerto Rico', 'VI': 'U.S. Virgin Islands',
+}
+
+COMPANY_MAPPINGS = {
+    'apex systems': 'Apex Systems',
+    'insight global': 'Insight Global',
+    'clearancejobs': 'ClearedJobs',
+    'clearedjobs.com': 'ClearedJobs'
+}
+
+# Checked in order; the first match wins so higher levels shadow lower ones
+CLEARANCE_PATTERNS = [
+    ('TS/SCI', re.compile(r'\b(?:TS/SCI|Top\s+Secret/SCI|Top\s+Secret\s+SCI)\b', re.IGNORECASE)),
+    ('TS', re.compile(r'\b(?:TS|Top\s+Secret)\b', re.IGNORECASE)),
+    ('Secret', re.compile(r'\bSecret\b', re.IGNORECASE)),
+    ('Confidential', re.compile(r'\bConfidential\b', re.IGNORECASE)),
+]
+
+# Abbreviations are only expanded when written in capitals: with the full
+# USPS table a case-insensitive match would turn words such as "in", "or"
+# and "me" into state names.
+STATE_ABBREVIATION_RE = re.compile(
+    r'\b(' + '|'.join(sorted(STATE_ABBREVIATIONS)) + r')\b'
+)
+WHITESPACE_RE = re.compile(r'\s+')
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+UNSAFE_CHARS_RE = re.compile(r'[^\w\s\-.,!?()]')
+JOB_ID_CHARS_RE = re.compile(r'[^a-zA-Z0-9_-]')
+
+STREAM_CHUNK_SIZE = 1 << 16
+NORMALIZE_CHUNK_SIZE = 500
+
+
+def _expand_state(match) -> str:
+    return STATE_ABBREVIATIONS[match.group(1)]
+
+
+# Per-process normalizer, built once by the pool initializer and kept warm
+_worker_normalizer = None
+
+
+def _init_worker(config_path: str) -> None:
+    global _worker_normalizer
+    _worker_normalizer = JobNormalizer(config_path)
+
+
+def _normalize_chunk(chunk: List[Tuple[Any, Dict]]) -> Tuple[int, List[Tuple[Any, Dict]], int]:
+    """Normalize a chunk of (key, job) pairs inside a pool worker; returns (pid, results, error count)."""
+    results = []
+    errors = 0
+    for key, job in chunk:
+        normalized = _worker_normalizer.normalize_job(job)
+        if normalized:
+            results.append((key, normalized))
+        else:
+            errors += 1
+    return os.getpid(), results, errors
 
 class JobNormalizer:
     def __init__(self, config_path: str = "config/settings.yaml"):
         self.logger = logging.getLogger(__name__)
-        self.clearance_patterns = {
-            'TS/SCI': r'\b(?:TS/SCI|Top\s+Secret/SCI|Top\s+Secret\s+SCI)\b',
-            'TS': r'\b(?:TS|Top\s+Secret)\b',
-            'Secret': r'\b(?:Secret|SECRET)\b',
-            'Confidential': r'\b(?:Confidential|CONFIDENTIAL)\b'
-        }
+        self.config_path = config_path
+        self.clearance_patterns = CLEARANCE_PATTERNS
+        self.date_parser = DateParser()
+        self.worker_errors: Dict[int, int] = {}
         
     def normalize_job(self, job_data: Dict) -> Dict:
         """Normalize a single job record."""
         try:
+            scraped_at = job_data.get('scraped_at', datetime.now().isoformat())
             normalized = {
                 'job_id': self._normalize_job_id(job_data.get('job_id', '')),
                 'title': self._normalize_title(job_data.get('title', '')),
@@ -37,9 +117,9 @@ class JobNormalizer:
                 'clearance_level': self._extract_clearance(job_data.get('description', '')),
                 'description': self._clean_description(job_data.get('description', '')),
                 'url': job_data.get('url', ''),
-                'posted_date': self._normalize_date(job_data.get('posted_date', '')),
+                'posted_date': self._normalize_date(job_data.get('posted_date', ''), scraped_at),
                 'source': job_data.get('source', ''),
-                'scraped_at': job_data.get('scraped_at', datetime.now().isoformat()),
+                'scraped_at': scraped_at,
                 'normalized_at': datetime.now().isoformat()
             }
             
@@ -49,13 +129,61 @@ class JobNormalizer:
             self.logger.error(f"Error normalizing job {job_data.get('job_id', 'unknown')}: {str(e)}")
             return None
     
+    def normalize_many(self, jobs: Iterable[Dict], workers: int = 1,
+                       chunk_size: int = NORMALIZE_CHUNK_SIZE) -> Iterator[Dict]:
+        """Normalize many jobs, optionally fanning chunks out to a process pool.
+        
+        Results are yielded in input order and failed records are dropped.
+        Failures are tallied per worker PID in `self.worker_errors`. At most
+        two chunks per worker are in flight, so memory stays bounded for
+        streamed input.
+        """
+        for _, normalized in self.normalize_pairs(((None, job) for job in jobs), workers, chunk_size):
+            yield normalized
+    
+    def normalize_pairs(self, items: Iterable[Tuple[Any, Dict]], workers: int = 1,
+                        chunk_size: int = NORMALIZE_CHUNK_SIZE) -> Iterator[Tuple[Any, Dict]]:
+        """Like normalize_many, but over (key, job) pairs; yields (key, normalized).
+        
+        The key travels with its job, so callers can tell which input each
+        result came from even when earlier records failed and were dropped.
+        """
+        self.worker_errors = {}
+        
+        if workers <= 1:
+            pid = os.getpid()
+            self.worker_errors[pid] = 0
+            for key, job in items:
+                normalized = self.normalize_job(job)
+                if normalized:
+                    yield key, normalized
+                else:
+                    self.worker_errors[pid] += 1
+            return
+        
+        items = iter(items)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.config_path,)) as pool:
+            pending = deque()
+            while True:
+                while len(pending) < workers * 2:
+                    chunk = list(islice(items, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append(pool.submit(_normalize_chunk, chunk))
+                if not pending:
+                    break
+                pid, results, errors = pending.popleft().result()
+                self.worker_errors[pid] = self.worker_errors.get(pid, 0) + errors
+                yield from results
+    
     def _normalize_job_id(self, job_id: str) -> str:
         """Normalize job ID format."""
         if not job_id:
             return f"normalized_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
         # Remove special characters and normalize
-        normalized = re.sub(r'[^a-zA-Z0-9_-]', '_', job_id)
+        normalized = JOB_ID_CHARS_RE.sub('_', job_id)
         return normalized.lower()
     
     def _normalize_title(self, title: str) -> str:
@@ -64,7 +192,7 @@ class JobNormalizer:
             return ""
         
         # Remove extra whitespace and normalize
-        normalized = re.sub(r'\s+', ' ', title.strip())
+        normalized = WHITESPACE_RE.sub(' ', title.strip())
         return normalized
     
     def _normalize_company(self, company: str) -> str:
@@ -73,53 +201,26 @@ class JobNormalizer:
             return ""
         
         # Standardize common company names
-        company_mappings = {
-            'apex systems': 'Apex Systems',
-            'insight global': 'Insight Global',
-            'clearancejobs': 'ClearedJobs',
-            'clearedjobs.com': 'ClearedJobs'
-        }
-        
-        normalized = company.strip().lower()
-        return company_mappings.get(normalized, company.strip())
+        stripped = company.strip()
+        return COMPANY_MAPPINGS.get(stripped.lower(), stripped)
     
     def _normalize_location(self, location: str) -> str:
         """Normalize location format."""
         if not location:
             return ""
         
-        # Remove extra whitespace and normalize
-        normalized = re.sub(r'\s+', ' ', location.strip())
-        
-        # Standardize state abbreviations
-        state_mappings = {
-            'CA': 'California',
-            'TX': 'Texas',
-            'VA': 'Virginia',
-            'MD': 'Maryland',
-            'FL': 'Florida',
-            'WA': 'Washington',
-            'MO': 'Missouri',
-            'CT': 'Connecticut',
-            'UT': 'Utah',
-            'CO': 'Colorado'
-        }
-        
-        for abbr, full_name in state_mappings.items():
-            normalized = re.sub(rf'\b{abbr}\b', full_name, normalized, flags=re.IGNORECASE)
-        
-        return normalized
+        # Remove extra whitespace and expand every state abbreviation in one pass
+        normalized = WHITESPACE_RE.sub(' ', location.strip())
+        return STATE_ABBREVIATION_RE.sub(_expand_state, normalized)
     
     def _extract_clearance(self, description: str) -> Optional[str]:
         """Extract clearance level from description."""
         if not description:
             return None
         
-        description_upper = description.upper()
-        
         # Check for clearance patterns
-        for clearance, pattern in self.clearance_patterns.items():
-            if re.search(pattern, description_upper):
+        for clearance, pattern in self.clearance_patterns:
+            if pattern.search(description):
                 return clearance
         
         return None
@@ -130,53 +231,207 @@ class JobNormalizer:
             return ""
         
         # Remove HTML tags
-        cleaned = re.sub(r'<[^>]+>', '', description)
+        cleaned = HTML_TAG_RE.sub('', description)
         
         # Remove extra whitespace
-        cleaned = re.sub(r'\s+', ' ', cleaned)
+        cleaned = WHITESPACE_RE.sub(' ', cleaned)
         
         # Remove special characters that might cause issues
-        cleaned = re.sub(r'[^\w\s\-.,!?()]', '', cleaned)
+        cleaned = UNSAFE_CHARS_RE.sub('', cleaned)
         
         return cleaned.strip()
     
-    def _normalize_date(self, date_str: str) -> str:
-        """Normalize date format."""
-        if not date_str:
-            return datetime.now().isoformat()
+    def _normalize_date(self, date_str: str, scraped_at: Optional[str] = None) -> str:
+        """Normalize date format, resolving relative dates against scraped_at."""
+        reference = self._parse_reference(scraped_at)
+        parsed_date = self.date_parser.parse(date_str, reference)
         
-        try:
-            # Try to parse various date formats
-            date_formats = [
-                '%Y-%m-%d',
-                '%m/%d/%Y',
-                '%d/%m/%Y',
-                '%B %d, %Y',
-                '%b %d, %Y'
-            ]
-            
-            for fmt in date_formats:
-                try:
-                    parsed_date = datetime.strptime(date_str, fmt)
-                    return parsed_date.isoformat()
-                except ValueError:
+        # Unknown or missing dates fall back to when the posting was scraped
+        return (parsed_date or reference).isoformat()
+    
+    def _parse_reference(self, scraped_at: Optional[str]) -> datetime:
+        """Parse the scraped_at timestamp, defaulting to now."""
+        if scraped_at:
+            try:
+                return datetime.fromisoformat(scraped_at)
+            except (TypeError, ValueError):
+                pass
+        return datetime.now()
+
+
+def iter_raw_jobs(stream: TextIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Dict]:
+    """Yield raw job dicts from a JSON array or JSONL stream without loading it whole.
+
+    The format is sniffed from the first non-whitespace character, so both
+    Scrapy's `json` and `jsonlines` feed exports are accepted.
+    """
+    first = ''
+    while not first:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        first = chunk.lstrip()
+    
+    if first[0] != '[':
+        # JSONL: one record per line
+        pending = first
+        while True:
+            lines = pending.split('\n')
+            pending = lines.pop()
+            for line in lines:
+                if line.strip():
+                    yield json.loads(line)
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            pending += chunk
+        if pending.strip():
+            yield json.loads(pending)
+        return
+    
+    # JSON array: decode one element at a time from a sliding buffer
+    decoder = json.JSONDecoder()
+    buffer = first[1:]
+    pos = 0
+    eof = False
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+        if pos < len(buffer):
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A value ending flush with the buffer may be a truncated number
+                if end < len(buffer) or eof:
+                    yield record
+                    pos = end
                     continue
-            
-            # If no format matches, return current date
-            return datetime.now().isoformat()
-            
-        except Exception:
-            return datetime.now().isoformat()
+        elif eof:
+            raise ValueError("Unterminated JSON array in input")
+        chunk = stream.read(chunk_size)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        eof = not chunk
+
+
+def normalize_stream(normalizer: 'JobNormalizer', jobs: Iterable[Dict], output: TextIO,
+                     source: Optional[str] = None, workers: int = 1) -> Tuple[int, int]:
+    """Normalize jobs and write each result as a JSON line as soon as it is ready.
+
+    Returns a (read, written) count tuple.
+    """
+    source_filter = source.lower() if source else None
+    read = 0
+    
+    def selected():
+        nonlocal read
+        for job in jobs:
+            read += 1
+            if source_filter and job.get('source', '').lower() != source_filter:
+                continue
+            yield job
+    
+    written = 0
+    for normalized in normalizer.normalize_many(selected(), workers=workers):
+        output.write(json.dumps(normalized, ensure_ascii=False))
+        output.write('\n')
+        written += 1
+    output.flush()
+    return read, written
+
+
+def normalize_incremental(normalizer: 'JobNormalizer', paths: List[str], output: TextIO,
+                          manifest: JobManifest, source: Optional[str] = None,
+                          workers: int = 1) -> Tuple[int, int, int]:
+    """Normalize only postings that are new or changed since the last run.
+
+    Each raw record is hashed and checked against the manifest; unchanged
+    postings are skipped and only the delta is written as JSON lines. A
+    posting is recorded in the manifest only once its normalized record has
+    been written, so failed records are retried on the next run. Postings
+    without a job_id are keyed by their content hash.
+
+    Returns a (read, skipped, written) count tuple.
+    """
+    source_filter = source.lower() if source else None
+    # (manifest key, content_hash) pairs already queued this run
+    queued = set()
+    read = skipped = 0
+    
+    def changed():
+        nonlocal read, skipped
+        for path in paths:
+            with _open_input(path) as f:
+                for job in iter_raw_jobs(f):
+                    read += 1
+                    if source_filter and job.get('source', '').lower() != source_filter:
+                        continue
+                    content_hash = JobManifest.content_hash(job)
+                    job_id = job.get('job_id') or f"content:{content_hash}"
+                    version = (normalizer._normalize_job_id(job_id), content_hash)
+                    if version in queued or manifest.is_unchanged(job_id, content_hash):
+                        skipped += 1
+                        continue
+                    queued.add(version)
+                    yield (job_id, content_hash, path), job
+    
+    written = 0
+    for entry, normalized in normalizer.normalize_pairs(changed(), workers=workers):
+        output.write(json.dumps(normalized, ensure_ascii=False))
+        output.write('\n')
+        written += 1
+        manifest.record(*entry)
+    output.flush()
+    manifest.commit()
+    return read, skipped, written
+
+
+def _raw_input_paths(path: str) -> List[str]:
+    """Expand a raw-data directory into its feed files, oldest first."""
+    if path != '-' and os.path.isdir(path):
+        return sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.endswith(('.json', '.jsonl'))
+        )
+    return [path]
+
+
+def _log_worker_errors(logger: logging.Logger, normalizer: 'JobNormalizer') -> None:
+    for pid, errors in sorted(normalizer.worker_errors.items()):
+        logger.info(f"Worker {pid}: {errors} errors")
+
+
+def _open_input(path: str) -> TextIO:
+    return sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+
+
+def _open_output(path: str) -> TextIO:
+    return sys.stdout if path == '-' else open(path, 'w', encoding='utf-8')
+
 
 def main():
     parser = argparse.ArgumentParser(description='Normalize scraped job data')
-    parser.add_argument('--input', '-i', required=True, help='Input JSON file path')
-    parser.add_argument('--output', '-o', required=True, help='Output JSON file path')
+    parser.add_argument('--input', '-i', required=True,
+                        help="Input JSON/JSONL file path ('-' for stdin, or a directory with --incremental)")
+    parser.add_argument('--output', '-o', required=True, help="Output JSON file path ('-' for stdout)")
     parser.add_argument('--source', '-s', help='Source filter (optional)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream records with constant memory and write JSONL output')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                        help='Number of worker processes for normalization (default: 1)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only normalize new or changed postings and write the delta as JSONL')
+    parser.add_argument('--manifest', default='data/jobs_manifest.sqlite',
+                        help='Manifest database used by --incremental')
     
     args = parser.parse_args()
     
-    # Setup logging
+    # Setup logging (stderr, so stdout stays clean for piping)
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
     
@@ -184,9 +439,42 @@ def main():
     normalizer = JobNormalizer()
     
     try:
+        if args.incremental:
+            paths = _raw_input_paths(args.input)
+            outfile = _open_output(args.output)
+            try:
+                with JobManifest(args.manifest) as manifest:
+                    read, skipped, written = normalize_incremental(
+                        normalizer, paths, outfile, manifest, args.source, args.workers
+                    )
+            finally:
+                if outfile is not sys.stdout:
+                    outfile.close()
+            
+            logger.info(f"Incremental run over {len(paths)} files: {read} read, "
+                        f"{skipped} unchanged, {written} normalized to {args.output}")
+            _log_worker_errors(logger, normalizer)
+            return
+        
+        if args.stream:
+            infile = _open_input(args.input)
+            outfile = _open_output(args.output)
+            try:
+                read, written = normalize_stream(normalizer, iter_raw_jobs(infile), outfile,
+                                                 args.source, args.workers)
+            finally:
+                if infile is not sys.stdin:
+                    infile.close()
+                if outfile is not sys.stdout:
+                    outfile.close()
+            
+            logger.info(f"Streamed {written} normalized jobs ({read} read) to {args.output}")
+            _log_worker_errors(logger, normalizer)
+            return
+        
         # Load input data
-        with open(args.input, 'r', encoding='utf-8') as f:
-            jobs = json.load(f)
+        with _open_input(args.input) as f:
+            jobs = list(iter_raw_jobs(f))
         
         logger.info(f"Loaded {len(jobs)} jobs from {args.input}")
         
@@ -196,16 +484,13 @@ def main():
             logger.info(f"Filtered to {len(jobs)} jobs from source: {args.source}")
         
         # Normalize jobs
-        normalized_jobs = []
-        for job in jobs:
-            normalized = normalizer.normalize_job(job)
-            if normalized:
-                normalized_jobs.append(normalized)
+        normalized_jobs = list(normalizer.normalize_many(jobs, workers=args.workers))
         
         logger.info(f"Normalized {len(normalized_jobs)} jobs")
+        _log_worker_errors(logger, normalizer)
         
         # Save normalized data
-        with open(args.output, 'w', encoding='utf-8') as f:
+        with _open_output(args.output) as f:
             json.dump(normalized_jobs, f, indent=2, ensure_ascii=False)
         
         logger.info(f"Saved normalized data to {args.output}")
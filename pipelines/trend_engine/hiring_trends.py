@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Hiring Trend Aggregator for PrimeTime BD Intel
+Keeps materialized rolling-window job counts per (program, prime, location, clearance) in SQLite,
+updated incrementally from newly mapped jobs, with surge and chronic-opening queries for the other
+engines.
+
+Usage:
+    python hiring_trends.py -m data/job_mappings.json -j data/jobs_normalized.json --by program
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.knowledge_base import code_key, load_knowledge_base
+from config.settings import load_settings
+from pipelines.common.files import load_records
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ("program", "prime", "location", "clearance")
+DEFAULT_WINDOWS = (7, 30, 90)
+
+
+def posted_day(job_data: Dict) -> Optional[int]:
+    """Ordinal day a job was posted (scraped_at if no posted_date), or None if undated."""
+    for field in ("posted_date", "scraped_at"):
+        value = str(job_data.get(field) or "")[:10]
+        try:
+            return date.fromisoformat(value).toordinal()
+        except ValueError:
+            continue
+    return None
+
+
+def trend_rows(mappings: Iterable[Dict], jobs: Iterable[Dict], primes: Dict[str, Tuple[str, str]]) -> Iterable[Dict]:
+    """One {job_id, program, prime, location, clearance, day} row per mapped program of each job.
+
+    `primes` maps code_key(program) to (program code, prime contractor).
+    """
+    jobs_by_id = {str(job.get("job_id")): job for job in jobs}
+    for mapping in mappings:
+        job_id = str(mapping.get("job_id"))
+        job = jobs_by_id.get(job_id, {})
+        day = posted_day(job) or posted_day({"scraped_at": mapping.get("mapped_at")})
+        for code in mapping.get("mapped_programs") or []:
+            program, prime = primes.get(code_key(str(code)), (str(code), ""))
+            yield {
+                "job_id": job_id,
+                "program": program,
+                "prime": prime,
+                "location": (job.get("location") or "").strip(),
+                "clearance": job.get("clearance_level") or "None",
+                "day": day,
+            }
+
+
+class HiringTrendStore:
+    """SQLite store of daily job counts with materialized window totals.
+
+    `daily` holds job counts per (day, key) for the retention period;
+    `window_counts` holds each key's total over each window ending at as_of.
+    update() adds new jobs to both and, when as_of moves forward, subtracts
+    only the days that slid out of each window, so its cost is proportional
+    to the new jobs and expired days rather than to the history.
+    """
+
+    def __init__(self, path: str = "data/hiring_trends.sqlite", windows: Sequence[int] = DEFAULT_WINDOWS,
+                 surge_ratio: float = 2.0, surge_min_jobs: int = 5, chronic_weeks: int = 8):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.windows = sorted({int(w) for w in windows})
+        self.surge_ratio = surge_ratio
+        self.surge_min_jobs = surge_min_jobs
+        self.chronic_weeks = chronic_weeks
+        self.retention = max(self.windows[-1], 7 * chronic_weeks)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS trend_keys (
+                key_id INTEGER PRIMARY KEY,
+                program TEXT NOT NULL,
+                prime TEXT NOT NULL,
+                location TEXT NOT NULL,
+                clearance TEXT NOT NULL,
+                UNIQUE (program, prime, location, clearance)
+            );
+            CREATE TABLE IF NOT EXISTS daily (
+                day INTEGER NOT NULL,
+                key_id INTEGER NOT NULL,
+                jobs INTEGER NOT NULL,
+                PRIMARY KEY (day, key_id)
+            );
+            CREATE TABLE IF NOT EXISTS window_counts (
+                key_id INTEGER NOT NULL,
+                days INTEGER NOT NULL,
+                jobs INTEGER NOT NULL,
+                PRIMARY KEY (key_id, days)
+            );
+            CREATE TABLE IF NOT EXISTS seen_jobs (job_id TEXT PRIMARY KEY, day INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS seen_jobs_day ON seen_jobs (day);"""
+        )
+        self._key_ids: Dict[Tuple[str, str, str, str], int] = {}
+        self.as_of: Optional[int] = self._meta("as_of", int)
+        self.since: Optional[int] = self._meta("since", int)
+        if self._meta("windows", json.loads) not in (None, self.windows):
+            logger.info(f"Trend windows changed to {self.windows}; recomputing window counts")
+            self._recompute_windows()
+        self._set_meta("windows", json.dumps(self.windows))
+        self.conn.commit()
+
+    def _meta(self, name: str, parse):
+        row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return parse(row[0]) if row else None
+
+    def _set_meta(self, name: str, value) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, str(value)))
+
+    def _key_id(self, key: Tuple[str, str, str, str]) -> int:
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            self.conn.execute("INSERT OR IGNORE INTO trend_keys (program, prime, location, clearance) "
+                              "VALUES (?, ?, ?, ?)", key)
+            key_id = self.conn.execute("SELECT key_id FROM trend_keys WHERE program = ? AND prime = ? "
+                                       "AND location = ? AND clearance = ?", key).fetchone()[0]
+            self._key_ids[key] = key_id
+        return key_id
+
+    def _recompute_windows(self) -> None:
+        self.conn.execute("DELETE FROM window_counts")
+        if self.as_of is None:
+            return
+        for window in self.windows:
+            self.conn.execute("INSERT INTO window_counts (key_id, days, jobs) SELECT key_id, ?, SUM(jobs) "
+                              "FROM daily WHERE day > ? GROUP BY key_id", (window, self.as_of - window))
+
+    def _advance(self, as_of: int) -> None:
+        """Move the windows' end to as_of, subtracting the days that fall out of each."""
+        for window in self.windows:
+            expired = self.conn.execute(
+                "SELECT key_id, SUM(jobs) FROM daily WHERE day > ? AND day <= ? GROUP BY key_id",
+                (self.as_of - window, as_of - window)
+            ).fetchall()
+            self.conn.executemany("UPDATE window_counts SET jobs = jobs - ? WHERE key_id = ? AND days = ?",
+                                  [(jobs, key_id, window) for key_id, jobs in expired])
+            self.conn.executemany("DELETE FROM window_counts WHERE key_id = ? AND days = ? AND jobs <= 0",
+                                  [(key_id, window) for key_id, _ in expired])
+        self.conn.execute("DELETE FROM daily WHERE day <= ?", (as_of - self.retention,))
+        self.conn.execute("DELETE FROM seen_jobs WHERE day <= ?", (as_of - self.retention,))
+        self.as_of = as_of
+
+    def update(self, rows: Iterable[Dict], as_of: Optional[date] = None) -> Dict[str, int]:
+        """Add new trend rows (see trend_rows), with windows ending at as_of (default: today).
+
+        Jobs already counted are skipped by job_id; jobs dated after as_of
+        count on as_of, and jobs older than the retention period are dropped.
+        """
+        end = max((as_of or date.today()).toordinal(), self.as_of or 0)
+        if self.as_of is None:
+            self.as_of = end
+        elif end > self.as_of:
+            self._advance(end)
+        stats = {"added": 0, "duplicates": 0, "undated": 0, "expired": 0}
+        pending: Dict[Tuple[int, int], int] = {}
+        for row in rows:
+            day = row.get("day")
+            if day is None:
+                stats["undated"] += 1
+                continue
+            day = min(day, end)
+            if day <= end - self.retention:
+                stats["expired"] += 1
+                continue
+            # Keyed per program, so a job mapped to several programs counts once for each
+            if self.conn.execute("INSERT OR IGNORE INTO seen_jobs (job_id, day) VALUES (?, ?)",
+                                 (f"{row['job_id']}|{row['program']}", day)).rowcount == 0:
+                stats["duplicates"] += 1
+                continue
+            key_id = self._key_id(tuple(row[d] for d in DIMENSIONS))
+            pending[(day, key_id)] = pending.get((day, key_id), 0) + 1
+            stats["added"] += 1
+
+        # The history held starts at the oldest job counted (backfills lengthen it)
+        first_day = min([day for day, _ in pending] + [end])
+        if self.since is None or first_day < self.since:
+            self.since = first_day
+            self._set_meta("since", first_day)
+        self.conn.executemany(
+            "INSERT INTO daily (day, key_id, jobs) VALUES (?, ?, ?) "
+            "ON CONFLICT (day, key_id) DO UPDATE SET jobs = jobs + excluded.jobs",
+            [(day, key_id, jobs) for (day, key_id), jobs in pending.items()]
+        )
+        for window in self.windows:
+            self.conn.executemany(
+                "INSERT INTO window_counts (key_id, days, jobs) VALUES (?, ?, ?) "
+                "ON CONFLICT (key_id, days) DO UPDATE SET jobs = jobs + excluded.jobs",
+                [(key_id, window, jobs) for (day, key_id), jobs in pending.items() if day > end - window]
+            )
+        self._set_meta("as_of", end)
+        self.conn.commit()
+        return stats
+
+    @staticmethod
+    def _grouping(group_by: Sequence[str], filters: Dict[str, Optional[str]]) -> Tuple[str, str, List[str]]:
+        unknown = (set(group_by) | set(filters)) - set(DIMENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown trend dimensions: {', '.join(sorted(unknown))} "
+                             f"(expected some of {', '.join(DIMENSIONS)})")
+        columns = ", ".join(f"k.{d}" for d in group_by)
+        conditions = [f"k.{d} = ?" for d, value in filters.items() if value is not None]
+        where = " AND ".join(conditions) if conditions else "1"
+        return columns, where, [value for value in filters.values() if value is not None]
+
+    def counts(self, window: int = 30, group_by: Sequence[str] = DIMENSIONS, **filters: Optional[str]) -> List[Dict]:
+        """Job counts over a window, grouped by some dimensions and filtered by others, largest first.
+
+        e.g. counts(30, ("prime",), program="GBSD") -> [{"prime": ..., "jobs": ...}, ...]
+        """
+        if window not in self.windows:
+            raise ValueError(f"No materialized {window}-day window (have {self.windows})")
+        columns, where, params = self._grouping(group_by, filters)
+        select = f"{columns}, " if columns else ""
+        group = f"GROUP BY {columns}" if columns else ""
+        rows = self.conn.execute(
+            f"SELECT {select}SUM(w.jobs) AS jobs FROM window_counts w JOIN trend_keys k USING (key_id) "
+            f"WHERE w.days = ? AND {where} {group} ORDER BY jobs DESC", [window] + params
+        ).fetchall()
+        return [dict(zip(list(group_by) + ["jobs"], row)) for row in rows if row[-1]]
+
+    def surges(self, group_by: Sequence[str] = ("program",), **filters: Optional[str]) -> List[Dict]:
+        """Groups whose shortest-window count is surge_ratio times the rate over the rest of the longest window.
+
+        The baseline is the longest window minus the shortest, prorated to the
+        shortest window's length, and shortened to the history actually held
+        while the store is younger than the longest window.
+        """
+        recent, longest = self.windows[0], self.windows[-1]
+        if self.as_of is None:
+            return []
+        history = min(longest, self.as_of - self.since + 1) if self.since is not None else longest
+        baseline_days = history - recent
+        columns, where, params = self._grouping(group_by, filters)
+        select = f"{columns}, " if columns else ""
+        group = f"GROUP BY {columns}" if columns else ""
+        rows = self.conn.execute(
+            f"SELECT {select}SUM(CASE WHEN w.days = ? THEN w.jobs ELSE 0 END), "
+            f"SUM(CASE WHEN w.days = ? THEN w.jobs ELSE 0 END) "
+            f"FROM window_counts w JOIN trend_keys k USING (key_id) WHERE w.days IN (?, ?) AND {where} {group}",
+            [recent, longest, recent, longest] + params
+        ).fetchall()
+        surges = []
+        for row in rows:
+            recent_jobs, total_jobs = row[-2], row[-1]
+            if recent_jobs < self.surge_min_jobs:
+                continue
+            # Without a baseline period yet, nothing can be called a surge
+            if baseline_days <= 0:
+                continue
+            expected = (total_jobs - recent_jobs) * recent / baseline_days
+            ratio = recent_jobs / max(expected, 1.0)
+            if ratio >= self.surge_ratio:
+                surge = dict(zip(group_by, row[:-2]))
+                surge.update({"recent_jobs": recent_jobs, "expected_jobs": round(expected, 2),
+                              "ratio": round(ratio, 2), "window_days": recent})
+                surges.append(surge)
+        return sorted(surges, key=lambda s: s["ratio"], reverse=True)
+
+    def chronic(self, group_by: Sequence[str] = ("program",), **filters: Optional[str]) -> List[Dict]:
+        """Groups with postings in every one of the last chronic_weeks weeks (perennially open roles)."""
+        if self.as_of is None:
+            return []
+        columns, where, params = self._grouping(group_by, filters)
+        select = f"{columns}, " if columns else ""
+        group = f"GROUP BY {columns}" if columns else ""
+        rows = self.conn.execute(
+            f"SELECT {select}COUNT(DISTINCT (? - d.day) / 7) AS weeks, SUM(d.jobs) "
+            f"FROM daily d JOIN trend_keys k USING (key_id) WHERE d.day > ? AND {where} {group} "
+            f"HAVING weeks >= ? ORDER BY SUM(d.jobs) DESC",
+            [self.as_of, self.as_of - 7 * self.chronic_weeks] + params + [self.chronic_weeks]
+        ).fetchall()
+        return [dict(zip(list(group_by) + ["weeks", "jobs"], row)) for row in rows]
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def store_from_settings(settings: Dict, path: Optional[str] = None) -> HiringTrendStore:
+    """HiringTrendStore configured from settings.hiring_trends."""
+    trend_settings = settings.get("hiring_trends", {})
+    return HiringTrendStore(path or trend_settings.get("path", "data/hiring_trends.sqlite"),
+                            windows=trend_settings.get("windows", DEFAULT_WINDOWS),
+                            surge_ratio=trend_settings.get("surge_ratio", 2.0),
+                            surge_min_jobs=trend_settings.get("surge_min_jobs", 5),
+                            chronic_weeks=trend_settings.get("chronic_weeks", 8))
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Update and query rolling hiring trends")
+    parser.add_argument("--mappings", "-m", help="New job mappings JSON/JSONL to add")
+    parser.add_argument("--jobs", "-j", help="Normalized jobs JSON for the mappings (dates, locations, clearances)")
+    parser.add_argument("--as-of", type=date.fromisoformat, help="Window end date, YYYY-MM-DD (default: today)")
+    parser.add_argument("--by", default="program",
+                        help=f"Comma-separated dimensions to report by ({', '.join(DIMENSIONS)})")
+    parser.add_argument("--window", type=int, help="Window to list counts for (default: the shortest)")
+    parser.add_argument("--top", "-n", type=int, default=10, help="Groups to list")
+    parser.add_argument("--store", help="Trend database (default: hiring_trends.path)")
+    parser.add_argument("--config", "-c", default="config/settings.yaml", help="Configuration file")
+    args = parser.parse_args()
+
+    settings = load_settings(args.config)
+    store = store_from_settings(settings, args.store)
+    group_by = [d.strip() for d in args.by.split(",") if d.strip()]
+    try:
+        if args.mappings:
+            knowledge_base = load_knowledge_base(args.config)
+            primes = {code_key(code): (code, details.get("prime_contractor", ""))
+                      for code, details in knowledge_base.programs.items()}
+            jobs = load_records(args.jobs) if args.jobs else []
+            stats = store.update(trend_rows(load_records(args.mappings), jobs, primes), args.as_of)
+            logger.info(f"Trends updated to {date.fromordinal(store.as_of)}: {stats}")
+        elif args.as_of:
+            stats = store.update([], args.as_of)
+
+        window = args.window or store.windows[0]
+        print(f"Jobs in the last {window} days by {', '.join(group_by)}:")
+        for row in store.counts(window, group_by)[:args.top]:
+            print(f"  {' / '.join(str(row[d]) for d in group_by):<50} {row['jobs']}")
+        print("Surges:")
+        for surge in store.surges(group_by)[:args.top]:
+            print(f"  {' / '.join(str(surge[d]) for d in group_by):<50} {surge['recent_jobs']} jobs vs "
+                  f"{surge['expected_jobs']} expected ({surge['ratio']}x)")
+        print(f"Chronic (every week for {store.chronic_weeks} weeks):")
+        for row in store.chronic(group_by)[:args.top]:
+            print(f"  {' / '.join(str(row[d]) for d in group_by):<50} {row['jobs']} jobs")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Adaptive Throttle
+Config-driven, per-domain request throttling for all spiders. Reads the `scraping` section of
+config/settings.yaml and adapts each domain's download-slot delay and concurrency to observed
+latency and errors.
+"""
+
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from scrapy import signals
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.settings import load_settings
+
+BACKOFF_STATUSES = {429, 500, 502, 503, 504}
+
+
+class DomainState:
+    """Throttle state for one download slot (a domain, unless the request names its own slot)."""
+
+    def __init__(self, rate: float, concurrency: int):
+        self.rate = rate
+        self.concurrency = concurrency
+        self.latency: Optional[float] = None
+        self.consecutive_errors = 0
+        self.paused_until = 0.0
+
+    def delay(self) -> float:
+        """Seconds between requests: the rate's interval, or the rest of a back-off pause."""
+        return max(1.0 / self.rate, self.paused_until - time.monotonic())
+
+
+class AdaptiveThrottleMiddleware:
+    """Downloader middleware adapting each download slot's delay and concurrency (AIMD).
+
+    Scrapy's downloader already queues requests per slot and spaces them by
+    the slot's delay, so this middleware never waits itself: it sets the
+    delay and concurrency of the request's slot and lets the downloader hold
+    the request back. A slow domain therefore only delays its own queue.
+
+    Each domain starts at `1 / delay_between_requests` requests/second and may
+    climb to `requests_per_minute / 60`. Fast responses raise the rate and the
+    slot concurrency additively; slow responses (latency above
+    THROTTLE_TARGET_LATENCY) and 429/5xx halve them. A 429/5xx also stretches
+    the slot delay to `retry_delay * 2**n` seconds (or Retry-After) and
+    re-queues the request up to `max_retries` times. User agents rotate
+    through the `user_agents` pool.
+
+    Settings: THROTTLE_CONFIG, THROTTLE_MAX_CONCURRENCY, THROTTLE_TARGET_LATENCY.
+    """
+
+    def __init__(self, crawler, scraping: Dict, max_concurrency: int = 4, target_latency: float = 2.0):
+        self.logger = logging.getLogger(__name__)
+        self.crawler = crawler
+        self.max_rate = scraping.get('requests_per_minute', 30) / 60.0
+        delay = scraping.get('delay_between_requests', 2.0)
+        self.initial_rate = min(self.max_rate, 1.0 / delay) if delay else self.max_rate
+        self.min_rate = self.max_rate / 16
+        self.max_retries = scraping.get('max_retries', 3)
+        self.retry_delay = scraping.get('retry_delay', 5.0)
+        self.user_agents = scraping.get('user_agents') or []
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.domains: Dict[str, DomainState] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        scraping = load_settings(settings.get('THROTTLE_CONFIG', 'config/settings.yaml')).get('scraping', {})
+        middleware = cls(
+            crawler, scraping,
+            max_concurrency=settings.getint('THROTTLE_MAX_CONCURRENCY', 4),
+            target_latency=settings.getfloat('THROTTLE_TARGET_LATENCY', 2.0),
+        )
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def _domain(self, request) -> DomainState:
+        downloader = self.crawler.engine.downloader
+        key = downloader.get_slot_key(request)
+        state = self.domains.get(key)
+        if state is None:
+            state = self.domains[key] = DomainState(self.initial_rate, 1)
+            # Slots the downloader has yet to create start from the configured rate
+            # (DOWNLOAD_SLOTS entries win); the throttle owns the spacing, so no jitter
+            slot_settings = downloader.per_slot_settings.setdefault(key, {})
+            slot_settings.setdefault('delay', state.delay())
+            slot_settings.setdefault('concurrency', state.concurrency)
+            slot_settings.setdefault('jitter', 0)
+        return state
+
+    def process_request(self, request, spider=None):
+        if self.user_agents:
+            request.headers['User-Agent'] = random.choice(self.user_agents)
+        self._domain(request)
+        return None
+
+    def process_response(self, request, response, spider=None):
+        state = self._domain(request)
+        latency = request.meta.get('download_latency')
+        if latency is not None:
+            state.latency = latency if state.latency is None else 0.7 * state.latency + 0.3 * latency
+
+        if response.status in BACKOFF_STATUSES:
+            return self._back_off(request, response, state) or response
+
+        state.consecutive_errors = 0
+        if state.latency is not None and state.latency > self.target_latency:
+            self._decrease(state)
+        else:
+            self._increase(state)
+        self._apply(request, state)
+        return response
+
+    def _back_off(self, request, response, state: DomainState):
+        """Slow the domain down and re-queue the request if retries remain."""
+        state.consecutive_errors += 1
+        self._decrease(state)
+
+        pause = self.retry_delay * 2 ** (state.consecutive_errors - 1)
+        retry_after = response.headers.get(b'Retry-After')
+        if retry_after and retry_after.isdigit():
+            pause = max(pause, float(retry_after))
+        state.paused_until = max(state.paused_until, time.monotonic() + pause)
+        self._apply(request, state)
+
+        retries = request.meta.get('throttle_retries', 0)
+        if retries >= self.max_retries:
+            self.logger.warning(f"Giving up on {request.url} after {retries} retries (HTTP {response.status})")
+            return None
+
+        self.logger.info(f"HTTP {response.status} from {request.url}; backing off {pause:.1f}s "
+                         f"(rate {state.rate * 60:.1f}/min)")
+        retry = request.replace(dont_filter=True)
+        retry.meta['throttle_retries'] = retries + 1
+        return retry
+
+    def _increase(self, state: DomainState) -> None:
+        state.rate = min(self.max_rate, state.rate + self.max_rate / 16)
+        state.concurrency = min(self.max_concurrency, state.concurrency + 1)
+
+    def _decrease(self, state: DomainState) -> None:
+        state.rate = max(self.min_rate, state.rate / 2)
+        state.concurrency = max(1, state.concurrency // 2)
+
+    def _apply(self, request, state: DomainState) -> None:
+        """Push the domain's delay and concurrency onto its download slot."""
+        slot_key = request.meta.get('download_slot')
+        slot = self.crawler.engine.downloader.slots.get(slot_key) if slot_key else None
+        if slot is not None:
+            slot.delay = state.delay()
+            slot.concurrency = state.concurrency
+
+    def spider_closed(self, spider):
+        for domain, state in sorted(self.domains.items()):
+            self.logger.info(f"Throttle {domain}: {state.rate * 60:.1f} req/min, "
+                             f"concurrency {state.concurrency}, latency {state.latency or 0:.2f}s")
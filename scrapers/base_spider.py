@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Base Clearance Job Spider
+Shared crawl and extraction logic for staffing-firm job boards. Site spiders only declare data:
+start URLs, selectors, the job ID regex and naming prefixes.
+"""
+
+import scrapy
+import re
+import zlib
+from datetime import datetime
+from urllib.parse import urljoin, urlparse
+
+from w3lib.url import canonicalize_url
+
+from blob_store import BlobStore
+
+DEFAULT_CLEARANCE_KEYWORDS = [
+    'TS/SCI', 'Top Secret/SCI', 'Top Secret SCI',
+    'TS', 'Top Secret',
+    'Secret', 'SECRET',
+    'Confidential', 'CONFIDENTIAL',
+    'DoD', 'Department of Defense',
+    'Clearance', 'CLEARANCE',
+    'Security Clearance', 'SECURITY CLEARANCE'
+]
+
+
+class ClearanceJobSpider(scrapy.Spider):
+    """Base spider: subclasses set the class attributes below and nothing else."""
+
+    # Site-specific data
+    company = None
+    job_id_prefix = None
+    job_link_selector = 'a[href*="/job/"]::attr(href)'
+    next_page_selector = 'a[aria-label="Next"]::attr(href)'
+    job_id_regex = r'/job/(\d+)'
+    job_detail_patterns = [r'/job/\d+']
+    title_selectors = []
+    location_selectors = []
+    description_selectors = []
+    date_selectors = []
+    clearance_keywords = DEFAULT_CLEARANCE_KEYWORDS
+
+    def __init__(self, *args, **kwargs):
+        super(ClearanceJobSpider, self).__init__(*args, **kwargs)
+        self.scraped_count = 0
+        self.blob_store = None
+
+        # Compile the site data once per spider instead of once per page
+        self._job_id_re = re.compile(self.job_id_regex)
+        self._detail_page_re = re.compile('|'.join(f'(?:{p})' for p in self.job_detail_patterns))
+        self._clearance_keywords_upper = [(k, k.upper()) for k in self.clearance_keywords]
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super(ClearanceJobSpider, cls).from_crawler(crawler, *args, **kwargs)
+        # An empty RAW_HTML_STORE turns raw HTML offloading off
+        path = crawler.settings.get('RAW_HTML_STORE', 'data/raw_html')
+        spider.blob_store = BlobStore(path) if path else None
+        return spider
+
+    def parse(self, response):
+        """Parse the job search results page."""
+        self.logger.info(f"Parsing search results: {response.url}")
+
+        # Extract job listing links
+        job_links = response.css(self.job_link_selector).getall()
+
+        for link in job_links:
+            full_url = urljoin(response.url, link)
+            if self._is_job_detail_page(full_url):
+                yield scrapy.Request(
+                    url=full_url,
+                    callback=self.parse_job_detail,
+                    meta={'source_url': response.url, 'frontier': True}
+                )
+
+        # Follow pagination
+        next_page = response.css(self.next_page_selector).get()
+        if next_page:
+            yield scrapy.Request(
+                url=urljoin(response.url, next_page),
+                callback=self.parse
+            )
+
+    def parse_job_detail(self, response):
+        """Parse individual job detail page."""
+        self.logger.info(f"Parsing job detail: {response.url}")
+
+        try:
+            job_data = self.extract_job(response)
+
+            # Only yield if clearance level is found
+            if job_data['clearance_level']:
+                self.scraped_count += 1
+                self.logger.info(f"Scraped job {self.scraped_count}: {job_data['title']}")
+                yield job_data
+            else:
+                self.logger.debug(f"No clearance found for job: {job_data['title']}")
+
+        except Exception as e:
+            self.logger.error(f"Error parsing job detail {response.url}: {str(e)}")
+
+    def extract_job(self, response):
+        """Extract every field from one parse of the page.
+
+        The description is extracted once and reused for the clearance scan,
+        and the raw HTML is offloaded to the blob store so the item only
+        carries its hash.
+        """
+        selector = response.selector
+        description = self._extract_description(selector)
+
+        return {
+            'job_id': self._extract_job_id(response, selector),
+            'title': self._first_text(selector, self.title_selectors),
+            'company': self.company,
+            'location': self._first_text(selector, self.location_selectors),
+            'clearance_level': self._extract_clearance(description),
+            'description': description,
+            'url': response.url,
+            'posted_date': self._first_text(selector, self.date_selectors),
+            'source': self.company,
+            'scraped_at': datetime.now().isoformat(),
+            'raw_html_hash': self._store_raw_html(response)
+        }
+
+    def _extract_job_id(self, response, selector):
+        """Extract job ID from URL or page content."""
+        # Try to extract from URL first
+        url_path = urlparse(response.url).path
+        job_id_match = self._job_id_re.search(url_path)
+        if job_id_match:
+            return f"{self.job_id_prefix}_{job_id_match.group(1)}"
+
+        # Try to extract from page content
+        job_id_element = selector.css('[data-job-id]::attr(data-job-id)').get()
+        if job_id_element:
+            return f"{self.job_id_prefix}_{job_id_element}"
+
+        # Fallback to a URL checksum (stable across runs, unlike hash())
+        return f"{self.job_id_prefix}_{zlib.crc32(response.url.encode('utf-8')) % 1000000}"
+
+    def _first_text(self, selector, selectors):
+        """Return the first non-empty match from a prioritized selector chain."""
+        for css in selectors:
+            value = selector.css(css).get()
+            if value:
+                return value.strip()
+
+        return None
+
+    def _extract_description(self, selector):
+        """Extract job description."""
+        for css in self.description_selectors:
+            description_elements = selector.css(css)
+            if description_elements:
+                # Get all text content
+                description_text = ' '.join(description_elements.css('::text').getall())
+                if description_text.strip():
+                    return description_text.strip()
+
+        return None
+
+    def _extract_clearance(self, description):
+        """Extract clearance level from an already extracted description."""
+        if not description:
+            return None
+
+        # Look for clearance keywords in description
+        description_upper = description.upper()
+        for keyword, keyword_upper in self._clearance_keywords_upper:
+            if keyword_upper in description_upper:
+                return keyword
+
+        return None
+
+    def _store_raw_html(self, response):
+        """Offload raw HTML to the content-addressed store and return its hash."""
+        if self.blob_store is None:
+            return None
+        return self.blob_store.put(response.body)
+
+    def frontier_key(self, url):
+        """Crawl-frontier identity of a detail page: the site job ID when the URL carries one."""
+        job_id_match = self._job_id_re.search(urlparse(url).path)
+        if job_id_match:
+            return f"{self.job_id_prefix}_{job_id_match.group(1)}"
+        return canonicalize_url(url)
+
+    def _is_job_detail_page(self, url):
+        """Check if URL is a job detail page."""
+        return self._detail_page_re.search(url) is not None
+
+    def closed(self, reason):
+        """Called when spider is closed."""
+        self.logger.info(f"Spider closed. Total jobs scraped: {self.scraped_count}")
+
+        # Log summary
+        if self.scraped_count > 0:
+            self.logger.info(f"Successfully scraped {self.scraped_count} jobs from {self.company}")
+        else:
+            self.logger.warning("No jobs with clearance requirements found")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Raw HTML Blob Store
+Content-addressed, gzip-compressed storage for raw pages so scraped items only carry a hash.
+"""
+
+import gzip
+import hashlib
+import os
+import tempfile
+from typing import Optional
+
+
+class BlobStore:
+    """Stores blobs under `root/ab/cd/<sha256>.gz`; identical pages are written once."""
+
+    def __init__(self, root: str = "data/raw_html", compresslevel: int = 6):
+        self.root = root
+        self.compresslevel = compresslevel
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], f"{digest}.gz")
+
+    def put(self, data: bytes) -> str:
+        """Store `data` if not already present and return its SHA-256 hex digest."""
+        digest = self.digest(data)
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            return digest
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(gzip.compress(data, compresslevel=self.compresslevel))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """Return the stored blob, or None if it is not in the store."""
+        try:
+            with open(self.path_for(digest), 'rb') as f:
+                return gzip.decompress(f.read())
+        except FileNotFoundError:
+            return None
+
+    def __contains__(self, digest: str) -> bool:
+        return os.path.exists(self.path_for(digest))
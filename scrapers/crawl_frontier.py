@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Persistent Crawl Frontier
+Remembers every job detail page across runs (fingerprint, ETag/Last-Modified, content hash) so
+spiders skip duplicate URLs, send conditional requests and drop unchanged postings.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, Optional
+
+from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from w3lib.url import canonicalize_url
+
+
+class CrawlFrontier:
+    """SQLite store of detail pages keyed by fingerprint."""
+
+    def __init__(self, path: str = "data/crawl_frontier.sqlite"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                fingerprint TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                last_fetched REAL NOT NULL
+            )"""
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def fingerprint(key: str) -> str:
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get(self, fingerprint: str) -> Optional[Dict]:
+        row = self.conn.execute(
+            "SELECT url, etag, last_modified, content_hash, last_fetched FROM pages WHERE fingerprint = ?",
+            (fingerprint,)
+        ).fetchone()
+        if not row:
+            return None
+        return dict(zip(('url', 'etag', 'last_modified', 'content_hash', 'last_fetched'), row))
+
+    def update(self, fingerprint: str, url: str, etag: Optional[str] = None,
+               last_modified: Optional[str] = None, content_hash: Optional[str] = None) -> None:
+        self.conn.execute(
+            """INSERT INTO pages (fingerprint, url, etag, last_modified, content_hash, last_fetched)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(fingerprint) DO UPDATE SET
+                   url = excluded.url,
+                   etag = COALESCE(excluded.etag, pages.etag),
+                   last_modified = COALESCE(excluded.last_modified, pages.last_modified),
+                   content_hash = COALESCE(excluded.content_hash, pages.content_hash),
+                   last_fetched = excluded.last_fetched""",
+            (fingerprint, url, etag, last_modified, content_hash, time.time())
+        )
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def rollback(self) -> None:
+        self.conn.rollback()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+
+class CrawlFrontierMiddleware:
+    """Downloader middleware that consults the frontier for requests marked `meta['frontier']`.
+
+    - Requests whose key was already scheduled this run are dropped, which
+      dedupes the overlapping keyword searches.
+    - Pages fetched within FRONTIER_RECRAWL_HOURS are not requested at all.
+    - Otherwise stored validators are sent as If-None-Match/If-Modified-Since;
+      a 304, or a 200 whose body hash matches the last fetch, is dropped
+      before it reaches the spider.
+
+    New validators and hashes are only committed once the crawl finishes
+    cleanly (spider closed with reason "finished"). A crawl that crashes or
+    is stopped rolls them back, so its pages are fetched and parsed again
+    next run instead of being dropped as unchanged with their items never
+    exported.
+
+    Settings: FRONTIER_ENABLED, FRONTIER_DB, FRONTIER_RECRAWL_HOURS.
+    """
+
+    def __init__(self, crawler, frontier: CrawlFrontier, recrawl_hours: float = 0):
+        self.logger = logging.getLogger(__name__)
+        self.crawler = crawler
+        self.frontier = frontier
+        self.recrawl_seconds = recrawl_hours * 3600
+        self.seen = set()
+        self.stats = {'duplicate': 0, 'fresh': 0, 'not_modified': 0, 'unchanged': 0, 'changed': 0}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('FRONTIER_ENABLED', True):
+            raise NotConfigured
+        middleware = cls(
+            crawler,
+            CrawlFrontier(settings.get('FRONTIER_DB', 'data/crawl_frontier.sqlite')),
+            recrawl_hours=settings.getfloat('FRONTIER_RECRAWL_HOURS', 0),
+        )
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def _key(self, request) -> str:
+        key_func = getattr(self.crawler.spider, 'frontier_key', None)
+        return key_func(request.url) if key_func else canonicalize_url(request.url)
+
+    def process_request(self, request, spider=None):
+        if not request.meta.get('frontier'):
+            return None
+
+        fingerprint = request.meta.get('frontier_fingerprint')
+        if fingerprint is None:
+            fingerprint = self.frontier.fingerprint(self._key(request))
+            if fingerprint in self.seen:
+                self.stats['duplicate'] += 1
+                raise IgnoreRequest(f"Duplicate job page in this run: {request.url}")
+            self.seen.add(fingerprint)
+            request.meta['frontier_fingerprint'] = fingerprint
+
+        record = self.frontier.get(fingerprint)
+        if not record:
+            return None
+
+        if self.recrawl_seconds and time.time() - record['last_fetched'] < self.recrawl_seconds:
+            self.stats['fresh'] += 1
+            raise IgnoreRequest(f"Fetched within recrawl interval: {request.url}")
+
+        if record['etag']:
+            request.headers.setdefault('If-None-Match', record['etag'])
+        if record['last_modified']:
+            request.headers.setdefault('If-Modified-Since', record['last_modified'])
+        request.meta['frontier_previous_hash'] = record['content_hash']
+        return None
+
+    def process_response(self, request, response, spider=None):
+        fingerprint = request.meta.get('frontier_fingerprint')
+        if not fingerprint:
+            return response
+
+        if response.status == 304:
+            self.frontier.update(fingerprint, request.url)
+            self.stats['not_modified'] += 1
+            raise IgnoreRequest(f"Not modified: {request.url}")
+
+        if response.status != 200:
+            return response
+
+        content_hash = hashlib.sha256(response.body).hexdigest()
+        self.frontier.update(
+            fingerprint, request.url,
+            etag=self._header(response, b'ETag'),
+            last_modified=self._header(response, b'Last-Modified'),
+            content_hash=content_hash,
+        )
+
+        if content_hash == request.meta.get('frontier_previous_hash'):
+            self.stats['unchanged'] += 1
+            raise IgnoreRequest(f"Unchanged since last crawl: {request.url}")
+
+        self.stats['changed'] += 1
+        return response
+
+    @staticmethod
+    def _header(response, name: bytes) -> Optional[str]:
+        value = response.headers.get(name)
+        return value.decode('latin-1') if value else None
+
+    def spider_closed(self, spider, reason):
+        if reason == 'finished':
+            self.frontier.commit()
+        else:
+            self.frontier.rollback()
+            self.logger.warning(f"Crawl ended with reason {reason!r}; frontier updates from this run discarded")
+        self.frontier.close()
+        self.logger.info(f"Crawl frontier: {self.stats}")
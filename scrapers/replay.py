@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Spider Record/Replay Harness
+Records live search and detail responses into compressed fixtures, replays them through a spider
+without touching the network, and benchmarks parse throughput offline.
+
+Usage:
+    python replay.py record --spider insight_global --fixtures fixtures/insight_global.jsonl.gz
+    python replay.py replay --spider insight_global --fixtures fixtures/insight_global.jsonl.gz
+    python replay.py bench  --spider insight_global --fixtures fixtures/insight_global.jsonl.gz --pages 100000
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+from itertools import cycle, islice
+from typing import Dict, Iterator, List
+
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import HtmlResponse
+from w3lib.url import canonicalize_url
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from adaptive_throttle import AdaptiveThrottleMiddleware
+from apex_systems_spider import ApexSystemsSpider
+from insight_global_spider import InsightGlobalSpider
+
+SPIDERS = {
+    InsightGlobalSpider.name: InsightGlobalSpider,
+    ApexSystemsSpider.name: ApexSystemsSpider,
+}
+
+EXTRACTION_CHAINS = ('title_selectors', 'location_selectors', 'description_selectors', 'date_selectors')
+
+
+def iter_fixtures(path: str) -> Iterator[Dict]:
+    """Yield recorded responses from a gzip-compressed JSONL fixture file."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def fixture_to_response(fixture: Dict) -> HtmlResponse:
+    return HtmlResponse(
+        url=fixture['url'],
+        status=fixture.get('status', 200),
+        headers=fixture.get('headers') or {},
+        body=fixture['body'].encode(fixture.get('encoding', 'utf-8')),
+        encoding=fixture.get('encoding', 'utf-8'),
+    )
+
+
+class RecordMiddleware:
+    """Downloader middleware that appends every text response to REPLAY_RECORD."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = gzip.open(path, 'at', encoding='utf-8')
+        self.count = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get('REPLAY_RECORD')
+        if not path:
+            raise NotConfigured
+        from scrapy import signals
+        middleware = cls(path)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def process_response(self, request, response, spider=None):
+        if hasattr(response, 'text'):
+            callback = getattr(request.callback, '__name__', None) or 'parse'
+            self.file.write(json.dumps({
+                'url': response.url,
+                'status': response.status,
+                'headers': {k.decode('latin-1'): v[0].decode('latin-1') for k, v in response.headers.items() if v},
+                'encoding': response.encoding,
+                'callback': callback,
+                'body': response.text,
+            }, ensure_ascii=False))
+            self.file.write('\n')
+            self.count += 1
+        return response
+
+    def spider_closed(self, spider):
+        self.file.close()
+        logging.getLogger(__name__).info(f"Recorded {self.count} responses")
+
+
+class ReplayMiddleware:
+    """Downloader middleware that serves responses from REPLAY_FROM and never hits the network."""
+
+    def __init__(self, path: str):
+        self.responses = {canonicalize_url(f['url']): f for f in iter_fixtures(path)}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get('REPLAY_FROM')
+        if not path:
+            raise NotConfigured
+        return cls(path)
+
+    def process_request(self, request, spider=None):
+        fixture = self.responses.get(canonicalize_url(request.url))
+        if fixture is None:
+            raise IgnoreRequest(f"No recorded response for {request.url}")
+        return fixture_to_response(fixture)
+
+
+def run_spider(spider_cls, overrides: Dict) -> None:
+    """Crawl with the spider's own settings plus `overrides` (middleware dicts are merged)."""
+    from scrapy.crawler import CrawlerProcess
+
+    settings = dict(spider_cls.custom_settings or {})
+    middlewares = dict(settings.get('DOWNLOADER_MIDDLEWARES', {}))
+    middlewares.update(overrides.get('DOWNLOADER_MIDDLEWARES', {}))
+    settings.update(overrides)
+    settings['DOWNLOADER_MIDDLEWARES'] = middlewares
+
+    harness_cls = type(spider_cls.__name__, (spider_cls,), {'custom_settings': settings})
+    process = CrawlerProcess()
+    process.crawl(harness_cls)
+    process.start()
+
+
+def selector_depth(spider, response, chain: str) -> int:
+    """Index of the first selector in a chain that matches (len(chain) if none do)."""
+    selectors = getattr(spider, chain)
+    for depth, css in enumerate(selectors):
+        if response.css(css):
+            return depth
+    return len(selectors)
+
+
+def benchmark(spider_cls, fixtures: List[Dict], pages: int) -> Dict:
+    """Time parse() and parse_job_detail() over `pages` responses cycled from the fixtures."""
+    spider = spider_cls()
+    spider.blob_store = None
+    by_callback: Dict[str, List[Dict]] = {'parse': [], 'parse_job_detail': []}
+    for fixture in fixtures:
+        by_callback.setdefault(fixture.get('callback', 'parse'), []).append(fixture)
+
+    results = {}
+    for callback, corpus in by_callback.items():
+        if not corpus or not hasattr(spider, callback):
+            continue
+        # Build responses up front so only parsing is timed
+        responses = [fixture_to_response(f) for f in islice(cycle(corpus), pages)]
+        method = getattr(spider, callback)
+        items = requests = 0
+        start = time.perf_counter()
+        for response in responses:
+            for output in method(response):
+                if isinstance(output, dict):
+                    items += 1
+                else:
+                    requests += 1
+        elapsed = time.perf_counter() - start
+        results[callback] = {
+            'pages': len(responses),
+            'seconds': elapsed,
+            'pages_per_sec': len(responses) / elapsed if elapsed else 0.0,
+            'items_per_sec': items / elapsed if elapsed else 0.0,
+            'items': items,
+            'requests': requests,
+        }
+
+    detail = [fixture_to_response(f) for f in by_callback.get('parse_job_detail', [])]
+    if detail:
+        results['selector_depth'] = {
+            chain: sum(selector_depth(spider, r, chain) for r in detail) / len(detail)
+            for chain in EXTRACTION_CHAINS
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record, replay and benchmark spiders offline')
+    parser.add_argument('command', choices=['record', 'replay', 'bench'])
+    parser.add_argument('--spider', '-s', required=True, choices=sorted(SPIDERS))
+    parser.add_argument('--fixtures', '-f', required=True, help='Fixture file (.jsonl.gz)')
+    parser.add_argument('--pages', '-n', type=int, default=1000,
+                        help='Pages per callback for bench; fixtures are cycled to reach it')
+    parser.add_argument('--output', '-o', help='Feed output for replay (default: stdout summary only)')
+
+    args = parser.parse_args()
+
+    # Per-page spider logging would dominate the benchmark timings
+    logging.basicConfig(level=logging.WARNING if args.command == 'bench' else logging.INFO)
+    spider_cls = SPIDERS[args.spider]
+
+    if args.command == 'record':
+        run_spider(spider_cls, {
+            'REPLAY_RECORD': args.fixtures,
+            # Record every page, including ones the frontier would drop as unchanged
+            'FRONTIER_ENABLED': False,
+            'DOWNLOADER_MIDDLEWARES': {RecordMiddleware: 950},
+        })
+    elif args.command == 'replay':
+        settings = {
+            'REPLAY_FROM': args.fixtures,
+            'ROBOTSTXT_OBEY': False,
+            'FRONTIER_ENABLED': False,
+            # Replays must not write raw HTML next to wherever they are run from
+            'RAW_HTML_STORE': '',
+            # Replay is served locally, so drop the politeness throttle
+            'DOWNLOADER_MIDDLEWARES': {
+                ReplayMiddleware: 50,
+                AdaptiveThrottleMiddleware: None,
+            },
+            'DOWNLOAD_DELAY': 0,
+            'CONCURRENT_REQUESTS_PER_DOMAIN': 64,
+            'FEEDS': {args.output: {'format': 'jsonlines'}} if args.output else {},
+        }
+        run_spider(spider_cls, settings)
+    else:
+        fixtures = list(iter_fixtures(args.fixtures))
+        results = benchmark(spider_cls, fixtures, args.pages)
+        for callback in ('parse', 'parse_job_detail'):
+            if callback in results:
+                r = results[callback]
+                print(f"{callback:17s} {r['pages']:>7d} pages  {r['pages_per_sec']:>9,.0f} pages/sec  "
+                      f"{r['items_per_sec']:>9,.0f} items/sec  ({r['requests']} requests)")
+        for chain, depth in results.get('selector_depth', {}).items():
+            print(f"{chain:22s} mean fallback depth {depth:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+import yaml
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add project root to path, as the pipeline scripts do
+sys.path.append(PROJECT_ROOT)
+# Spiders import their siblings by bare name, as Scrapy runs them from scrapers/
+sys.path.append(os.path.join(PROJECT_ROOT, 'scrapers'))
+
+
+def merge_settings(settings, overrides):
+    """Merge nested override dicts into settings in place; other values replace what is there."""
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(settings.get(key), dict):
+            merge_settings(settings[key], value)
+        else:
+            settings[key] = value
+
+
+@pytest.fixture
+def write_settings(tmp_path):
+    """Writes the project settings plus overrides to tmp_path/settings.yaml and returns its path.
+
+    Knowledge base sources are read from the project and its compiled cache is
+    kept under tmp_path.
+    """
+    def write(overrides=None):
+        with open(f'{PROJECT_ROOT}/config/settings.yaml') as f:
+            settings = yaml.safe_load(f)
+        settings['knowledge_base'].update({name: f'{PROJECT_ROOT}/{path}' for name, path
+                                           in settings['knowledge_base'].items() if name != 'cache_path'})
+        settings['knowledge_base']['cache_path'] = str(tmp_path / 'knowledge_base.json')
+        merge_settings(settings, overrides or {})
+        path = tmp_path / 'settings.yaml'
+        path.write_text(yaml.safe_dump(settings))
+        return str(path)
+    return write
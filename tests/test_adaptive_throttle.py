@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+import pytest
+from scrapy.http import Request, Response
+
+from adaptive_throttle import AdaptiveThrottleMiddleware
+
+SCRAPING = {'requests_per_minute': 60, 'delay_between_requests': 4.0, 'max_retries': 2, 'retry_delay': 5.0,
+            'user_agents': ['agent-a', 'agent-b']}
+
+
+@pytest.fixture
+def downloader():
+    return SimpleNamespace(get_slot_key=lambda request: urlparse(request.url).hostname,
+                           per_slot_settings={}, slots={})
+
+
+@pytest.fixture
+def throttle(downloader):
+    crawler = SimpleNamespace(engine=SimpleNamespace(downloader=downloader))
+    return AdaptiveThrottleMiddleware(crawler, SCRAPING, max_concurrency=4, target_latency=2.0)
+
+
+def request_for(url='https://jobs.example.com/job/1', latency=0.5):
+    return Request(url, meta={'download_slot': urlparse(url).hostname, 'download_latency': latency})
+
+
+def test_new_slots_start_at_the_configured_rate(throttle, downloader):
+    request = request_for()
+    throttle.process_request(request)
+    assert downloader.per_slot_settings['jobs.example.com'] == {'delay': 4.0, 'concurrency': 1, 'jitter': 0}
+    assert request.headers['User-Agent'] in (b'agent-a', b'agent-b')
+
+
+def test_fast_responses_raise_rate_and_concurrency(throttle, downloader):
+    slot = downloader.slots['jobs.example.com'] = SimpleNamespace(delay=4.0, concurrency=1)
+    for _ in range(5):
+        request = request_for()
+        throttle.process_request(request)
+        throttle.process_response(request, Response(request.url, status=200))
+    assert slot.concurrency == 4
+    assert slot.delay < 4.0
+    assert throttle.domains['jobs.example.com'].rate <= 1.0
+
+
+def test_slow_responses_halve_rate_and_concurrency(throttle):
+    state = throttle._domain(request_for())
+    state.rate, state.concurrency = 1.0, 4
+    request = request_for(latency=5.0)
+    throttle.process_response(request, Response(request.url, status=200))
+    assert (state.rate, state.concurrency) == (0.5, 2)
+
+
+def test_throttled_responses_back_off_and_retry(throttle, downloader):
+    slot = downloader.slots['jobs.example.com'] = SimpleNamespace(delay=4.0, concurrency=1)
+    request = request_for()
+    retry = throttle.process_response(request, Response(request.url, status=429, headers={'Retry-After': '30'}))
+    assert isinstance(retry, Request) and retry.meta['throttle_retries'] == 1
+    assert 29 < slot.delay <= 30
+
+    retry.meta['throttle_retries'] = SCRAPING['max_retries']
+    response = Response(request.url, status=503)
+    assert throttle.process_response(retry, response) is response
+
+
+def test_domains_are_throttled_independently(throttle):
+    throttle.process_response(request_for(), Response('https://jobs.example.com/job/1', status=429))
+    other = throttle._domain(request_for('https://careers.example.org/job/2'))
+    assert other.paused_until == 0.0
+    assert other.delay() == 4.0
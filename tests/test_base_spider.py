@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+
+from blob_store import BlobStore
+from insight_global_spider import InsightGlobalSpider
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DETAIL_PAGE = b"""<html><body>
+<div class="job-header"><h1> Radar Systems Engineer </h1></div>
+<span class="location">Ogden, UT</span>
+<span class="job-date">2 days ago</span>
+<div class="job-description"><p>Support GBSD integration.</p><p>Active Top Secret clearance required.</p></div>
+</body></html>"""
+
+SEARCH_PAGE = b"""<html><body>
+<a href="/job/123">Engineer</a>
+<a href="/about">About</a>
+<a aria-label="Next" href="/search?page=2">Next</a>
+</body></html>"""
+
+
+def response(url, body):
+    return HtmlResponse(url=url, body=body, encoding='utf-8', request=Request(url))
+
+
+def test_extract_job_uses_fallback_selectors():
+    spider = InsightGlobalSpider()
+    job = spider.extract_job(response('https://jobs.insightglobal.com/job/4567?src=x', DETAIL_PAGE))
+    assert job['job_id'] == 'insight_4567'
+    assert job['title'] == 'Radar Systems Engineer'
+    assert job['location'] == 'Ogden, UT'
+    assert job['posted_date'] == '2 days ago'
+    assert job['description'] == 'Support GBSD integration. Active Top Secret clearance required.'
+    assert job['clearance_level'] == 'Top Secret'
+    assert job['raw_html_hash'] is None
+
+
+def test_raw_html_goes_to_the_blob_store(tmp_path):
+    spider = InsightGlobalSpider()
+    spider.blob_store = BlobStore(str(tmp_path))
+    job = spider.extract_job(response('https://jobs.insightglobal.com/job/4567', DETAIL_PAGE))
+    assert spider.blob_store.get(job['raw_html_hash']) == DETAIL_PAGE
+
+
+def test_parse_follows_detail_pages_and_pagination():
+    spider = InsightGlobalSpider()
+    requests = list(spider.parse(response('https://jobs.insightglobal.com/search?keywords=TS', SEARCH_PAGE)))
+    assert [(r.url, r.callback.__name__) for r in requests] == [
+        ('https://jobs.insightglobal.com/job/123', 'parse_job_detail'),
+        ('https://jobs.insightglobal.com/search?page=2', 'parse'),
+    ]
+    assert spider.frontier_key(requests[0].url) == 'insight_123'
+
+
+def runspider_middlewares(spider_file):
+    """Downloader middlewares as Scrapy resolves them under `scrapy runspider`.
+
+    runspider only puts scrapers/ on sys.path while it imports the spider, so
+    this runs in a fresh interpreter without the conftest path change.
+    """
+    script = (
+        'from scrapy.commands.runspider import _import_file\n'
+        'from scrapy.utils.misc import load_object\n'
+        'from scrapy.utils.spider import iter_spider_classes\n'
+        f'[spider] = iter_spider_classes(_import_file({spider_file!r}))\n'
+        'for key in spider.custom_settings["DOWNLOADER_MIDDLEWARES"]:\n'
+        '    try:\n'
+        '        print(load_object(key).__name__)\n'
+        '    except ImportError:\n'
+        '        print(f"unresolved {key}")\n'
+    )
+    return subprocess.run([sys.executable, '-c', script], cwd=PROJECT_ROOT, capture_output=True, text=True,
+                          check=True).stdout.split()
+
+
+@pytest.mark.parametrize('spider_file', ['scrapers/apex_systems_spider.py', 'scrapers/insight_global_spider.py'])
+def test_middlewares_resolve_under_runspider(spider_file):
+    assert runspider_middlewares(spider_file) == ['CrawlFrontierMiddleware', 'AdaptiveThrottleMiddleware']
@@ -0,0 +1,35 @@
+from pipelines.mapping_engine.batch_prompts import create_batch_prompt, parse_batch_response, render_job
+
+
+def test_prompt_sections_are_keyed_by_job_id():
+    section = render_job('job-1', {'title': 'Engineer', 'company': 'Boeing'}, ['KC-46', 'F/A-18'], 'Tanker work')
+    prompt = create_batch_prompt(['- KC-46: Pegasus'], [section], 'job-1')
+    assert '### job_id: job-1\n- Title: Engineer\n' in prompt
+    assert '- Candidates: KC-46, F/A-18\n' in prompt
+    assert '"job_id": "job-1"' in prompt
+
+
+def test_reply_is_split_by_job_id():
+    reply = '''Sure, here are the mappings:
+    [{"job_id": "a", "mapped_programs": ["GBSD"], "confidence_score": 0.9},
+     {"job_id": 7, "mapped_programs": [], "confidence_score": 0}]'''
+    assert set(parse_batch_response(reply)) == {'a', '7'}
+
+
+def test_invalid_and_duplicate_entries_are_left_for_retry():
+    reply = '''[
+        {"job_id": "bad-score", "mapped_programs": ["GBSD"], "confidence_score": 1.5},
+        {"job_id": "bad-list", "mapped_programs": "GBSD", "confidence_score": 0.5},
+        {"job_id": "bool", "mapped_programs": [], "confidence_score": true},
+        {"job_id": "twice", "mapped_programs": [], "confidence_score": 0.1},
+        {"job_id": "twice", "mapped_programs": ["B-21"], "confidence_score": 0.2},
+        {"job_id": "ok", "mapped_programs": ["B-21"], "confidence_score": 0.2},
+        "not an object"
+    ]'''
+    assert list(parse_batch_response(reply)) == ['ok']
+
+
+def test_unparsable_replies_yield_nothing():
+    assert parse_batch_response('') == {}
+    assert parse_batch_response('no JSON here') == {}
+    assert parse_batch_response('[{"job_id": "a",]') == {}
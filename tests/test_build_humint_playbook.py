@@ -0,0 +1,113 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from config.settings import resolve_path
+from pipelines.playbook_engine.build_humint_playbook import PlaybookBuilder, PlaybookPrompt, section_graph
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def playbook_settings(tmp_path):
+    """Settings overrides that keep every data file under tmp_path."""
+    return {
+        'scoring': {'mappings_path': str(tmp_path / 'mappings.json'), 'jobs_path': str(tmp_path / 'jobs.json'),
+                    'output_path': str(tmp_path / 'scores.json')},
+        'org_chart': {'output_path': str(tmp_path / 'org_charts.json')},
+        'entity_resolution': {'output_path': str(tmp_path / 'contacts.csv')},
+        'hiring_trends': {'path': str(tmp_path / 'trends.sqlite')},
+        'playbook': {'prompt_path': f'{PROJECT_ROOT}/prompts/bd_playbook_prompt.md',
+                     'cache_path': str(tmp_path / 'sections.sqlite')},
+    }
+
+
+def write_jobs(tmp_path, titles):
+    jobs = [{'job_id': f'job-{i}', 'title': title, 'company': 'Northrop Grumman', 'location': 'Roy, UT',
+             'clearance_level': 'TS/SCI', 'posted_date': '2026-10-01'} for i, title in enumerate(titles)]
+    (tmp_path / 'jobs.json').write_text(json.dumps(jobs))
+    (tmp_path / 'mappings.json').write_text(json.dumps(
+        [{'job_id': job['job_id'], 'mapped_programs': ['GBSD'], 'confidence_score': 0.9} for job in jobs]))
+
+
+def build(config_path):
+    """One outline-mode run, as a fresh process would do it: (section stats, assembled playbook)."""
+    builder = PlaybookBuilder(config_path, mode='outline')
+    try:
+        asyncio.run(builder.build_async([('Northrop Grumman', 'GBSD')]))
+        stats = {name: builder.stats[name] for name in ('generated', 'cached')}
+        return stats, builder.assemble('Northrop Grumman', 'GBSD')
+    finally:
+        builder.close()
+
+
+@pytest.fixture
+def config_path(tmp_path, write_settings):
+    write_jobs(tmp_path, ['Sentinel Systems Engineer', 'ICBM Test Engineer'])
+    return write_settings(playbook_settings(tmp_path))
+
+
+def test_unchanged_inputs_reuse_every_section(config_path):
+    assert build(config_path)[0] == {'generated': 6, 'cached': 0}
+    assert build(config_path)[0] == {'generated': 0, 'cached': 6}
+
+
+def test_changed_input_regenerates_only_its_dependents(config_path, tmp_path):
+    build(config_path)
+    write_jobs(tmp_path, ['Sentinel Systems Engineer', 'ICBM Test Engineer', 'Launch Control Engineer'])
+    stats, playbook = build(config_path)
+    # jobs feeds target_company_analysis and opportunity_assessment, which invalidate the sections after
+    # them; strategic_approach redrafts to the same text, so action_plan (after it alone) stays cached
+    assert stats == {'generated': 5, 'cached': 1}
+    assert 'Launch Control Engineer' in playbook
+
+
+def test_playbook_lists_sections_in_prompt_order(config_path):
+    _, playbook = build(config_path)
+    headings = [line[3:] for line in playbook.splitlines() if line.startswith('## ')]
+    assert headings == ['Executive Summary', 'Target Company Analysis', 'Opportunity Assessment',
+                        'Strategic Approach', 'Action Plan', 'Risk Assessment']
+    assert playbook.startswith('# BD Playbook: Northrop Grumman - GBSD Program\n\n_Ground Based Strategic Deterrent_')
+
+
+def test_targets_default_to_each_programs_prime(config_path):
+    builder = PlaybookBuilder(config_path, mode='outline')
+    try:
+        assert builder.targets(None, ['gbsd', 'B-21']) == [('Northrop Grumman', 'GBSD'),
+                                                           ('Northrop Grumman', 'B-21')]
+        with pytest.raises(ValueError, match='Unknown program'):
+            builder.targets(None, ['X-99'])
+    finally:
+        builder.close()
+
+
+@pytest.fixture(scope='module')
+def prompt():
+    return PlaybookPrompt.load(f'{PROJECT_ROOT}/prompts/bd_playbook_prompt.md')
+
+
+def test_section_graph_orders_dependencies_first(prompt):
+    graph = section_graph(None, prompt)
+    order = list(graph)
+    for section, node in graph.items():
+        assert all(order.index(upstream) < order.index(section) for upstream in node['after'])
+
+
+@pytest.mark.parametrize('sections, message', [
+    ({'action_plan': {'after': ['risk_assessment']}, 'risk_assessment': {'after': ['action_plan']}}, 'cycle'),
+    ({'action_plan': {'inputs': ['weather']}}, 'unknown inputs: weather'),
+    ({'action_plan': {'after': ['risk_assessment']}}, 'undefined sections: risk_assessment'),
+    ({'appendix': {}}, 'not in the playbook prompt'),
+])
+def test_section_graph_rejects_bad_configurations(prompt, sections, message):
+    with pytest.raises(ValueError, match=message):
+        section_graph(sections, prompt)
+
+
+def test_resolve_path_falls_back_to_the_project_root(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert resolve_path('prompts/bd_playbook_prompt.md') == os.path.join(PROJECT_ROOT, 'prompts/bd_playbook_prompt.md')
+    (tmp_path / 'prompts').mkdir()
+    (tmp_path / 'prompts' / 'bd_playbook_prompt.md').write_text('local')
+    assert resolve_path('prompts/bd_playbook_prompt.md') == 'prompts/bd_playbook_prompt.md'
@@ -0,0 +1,125 @@
+import csv
+
+import pytest
+
+from config.settings import load_settings
+from pipelines.org_engine.build_org_charts import OrgChartBuilder, iter_contacts
+from pipelines.org_engine.title_levels import TitleLevelClassifier
+
+HEADER = ['ZoomInfo Contact ID', 'First Name', 'Last Name', 'Job Title', 'Management Level',
+          'Company Name', 'Department', 'Person City', 'Person State', 'Email Address']
+PROGRAM_TERMS = {'gbsd': ['GBSD'], 'sentinel': ['GBSD']}
+
+
+def write_export(path, rows, company='Northrop Grumman', department='Engineering', site=('Roy', 'Utah')):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for contact_id, name, title in rows:
+            first, last = name.split()
+            writer.writerow([contact_id, first, last, title, '', company, department, *site,
+                             f'{first}.{last}@example.com'])
+    return str(path)
+
+
+ENGINEERING = [
+    ('1', 'Ada Director', 'Director of Engineering'),
+    ('2', 'Sam Software', 'Software Manager'),
+    ('3', 'Tia Test', 'Test Manager'),
+    ('4', 'Dev One', 'Senior Software Developer'),
+    ('5', 'Tech Two', 'Senior Test Technician'),
+]
+
+
+@pytest.fixture
+def settings():
+    return load_settings('config/settings.yaml')
+
+
+def reporting(builder, key):
+    builder.build()
+    return {contact_id: parent for contact_id, parent in builder.subtrees[key]}
+
+
+def test_titles_take_the_most_senior_matching_level(settings):
+    org = settings['org_chart']
+    classifier = TitleLevelClassifier(org['title_patterns'], org['level_order'])
+    assert classifier.classify('Sr Director, Mission Systems') == 'director'
+    assert classifier.classify('Senior Engineering Lead') == 'lead'
+    assert classifier.classify('Systems Engineer') == 'individual'
+    assert classifier.classify('Systems Engineer', 'Manager') == 'manager'
+    with pytest.raises(ValueError):
+        TitleLevelClassifier(org['title_patterns'], ['executive', 'director'])
+
+
+def test_contacts_report_by_shared_function_word(settings, tmp_path):
+    builder = OrgChartBuilder(settings, PROGRAM_TERMS)
+    assert builder.add_file(write_export(tmp_path / 'eng.csv', ENGINEERING)) == 5
+    assert reporting(builder, ('site:Roy, Utah', 'Northrop Grumman', 'Engineering')) == {
+        '1': None,
+        # No word in common with the director, who is the only one at the next level up
+        '2': '1', '3': '1',
+        '4': '2', '5': '3',
+    }
+
+
+def test_export_ids_fall_back_to_the_profile_url(tmp_path):
+    path = tmp_path / 'export.csv'
+    path.write_text('ZoomInfo Contact Profile URL,First Name,Last Name,Job Title\n'
+                    'https://app.zoominfo.com/#/apps/profile/person/4242,Ann,Lee,Engineer\n'
+                    ',No,Title,\n')
+    assert [contact['id'] for contact in iter_contacts(str(path))] == ['4242']
+
+
+def test_state_round_trip_skips_unchanged_exports(settings, tmp_path):
+    builder = OrgChartBuilder(settings, PROGRAM_TERMS)
+    export = write_export(tmp_path / 'eng.csv', ENGINEERING)
+    builder.add_file(export)
+    state = builder.to_state()
+
+    restored = OrgChartBuilder(settings, PROGRAM_TERMS, state)
+    assert restored.add_file(export) == 0
+    assert restored.trees() == builder.trees()
+
+
+def test_new_export_only_rebuilds_the_departments_it_touches(settings, tmp_path):
+    builder = OrgChartBuilder(settings, PROGRAM_TERMS)
+    builder.add_file(write_export(tmp_path / 'eng.csv', ENGINEERING))
+    builder.add_file(write_export(tmp_path / 'finance.csv', [('9', 'Fin Lead', 'Finance Lead')],
+                                  department='Finance'))
+    builder.build()
+    engineering = builder.subtrees[('site:Roy, Utah', 'Northrop Grumman', 'Engineering')]
+
+    restored = OrgChartBuilder(settings, PROGRAM_TERMS, builder.to_state())
+    assert restored.add_file(write_export(tmp_path / 'finance2.csv', [('10', 'New Analyst', 'Finance Analyst')],
+                                          department='Finance')) == 1
+    assert restored.dirty == {('site:Roy, Utah', 'Northrop Grumman', 'Finance')}
+    restored.build()
+    assert restored.subtrees[('site:Roy, Utah', 'Northrop Grumman', 'Engineering')] == engineering
+    assert reporting(restored, ('site:Roy, Utah', 'Northrop Grumman', 'Finance')) == {'9': None, '10': '9'}
+
+
+def test_program_groups_come_from_titles_and_tags(settings, tmp_path):
+    builder = OrgChartBuilder(settings, PROGRAM_TERMS)
+    export = write_export(tmp_path / 'eng.csv', ENGINEERING + [('6', 'Sen Tinel', 'Sentinel Test Engineer')])
+    builder.add_file(export)
+    assert [tree['group'] for tree in builder.trees()] == ['program:GBSD', 'site:Roy, Utah']
+    assert builder.trees()[0]['contacts'] == 1
+
+    # Re-running the same unchanged export with --program applies the new tag
+    restored = OrgChartBuilder(settings, PROGRAM_TERMS, builder.to_state())
+    assert restored.add_file(export, ['GBSD']) == 6
+    assert restored.trees()[0]['contacts'] == 6
+    assert restored.add_file(export, ['GBSD']) == 0
+
+
+def test_changed_program_terms_reclassify_stored_contacts(settings, tmp_path):
+    builder = OrgChartBuilder(settings, {})
+    export = write_export(tmp_path / 'eng.csv', [('6', 'Sen Tinel', 'Sentinel Test Engineer')])
+    builder.add_file(export)
+    assert [tree['group'] for tree in builder.trees()] == ['site:Roy, Utah']
+
+    restored = OrgChartBuilder(settings, PROGRAM_TERMS, builder.to_state())
+    # The export itself is unchanged; its contacts are reclassified from the saved state
+    assert restored.add_file(export) == 0
+    assert [tree['group'] for tree in restored.trees()] == ['program:GBSD', 'site:Roy, Utah']
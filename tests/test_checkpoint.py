@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from pipelines.mapping_engine.checkpoint import (MappingCheckpoint, parse_shard, seed_from_output, shard_of,
+                                                 write_output)
+
+JOBS = [{'job_id': f'job-{i}'} for i in range(5)]
+
+
+def write_checkpoint(path, job_ids):
+    with MappingCheckpoint(str(path)) as checkpoint:
+        for job_id in job_ids:
+            checkpoint.write({'job_id': job_id, 'mapped_programs': []})
+
+
+def test_resume_drops_a_torn_final_record(tmp_path):
+    path = tmp_path / 'out.partial.jsonl'
+    write_checkpoint(path, ['job-0', 'job-1'])
+    with open(path, 'a') as f:
+        f.write('{"job_id": "job-2", "mapp')
+
+    with MappingCheckpoint(str(path), resume=True) as checkpoint:
+        assert [checkpoint.is_done(job) for job in JOBS[:3]] == [True, True, False]
+        checkpoint.write({'job_id': 'job-2'})
+    assert [json.loads(line)['job_id'] for line in open(path)] == ['job-0', 'job-1', 'job-2']
+
+
+def test_without_resume_the_checkpoint_starts_over(tmp_path):
+    path = tmp_path / 'out.partial.jsonl'
+    write_checkpoint(path, ['job-0'])
+    with MappingCheckpoint(str(path)) as checkpoint:
+        assert not checkpoint.is_done(JOBS[0])
+
+
+@pytest.mark.parametrize('output_name', ['out.json', 'out.jsonl'])
+def test_output_follows_input_order(tmp_path, output_name):
+    checkpoint_path = tmp_path / 'out.partial.jsonl'
+    write_checkpoint(checkpoint_path, ['job-3', 'job-0', 'job-4', 'job-2', 'job-1'])
+    output = tmp_path / output_name
+    assert write_output(str(checkpoint_path), str(output), JOBS) == 5
+
+    if output_name.endswith('.jsonl'):
+        results = [json.loads(line) for line in open(output)]
+    else:
+        results = json.load(open(output))
+    assert [r['job_id'] for r in results] == [job['job_id'] for job in JOBS]
+
+    # A later resume seeds its checkpoint from either kind of output
+    reseeded = tmp_path / 'reseeded.partial.jsonl'
+    assert seed_from_output(str(output), str(reseeded)) == 5
+    with MappingCheckpoint(str(reseeded), resume=True) as checkpoint:
+        assert all(checkpoint.is_done(job) for job in JOBS)
+
+
+def test_shards_are_stable_and_cover_every_job():
+    jobs = [{'job_id': f'job-{i}'} for i in range(200)]
+    shards = [shard_of(job, 4) for job in jobs]
+    assert shards == [shard_of(dict(job), 4) for job in jobs]
+    assert set(shards) == {0, 1, 2, 3}
+    assert parse_shard('1/4') == (1, 4)
+    for bad in ('4/4', '-1/4', '0/0'):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
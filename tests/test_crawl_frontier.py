@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import pytest
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import HtmlResponse, Request
+
+from crawl_frontier import CrawlFrontier, CrawlFrontierMiddleware
+from insight_global_spider import InsightGlobalSpider
+
+URL = 'https://jobs.insightglobal.com/job/123'
+BODY = b'<html><h1>Engineer</h1></html>'
+
+
+def crawl_run(db_path, recrawl_hours=0):
+    """The frontier middleware of one crawl over the frontier DB at db_path."""
+    return CrawlFrontierMiddleware(SimpleNamespace(spider=InsightGlobalSpider()),
+                                   CrawlFrontier(str(db_path)), recrawl_hours)
+
+
+def fetch(middleware, body=BODY, status=200, headers=None, url=URL):
+    request = Request(url, meta={'frontier': True})
+    middleware.process_request(request)
+    response = HtmlResponse(url=url, status=status, body=body, headers=headers or {}, request=request)
+    return request, middleware.process_response(request, response)
+
+
+@pytest.fixture
+def seeded(tmp_path):
+    """Frontier DB after one finished crawl that saw URL with an ETag."""
+    db_path = tmp_path / 'frontier.sqlite'
+    middleware = crawl_run(db_path)
+    fetch(middleware, headers={'ETag': '"v1"'})
+    middleware.spider_closed(None, 'finished')
+    return db_path
+
+
+def test_not_modified_is_dropped(seeded):
+    middleware = crawl_run(seeded)
+    request = Request(URL, meta={'frontier': True})
+    middleware.process_request(request)
+    assert request.headers.get('If-None-Match') == b'"v1"'
+    with pytest.raises(IgnoreRequest):
+        middleware.process_response(request, HtmlResponse(url=URL, status=304, request=request))
+    assert middleware.stats['not_modified'] == 1
+
+
+def test_unchanged_content_is_dropped(seeded):
+    middleware = crawl_run(seeded)
+    with pytest.raises(IgnoreRequest):
+        fetch(middleware)
+    assert middleware.stats['unchanged'] == 1
+
+
+def test_changed_content_reaches_the_spider(seeded):
+    middleware = crawl_run(seeded)
+    _, response = fetch(middleware, body=b'<html><h1>Senior Engineer</h1></html>')
+    assert response.status == 200
+    assert middleware.stats['changed'] == 1
+
+
+def test_duplicate_keys_are_dropped_within_a_run(tmp_path):
+    middleware = crawl_run(tmp_path / 'frontier.sqlite')
+    middleware.process_request(Request(URL, meta={'frontier': True}))
+    # Same job ID behind a different search's tracking parameters
+    with pytest.raises(IgnoreRequest):
+        middleware.process_request(Request(URL + '?src=search2', meta={'frontier': True}))
+
+
+def test_recently_fetched_pages_are_not_requested(seeded):
+    middleware = crawl_run(seeded, recrawl_hours=24)
+    with pytest.raises(IgnoreRequest):
+        middleware.process_request(Request(URL, meta={'frontier': True}))
+
+
+def test_unfinished_crawls_do_not_commit(tmp_path):
+    db_path = tmp_path / 'frontier.sqlite'
+    middleware = crawl_run(db_path)
+    fetch(middleware)
+    middleware.spider_closed(None, 'shutdown')
+
+    # The interrupted crawl's page is fetched and parsed again
+    middleware = crawl_run(db_path)
+    _, response = fetch(middleware)
+    assert response.status == 200
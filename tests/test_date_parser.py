@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import pytest
+
+from pipelines.scraper_engine.date_parser import DateParser
+from pipelines.scraper_engine.normalize_jobs import JobNormalizer
+
+REFERENCE = datetime(2024, 3, 15, 14, 30)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('2024-03-01', datetime(2024, 3, 1)),
+    ('2024-03-01T09:15:00Z', datetime(2024, 3, 1)),
+    ('03/04/2024', datetime(2024, 3, 4)),
+    ('25/12/2024', datetime(2024, 12, 25)),
+    ('Sept. 5, 2024', datetime(2024, 9, 5)),
+    ('March 5 2024', datetime(2024, 3, 5)),
+])
+def test_absolute_dates(text, expected):
+    assert DateParser().parse(text, REFERENCE) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Posted 3 days ago', datetime(2024, 3, 12)),
+    ('30+ days ago', datetime(2024, 2, 14)),
+    ('an hour ago', datetime(2024, 3, 15, 13, 30)),
+    ('Yesterday', datetime(2024, 3, 14)),
+    ('Just posted', datetime(2024, 3, 15)),
+])
+def test_relative_dates_resolve_against_reference(text, expected):
+    assert DateParser().parse(text, REFERENCE) == expected
+
+
+@pytest.mark.parametrize('text', ['', None, 'ASAP', '2024-02-30', '13/13/2024'])
+def test_unrecognized_dates(text):
+    assert DateParser().parse(text, REFERENCE) is None
+
+
+def test_cached_relative_dates_follow_each_reference():
+    parser = DateParser()
+    assert parser.parse('2 days ago', datetime(2024, 1, 10)) == datetime(2024, 1, 8)
+    assert parser.parse('2 days ago', datetime(2024, 6, 10)) == datetime(2024, 6, 8)
+    assert parser.cache_info().hits == 1
+
+
+def test_normalizer_falls_back_to_scraped_at():
+    normalizer = JobNormalizer()
+    assert normalizer._normalize_date('2 weeks ago', '2024-03-15T08:00:00') == '2024-03-01T00:00:00'
+    assert normalizer._normalize_date('whenever', '2024-03-15T08:00:00') == '2024-03-15T08:00:00'
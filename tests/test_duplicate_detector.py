@@ -0,0 +1,56 @@
+import io
+import json
+
+from pipelines.scraper_engine.duplicate_detector import DuplicateDetector, annotate, cluster_and_spool
+
+DESCRIPTION = ("Support the Sentinel ground based strategic deterrent program as a systems engineer. "
+               "Develop requirements, interface control documents and verification plans for launch "
+               "control systems. Active TS/SCI clearance and five years of DoD experience required.")
+
+JOBS = [
+    {'job_id': 'apex_1', 'title': 'Systems Engineer', 'location': 'Ogden, Utah', 'description': DESCRIPTION},
+    {'job_id': 'ig_7', 'title': 'Software Developer', 'location': 'Huntsville, Alabama',
+     'description': "Write embedded C++ for avionics test benches on a radar modernization effort."},
+    # The same posting re-listed by another staffing firm, with a trailing line added
+    {'job_id': 'ig_9', 'title': 'Systems Engineer', 'location': 'Ogden, Utah',
+     'description': DESCRIPTION + " Apply today."},
+    {'job_id': 'apex_2', 'title': 'Systems Engineer', 'location': 'Ogden, Utah', 'description': DESCRIPTION},
+]
+
+
+def test_near_duplicates_share_a_cluster():
+    detector = DuplicateDetector()
+    detector.add_many(JOBS)
+    assert detector.cluster_of(2) == detector.cluster_of(3) == 0
+    assert detector.cluster_of(1) == 1
+    assert detector.cluster_id(3) == 'dup_apex_1'
+    assert detector.cluster_sizes() == {0: 3, 1: 1}
+
+
+def test_identical_text_has_identical_signature():
+    detector = DuplicateDetector()
+    left = detector.signature(detector.shingles(JOBS[0]))
+    right = detector.signature(detector.shingles(JOBS[3]))
+    assert detector.similarity(left, right) == 1.0
+    assert len(detector.signature(set())) == detector.num_perm
+
+
+def test_postings_without_text_are_not_clustered_together():
+    detector = DuplicateDetector()
+    detector.add_many([{'job_id': '0', 'title': ''}, {'job_id': '1'}, JOBS[0]])
+    assert [detector.cluster_id(i) for i in range(3)] == ['dup_0', 'dup_1', 'dup_apex_1']
+    assert detector.cluster_sizes() == {0: 1, 1: 1, 2: 1}
+
+
+def test_spooled_annotation_in_input_order():
+    detector = DuplicateDetector()
+    spool = io.StringIO()
+    assert cluster_and_spool(detector, iter(JOBS), spool) == 4
+    annotated = list(annotate(detector, (json.loads(line) for line in spool)))
+    assert [job['job_id'] for job in annotated] == ['apex_1', 'ig_7', 'ig_9', 'apex_2']
+    assert [job['is_canonical'] for job in annotated] == [True, True, False, False]
+    assert [job['cluster_size'] for job in annotated] == [3, 1, 3, 3]
+
+    spool.seek(0)
+    canonical = annotate(detector, (json.loads(line) for line in spool), canonical_only=True)
+    assert [job['job_id'] for job in canonical] == ['apex_1', 'ig_7']
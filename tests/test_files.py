@@ -0,0 +1,23 @@
+import json
+
+from pipelines.common.files import load_records
+
+RECORDS = [{'job_id': 'a', 'mapped_programs': ['GBSD']}, {'job_id': 'b', 'mapped_programs': []}]
+
+
+def test_load_records_reads_json_arrays_and_jsonl(tmp_path):
+    array_path = tmp_path / 'mappings.json'
+    array_path.write_text('\n  ' + json.dumps(RECORDS, indent=2))
+    # JSONL regardless of the file name, with blank lines skipped
+    lines_path = tmp_path / 'labels.json'
+    lines_path.write_text('\n'.join(json.dumps(record) for record in RECORDS) + '\n\n')
+    assert load_records(str(array_path)) == load_records(str(lines_path)) == RECORDS
+
+
+def test_load_records_keeps_json_objects_and_honours_jsonl_suffix(tmp_path):
+    scores_path = tmp_path / 'program_scores.json'
+    scores_path.write_text(json.dumps({'GBSD': {'score': 0.9}}, indent=2))
+    assert load_records(str(scores_path)) == {'GBSD': {'score': 0.9}}
+    checkpoint = tmp_path / 'mappings.jsonl'
+    checkpoint.write_text(json.dumps(RECORDS[0]) + '\n')
+    assert load_records(str(checkpoint)) == RECORDS[:1]
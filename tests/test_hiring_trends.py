@@ -0,0 +1,134 @@
+import random
+from collections import Counter
+from datetime import date
+
+import pytest
+
+from pipelines.trend_engine.hiring_trends import DIMENSIONS, HiringTrendStore, posted_day, trend_rows
+
+START = date(2026, 1, 1).toordinal()
+WINDOWS = (7, 30, 90)
+
+
+def random_rows(count, days, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        for program in rng.sample(['GBSD', 'B-21', 'NGAD'], rng.choice([1, 1, 2])):
+            rows.append({'job_id': f'job-{i}', 'program': program, 'prime': 'Northrop Grumman',
+                         'location': rng.choice(['Roy, UT', 'Palmdale, CA']),
+                         'clearance': rng.choice(['TS/SCI', 'Secret']), 'day': START + rng.randrange(days)})
+    return rows
+
+
+def recount(rows, as_of, window, group_by):
+    """Window counts straight from the rows: each (job, program) once."""
+    unique = {(row['job_id'], row['program']): row for row in rows}
+    counts = Counter(tuple(row[d] for d in group_by) for row in unique.values()
+                     if as_of - window < row['day'] <= as_of)
+    return sorted(counts.items())
+
+
+def store_counts(store, window, group_by):
+    return sorted((tuple(row[d] for d in group_by), row['jobs']) for row in store.counts(window, group_by))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HiringTrendStore(str(tmp_path / 'trends.sqlite'), windows=WINDOWS)
+    yield store
+    store.close()
+
+
+def test_incremental_windows_match_a_recount(store):
+    rows = random_rows(600, 150)
+    rng = random.Random(11)
+    # Most jobs arrive the day they are posted; some are backfilled weeks later
+    arrival = [row['day'] + rng.choice([0] * 8 + [15, 30]) for row in rows]
+    added = []
+    for end in range(START + 9, START + 150, 10):
+        batch = [row for row, day in zip(rows, arrival) if end - 10 < day <= end]
+        # Some jobs seen before come round again
+        batch += rng.sample(added, min(len(added), 5))
+        rng.shuffle(batch)
+        store.update(batch, date.fromordinal(end))
+        added.extend(batch)
+        for window in WINDOWS:
+            for group_by in (DIMENSIONS, ('program',), ('location', 'clearance')):
+                assert store_counts(store, window, group_by) == recount(added, end, window, group_by)
+
+
+def test_changed_windows_are_recomputed_from_the_daily_counts(tmp_path):
+    rows = random_rows(200, 60)
+    path = str(tmp_path / 'trends.sqlite')
+    as_of = START + 59
+    store = HiringTrendStore(path, windows=WINDOWS)
+    store.update(rows, date.fromordinal(as_of))
+    store.close()
+
+    store = HiringTrendStore(path, windows=(14, 45))
+    try:
+        assert store.as_of == as_of
+        for window in (14, 45):
+            assert store_counts(store, window, ('program',)) == recount(rows, as_of, window, ('program',))
+        with pytest.raises(ValueError):
+            store.counts(7)
+    finally:
+        store.close()
+
+
+def test_update_skips_duplicates_and_counts_future_and_undated_jobs(store):
+    base = {'prime': 'Northrop Grumman', 'location': 'Roy, UT', 'clearance': 'Secret'}
+    stats = store.update([
+        dict(base, job_id='1', program='GBSD', day=START + 10),
+        dict(base, job_id='1', program='GBSD', day=START + 10),
+        dict(base, job_id='1', program='B-21', day=START + 10),
+        dict(base, job_id='2', program='GBSD', day=START + 99),
+        dict(base, job_id='3', program='GBSD', day=None),
+        dict(base, job_id='4', program='GBSD', day=START - 200),
+    ], date.fromordinal(START + 10))
+    assert stats == {'added': 3, 'duplicates': 1, 'undated': 1, 'expired': 1}
+    # The job dated after as_of counts on as_of
+    assert store.counts(7, ('program',)) == [{'program': 'GBSD', 'jobs': 2}, {'program': 'B-21', 'jobs': 1}]
+    with pytest.raises(ValueError, match='Unknown trend dimensions: company'):
+        store.counts(7, ('company',))
+
+
+def test_surges_compare_the_recent_window_with_its_baseline(tmp_path):
+    store = HiringTrendStore(str(tmp_path / 'trends.sqlite'), windows=(7, 28), surge_ratio=2.0, surge_min_jobs=5)
+    base = {'prime': 'Northrop Grumman', 'location': 'Roy, UT', 'clearance': 'Secret'}
+    steady = [dict(base, job_id=f's{day}', program='GBSD', day=START + day) for day in range(28)]
+    burst = [dict(base, job_id=f'b{day}', program='B-21', day=START + day) for day in (3, 10, 17)]
+    burst += [dict(base, job_id=f'b{day}-{n}', program='B-21', day=START + day) for day in range(22, 28)
+              for n in range(2)]
+    try:
+        store.update(steady + burst, date.fromordinal(START + 27))
+        # 12 B-21 jobs in the last week against 3 over the 21 days before it (1 a week)
+        assert store.surges() == [{'program': 'B-21', 'recent_jobs': 12, 'expected_jobs': 1.0, 'ratio': 12.0,
+                                   'window_days': 7}]
+    finally:
+        store.close()
+
+
+def test_chronic_groups_post_every_week(tmp_path):
+    store = HiringTrendStore(str(tmp_path / 'trends.sqlite'), windows=(7, 30), chronic_weeks=4)
+    base = {'prime': 'Northrop Grumman', 'location': 'Roy, UT', 'clearance': 'Secret'}
+    rows = [dict(base, job_id=f'g{week}', program='GBSD', day=START + 27 - 7 * week) for week in range(4)]
+    rows += [dict(base, job_id=f'n{week}', program='NGAD', day=START + 27 - 7 * week) for week in (0, 1, 3)]
+    try:
+        store.update(rows, date.fromordinal(START + 27))
+        assert store.chronic() == [{'program': 'GBSD', 'weeks': 4, 'jobs': 4}]
+    finally:
+        store.close()
+
+
+def test_trend_rows_resolve_programs_and_dates():
+    primes = {'fa18': ('F/A-18', 'Boeing')}
+    mappings = [{'job_id': 1, 'mapped_programs': ['F_A_18', 'X-99'], 'mapped_at': '2026-03-05T10:00:00'}]
+    jobs = [{'job_id': '1', 'location': ' St. Louis, MO ', 'posted_date': 'recently', 'scraped_at': '2026-03-02'}]
+    rows = list(trend_rows(mappings, jobs, primes))
+    assert [(row['program'], row['prime']) for row in rows] == [('F/A-18', 'Boeing'), ('X-99', '')]
+    assert rows[0]['location'] == 'St. Louis, MO' and rows[0]['clearance'] == 'None'
+    assert rows[0]['day'] == date(2026, 3, 2).toordinal()
+    assert posted_day({'mapped_at': '2026-03-05'}) is None
+    assert posted_day({'posted_date': '2026-03-02T08:00:00'}) == date(2026, 3, 2).toordinal()
@@ -0,0 +1,54 @@
+import io
+import json
+
+from pipelines.scraper_engine.job_manifest import JobManifest
+from pipelines.scraper_engine.normalize_jobs import JobNormalizer, normalize_incremental
+
+
+def write_jsonl(path, jobs):
+    path.write_text(''.join(json.dumps(job) + '\n' for job in jobs))
+    return str(path)
+
+
+def run(tmp_path, path):
+    output = io.StringIO()
+    with JobManifest(str(tmp_path / 'manifest.sqlite')) as manifest:
+        counts = normalize_incremental(JobNormalizer(), [path], output, manifest)
+    return counts, [json.loads(line)['job_id'] for line in output.getvalue().splitlines()]
+
+
+def test_content_hash_ignores_volatile_fields():
+    job = {'job_id': 'a', 'title': 'Engineer', 'scraped_at': '2024-01-01', 'raw_html_hash': 'x'}
+    rescraped = dict(job, scraped_at='2024-02-01', raw_html_hash='y')
+    assert JobManifest.content_hash(job) == JobManifest.content_hash(rescraped)
+    assert JobManifest.content_hash(job) != JobManifest.content_hash(dict(job, title='Senior Engineer'))
+
+
+def test_unchanged_postings_are_skipped(tmp_path):
+    jobs = [{'job_id': 'a', 'title': 'Engineer', 'scraped_at': '2024-01-01T00:00:00'},
+            {'title': 'No ID', 'scraped_at': '2024-01-01T00:00:00'}]
+    path = write_jsonl(tmp_path / 'day1.jsonl', jobs)
+    assert run(tmp_path, path)[0] == (2, 0, 2)
+
+    # A re-scrape only moves scraped_at; postings without an ID are keyed by content
+    rescraped = [dict(job, scraped_at='2024-01-02T00:00:00') for job in jobs]
+    path = write_jsonl(tmp_path / 'day2.jsonl', rescraped)
+    assert run(tmp_path, path) == ((2, 2, 0), [])
+
+    changed = [dict(rescraped[0], title='Senior Engineer'), rescraped[1]]
+    path = write_jsonl(tmp_path / 'day3.jsonl', changed)
+    assert run(tmp_path, path) == ((2, 1, 1), ['a'])
+
+
+def test_failed_postings_are_retried(tmp_path):
+    path = write_jsonl(tmp_path / 'raw.jsonl', [{'job_id': 'bad', 'title': 42}, {'job_id': 'ok', 'title': 'Analyst'}])
+    assert run(tmp_path, path) == ((2, 0, 1), ['ok'])
+    assert run(tmp_path, path) == ((2, 1, 0), [])
+    with JobManifest(str(tmp_path / 'manifest.sqlite')) as manifest:
+        assert manifest.count() == 1
+
+
+def test_repeated_postings_in_one_run_are_written_once(tmp_path):
+    job = {'job_id': 'a', 'title': 'Engineer'}
+    path = write_jsonl(tmp_path / 'raw.jsonl', [job, dict(job, scraped_at='later')])
+    assert run(tmp_path, path) == ((2, 1, 1), ['a'])
@@ -0,0 +1,122 @@
+import json
+import os
+
+import pytest
+import yaml
+
+from config import knowledge_base as kb
+from config.knowledge_base import code_key, compile_sources, load_knowledge_base
+
+PROGRAMS = {
+    'programs': {
+        'GBSD': {'full_name': 'Ground Based Strategic Deterrent', 'code_names': ['Sentinel'],
+                 'prime_contractor': 'Northrop Grumman', 'locations': ['Utah']},
+        'F/A-18': {'full_name': 'Super Hornet', 'prime_contractor': 'Boeing', 'key_skills': ['Carrier Ops']},
+    },
+}
+PRIMES = {
+    'prime_contractors': {
+        'Northrop Grumman': {'programs': ['GBSD'], 'key_locations': ['Clearfield, UT'],
+                             'subcontractors': {'GBSD': ['L3Harris']}},
+    },
+    'subcontractors': {'GE Aviation': {'programs': ['F_A_18']}},
+}
+KEYWORDS = {'GBSD': ['ICBM'], 'F_A_18': ['naval strike fighter']}
+
+
+def test_code_key_ignores_case_and_punctuation():
+    assert code_key('F/A-18') == code_key('F_A_18') == code_key('fa18') == 'fa18'
+
+
+def test_compile_merges_sources_into_indexes():
+    data = compile_sources(PROGRAMS, PRIMES, KEYWORDS)
+    # Settings spell the code F_A_18; the dictionary's spelling wins everywhere
+    assert data['program_keywords'] == {'GBSD': ['ICBM'], 'F/A-18': ['naval strike fighter']}
+    assert data['term_programs']['naval strike fighter'] == ['F/A-18']
+    assert data['term_programs']['sentinel'] == ['GBSD']
+    assert data['location_programs']['clearfield, ut'] == ['GBSD']
+    assert data['subcontractor_primes'] == {'l3harris': ['Northrop Grumman'], 'ge aviation': ['Boeing']}
+    assert data['subcontractor_programs']['ge aviation'] == ['F/A-18']
+
+
+@pytest.fixture
+def sources(tmp_path):
+    programs = tmp_path / 'programs.json'
+    primes = tmp_path / 'primes.json'
+    programs.write_text(json.dumps(PROGRAMS))
+    primes.write_text(json.dumps(PRIMES))
+    settings = tmp_path / 'settings.yaml'
+    settings.write_text(yaml.safe_dump(settings_with(tmp_path, KEYWORDS)))
+    return {'programs': programs, 'primes': primes, 'settings': settings,
+            'artifact': tmp_path / 'cache' / 'knowledge_base.json'}
+
+
+def settings_with(tmp_path, keywords, **extra):
+    return dict({
+        'apis': {'openai': {'model': 'gpt-4o', 'max_tokens': 4000, 'temperature': 0.1}},
+        'program_mapping': {'keyword_match_threshold': 0.6, 'program_keywords': keywords},
+        'knowledge_base': {'programs_dictionary': str(tmp_path / 'programs.json'),
+                           'primes_lookup': str(tmp_path / 'primes.json'),
+                           'cache_path': str(tmp_path / 'cache' / 'knowledge_base.json')},
+    }, **extra)
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+
+
+def test_unchanged_sources_reuse_the_loaded_knowledge_base(sources):
+    first = load_knowledge_base(str(sources['settings']))
+    assert sources['artifact'].exists()
+    assert load_knowledge_base(str(sources['settings'])) is first
+
+    # A touch without a content change re-stamps the artifact instead of rebuilding
+    bump_mtime(sources['programs'])
+    assert load_knowledge_base(str(sources['settings'])) is first
+    stamped = json.loads(sources['artifact'].read_text())['sources']['programs_dictionary']['stat']
+    assert stamped[0] == os.stat(sources['programs']).st_mtime_ns
+
+
+def test_source_edits_are_picked_up_without_a_restart(sources):
+    first = load_knowledge_base(str(sources['settings']))
+    edited = json.loads(json.dumps(PROGRAMS))
+    edited['programs']['GBSD']['code_names'].append('LGM-35A')
+    sources['programs'].write_text(json.dumps(edited))
+    bump_mtime(sources['programs'])
+
+    reloaded = load_knowledge_base(str(sources['settings']))
+    assert reloaded is not first
+    assert reloaded.programs_for_term('LGM-35A') == ['GBSD']
+    assert reloaded.version('programs_dictionary') != first.version('programs_dictionary')
+    assert reloaded.version('primes_lookup') == first.version('primes_lookup')
+
+
+def test_only_program_keywords_in_settings_trigger_a_rebuild(sources, tmp_path):
+    first = load_knowledge_base(str(sources['settings']))
+    sources['settings'].write_text(yaml.safe_dump(settings_with(tmp_path, KEYWORDS, playbook={'max_sections': 3})))
+    bump_mtime(sources['settings'])
+    assert load_knowledge_base(str(sources['settings'])) is first
+
+    sources['settings'].write_text(yaml.safe_dump(settings_with(tmp_path, dict(KEYWORDS, GBSD=['Minuteman']))))
+    bump_mtime(sources['settings'])
+    reloaded = load_knowledge_base(str(sources['settings']))
+    assert reloaded.programs_for_term('minuteman') == ['GBSD']
+    assert reloaded.programs_for_term('ICBM') == []
+
+
+def test_new_process_loads_the_artifact_without_compiling(sources, monkeypatch):
+    load_knowledge_base(str(sources['settings']))
+    monkeypatch.setattr(kb, '_cache', {})
+    monkeypatch.setattr(kb, 'build_knowledge_base', lambda config_path: pytest.fail('rebuilt a fresh artifact'))
+    assert load_knowledge_base(str(sources['settings'])).programs_for_prime('Boeing') == ['F/A-18']
+
+
+def test_stale_format_is_rebuilt(sources, monkeypatch):
+    load_knowledge_base(str(sources['settings']))
+    data = json.loads(sources['artifact'].read_text())
+    data['format'] = kb.KNOWLEDGE_BASE_FORMAT - 1
+    sources['artifact'].write_text(json.dumps(data))
+    monkeypatch.setattr(kb, '_cache', {})
+    load_knowledge_base(str(sources['settings']))
+    assert json.loads(sources['artifact'].read_text())['format'] == kb.KNOWLEDGE_BASE_FORMAT
@@ -0,0 +1,41 @@
+from pipelines.mapping_engine.llm_cache import LLMResponseCache
+
+REQUEST = {'model': 'gpt-4o', 'temperature': 0.1, 'max_tokens': 500,
+           'messages': [{'role': 'user', 'content': 'Map this job'}]}
+
+
+def test_key_covers_request_and_dictionary_version():
+    key = LLMResponseCache.key(REQUEST, 'v1')
+    assert key == LLMResponseCache.key(dict(REQUEST), 'v1')
+    assert key != LLMResponseCache.key(REQUEST, 'v2')
+    assert key != LLMResponseCache.key(dict(REQUEST, temperature=0.5), 'v1')
+
+
+def test_hits_survive_reopening(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = LLMResponseCache(path, version='v1')
+    key = LLMResponseCache.key(REQUEST, 'v1')
+    assert cache.get(key) is None
+    cache.put(key, '{"mapped_programs": ["GBSD"]}')
+    cache.close()
+
+    cache = LLMResponseCache(path, version='v1')
+    assert cache.get(key) == '{"mapped_programs": ["GBSD"]}'
+    assert cache.stats() == {'hits': 1, 'misses': 0, 'hit_rate': 1.0, 'entries': 1}
+
+
+def test_new_dictionary_version_purges_entries(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = LLMResponseCache(path, version='v1')
+    cache.put('a', 'old')
+    cache.close()
+    assert LLMResponseCache(path, version='v2').stats()['entries'] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / 'cache.sqlite'), max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, key)
+    cache.conn.execute("UPDATE responses SET last_used = 0 WHERE key = 'b'")
+    assert cache.evict() == 1
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == ('a', None, 'c')
@@ -0,0 +1,46 @@
+import pytest
+
+from pipelines.mapping_engine.local_classifier import LocalProgramClassifier, evaluate
+from pipelines.mapping_engine.program_index import ProgramIndex
+
+PROGRAMS = {
+    'B-21': {'full_name': 'B-21 Raider', 'acronyms': ['LRS-B'], 'key_skills': ['low observable']},
+    'F-35': {'full_name': 'Lightning II', 'acronyms': ['JSF'], 'key_skills': ['low observable', 'avionics']},
+    'KC-46': {'full_name': 'Pegasus', 'acronyms': ['KC-46'], 'key_skills': ['aerial refueling']},
+}
+
+
+@pytest.fixture
+def classifier():
+    return LocalProgramClassifier(ProgramIndex(PROGRAMS))
+
+
+def test_naming_a_program_is_full_confidence(classifier):
+    confidences, terms = classifier.confidences({'title': 'B-21 Raider test engineer', 'description': 'LRS-B flight test'})
+    assert confidences == {'B-21': pytest.approx(1.0)}
+    assert terms == ['b-21', 'b-21 raider', 'lrs-b']
+
+
+def test_naming_two_programs_matches_both(classifier):
+    decision = classifier.classify({'title': 'JSF and KC-46 avionics'}, 0.8, 0.95)
+    assert sorted(decision['mapped']) == ['F-35', 'KC-46']
+
+
+def test_shared_skills_alone_stay_below_the_band(classifier):
+    decision = classifier.classify({'title': 'Engineer', 'description': 'Low observable coatings'}, 0.8, 0.95)
+    assert decision['mapped'] == [] and decision['uncertain'] == []
+    assert set(decision['confidences']) == {'B-21', 'F-35'}
+    assert all(score < 0.8 for score in decision['confidences'].values())
+
+
+def test_no_terms_no_confidences(classifier):
+    assert classifier.confidences({'title': 'Office Manager'}) == ({}, [])
+
+
+def test_evaluate_reports_escalation_and_agreement(classifier):
+    jobs = [{'job_id': 1, 'title': 'B-21 engineer'}, {'job_id': 2, 'title': 'Pegasus boom operator'},
+            {'job_id': 3, 'title': 'Office Manager'}, {'job_id': 4, 'title': 'Unlabeled'}]
+    labels = {'1': ['B-21'], '2': ['F-35'], '3': []}
+    report = evaluate(classifier, jobs, labels, 0.8, 0.95)
+    assert (report['labeled_jobs'], report['escalated'], report['decided_locally']) == (3, 0, 3)
+    assert report['local_agreement'] == pytest.approx(2 / 3)
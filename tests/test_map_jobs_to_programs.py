@@ -0,0 +1,206 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pipelines.mapping_engine.map_jobs_to_programs import ProgramMappingEngine
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JOB_COUNT = 12
+
+
+class ChatCompletionsHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible endpoint that maps each job to its own title, later jobs answering first."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = body['messages'][-1]['content']
+        titles = [line.split('Title: ', 1)[1] for line in prompt.splitlines() if 'Title: ' in line]
+        server = self.server
+        with server.lock:
+            server.calls += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        # "GBSD role 03" -> the earlier the job, the longer it takes
+        time.sleep(0.02 * (JOB_COUNT - int(titles[0].split()[-1])))
+        with server.lock:
+            server.in_flight -= 1
+            server.answered.extend(titles)
+
+        if '### job_id:' in prompt:
+            refs = [line.split('### job_id: ', 1)[1] for line in prompt.splitlines() if '### job_id: ' in line]
+            with server.lock:
+                # Jobs in drop_once are left out of their first batched reply
+                dropped = server.drop_once & set(titles)
+                server.drop_once -= dropped
+            content = json.dumps([{'job_id': ref, 'mapped_programs': [title], 'confidence_score': 0.9}
+                                  for ref, title in zip(refs, titles) if title not in dropped])
+        else:
+            content = json.dumps({'mapped_programs': [titles[0]], 'confidence_score': 0.9})
+        data = json.dumps({
+            'id': 'test', 'object': 'chat.completion', 'created': 0, 'model': body['model'],
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': 100, 'completion_tokens': 20, 'total_tokens': 120},
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def api():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ChatCompletionsHandler)
+    server.lock = threading.Lock()
+    server.calls = server.in_flight = server.max_in_flight = 0
+    server.answered = []
+    server.drop_once = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def mapping_settings(tmp_path, api, local_tier=False):
+    """Settings overrides pointing the engine at the test API, with every cache and output under tmp_path."""
+    return {
+        'apis': {'openai': {'base_url': f'http://127.0.0.1:{api.server_port}/v1', 'retry_base_delay': 0.01}},
+        'program_mapping': {'local_tier': {'enabled': local_tier},
+                            'llm_cache': {'path': str(tmp_path / 'llm_cache.sqlite')}},
+        'monitoring': {'mapping_metrics': {'summary_path': str(tmp_path / 'metrics.json'),
+                                           'prometheus_path': str(tmp_path / 'mapping.prom')}},
+    }
+
+
+@pytest.fixture
+def config_path(tmp_path, api, monkeypatch, write_settings):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    return write_settings(mapping_settings(tmp_path, api))
+
+
+@pytest.fixture
+def jobs():
+    return [{'job_id': f'job-{i:02d}', 'title': f'GBSD role {i:02d}', 'company': 'Northrop Grumman',
+             'description': 'Sentinel ICBM ground systems integration'} for i in range(JOB_COUNT)]
+
+
+def mapped_titles(results):
+    return [result['mapped_programs'][0] for result in results]
+
+
+def test_concurrent_mapping_returns_results_in_input_order(config_path, api, jobs):
+    engine = ProgramMappingEngine(config_path)
+    results = asyncio.run(engine.map_jobs_async(jobs, max_concurrent=4))
+    assert mapped_titles(results) == [job['title'] for job in jobs]
+    assert [result['job_id'] for result in results] == [job['job_id'] for job in jobs]
+    # Later jobs answer first, so completion order differs from input order
+    assert api.answered != [job['title'] for job in jobs]
+    assert 1 < api.max_in_flight <= 4
+
+
+def test_second_run_is_served_from_the_response_cache(config_path, api, jobs):
+    first = asyncio.run(ProgramMappingEngine(config_path).map_jobs_async(jobs, max_concurrent=4))
+    calls = api.calls
+    engine = ProgramMappingEngine(config_path)
+    second = asyncio.run(engine.map_jobs_async(jobs, max_concurrent=4))
+    assert api.calls == calls
+    assert mapped_titles(second) == mapped_titles(first)
+    assert engine.response_cache.stats()['hits'] == JOB_COUNT
+
+
+def test_prompts_list_only_candidate_programs(config_path, api):
+    engine = ProgramMappingEngine(config_path)
+    request = engine._build_request({'job_id': 'a', 'title': 'GBSD role 01', 'description': 'Sentinel ICBM work'})
+    prompt = request['messages'][-1]['content']
+    assert 'GBSD' in prompt
+    assert 'B-21' not in prompt and 'KC-46' not in prompt
+
+
+def test_jobs_without_candidates_skip_the_llm(config_path, api):
+    engine = ProgramMappingEngine(config_path)
+    job = {'job_id': 'office', 'title': 'Office Manager 01', 'description': 'Scheduling and travel'}
+    [result] = asyncio.run(engine.map_jobs_async([job]))
+    assert result['source'] == 'keyword_matching'
+    assert api.calls == 0
+    assert engine.prompt_stats['skipped'] == 1
+
+
+def test_batched_mapping_packs_jobs_and_retries_missing_ones(config_path, api, jobs):
+    api.drop_once = {'GBSD role 05'}
+    engine = ProgramMappingEngine(config_path)
+    results = asyncio.run(engine.map_jobs_async(jobs, max_concurrent=4, batch_size=4))
+    assert mapped_titles(results) == [job['title'] for job in jobs]
+    assert {result['source'] for result in results} == {'ai_analysis'}
+    # Three batches of four, then job 05 again on its own
+    assert api.calls == 4
+    assert engine.prompt_stats['batch_requests'] == 3
+
+
+def test_local_tier_decides_jobs_that_name_a_program(tmp_path, api, monkeypatch, write_settings):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    engine = ProgramMappingEngine(write_settings(mapping_settings(tmp_path, api, local_tier=True)))
+    named = {'job_id': 'named', 'title': 'B-21 Raider Test Engineer 01', 'description': 'Flight test support'}
+    vague = {'job_id': 'vague', 'title': 'Carrier-based UAV Engineer 02', 'description': 'Flight software'}
+    results = asyncio.run(engine.map_jobs_async([named, vague]))
+    assert results[0]['source'] == 'local_classifier'
+    assert results[0]['mapped_programs'] == ['B-21']
+    assert results[1]['source'] == 'ai_analysis'
+    assert engine.tier_stats == {'local': 1, 'escalated': 1}
+    assert api.calls == 1
+
+
+def test_jsonl_output_is_in_input_order_under_concurrency(config_path, api, jobs, tmp_path):
+    jobs_file = tmp_path / 'jobs.json'
+    jobs_file.write_text(json.dumps(jobs))
+    output = tmp_path / 'mappings.jsonl'
+    ProgramMappingEngine(config_path).process_jobs_batch(str(jobs_file), str(output), concurrent=True,
+                                                         max_concurrent=6)
+    assert [json.loads(line)['job_id'] for line in open(output)] == [job['job_id'] for job in jobs]
+    assert not (tmp_path / 'mappings.jsonl.partial.jsonl').exists()
+
+    # Resuming from the finished output maps nothing new
+    calls = api.calls
+    ProgramMappingEngine(config_path, use_cache=False).process_jobs_batch(
+        str(jobs_file), str(output), concurrent=True, resume=True)
+    assert api.calls == calls
+    assert len(open(output).readlines()) == JOB_COUNT
+
+
+def test_keyword_mode_runs_without_a_key_openai_or_numpy(tmp_path, api, monkeypatch, jobs, write_settings):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    config = write_settings(mapping_settings(tmp_path, api, local_tier=True))
+    script = (
+        "import json, sys\n"
+        f"sys.path.insert(0, {PROJECT_ROOT!r})\n"
+        "from pipelines.mapping_engine.map_jobs_to_programs import ProgramMappingEngine\n"
+        f"engine = ProgramMappingEngine({config!r}, mode='keyword')\n"
+        f"results = [engine.map_job_to_programs(job) for job in {jobs!r}]\n"
+        "print(json.dumps([sorted({r['source'] for r in results}), 'openai' in sys.modules, 'numpy' in sys.modules]))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    assert json.loads(output.splitlines()[-1]) == [['keyword_matching'], False, False]
+    assert api.calls == 0
+
+
+def test_batch_run_writes_metrics(config_path, api, jobs, tmp_path):
+    jobs_file = tmp_path / 'jobs.json'
+    jobs_file.write_text(json.dumps(jobs[:3]))
+    ProgramMappingEngine(config_path).process_jobs_batch(str(jobs_file), str(tmp_path / 'mappings.json'),
+                                                         concurrent=True)
+    summary = json.loads((tmp_path / 'metrics.json').read_text())
+    assert summary['jobs'] == 3
+    assert summary['sources'] == {'ai_analysis': 3}
+    [model] = summary['llm'].values()
+    assert (model['requests'], model['prompt_tokens'], model['completion_tokens']) == (3, 300, 60)
+    assert 'mapping_jobs_total{source="ai_analysis"} 3' in (tmp_path / 'mapping.prom').read_text()
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from pipelines.mapping_engine.metrics import MappingMetrics, percentile
+
+PRICING = {'gpt-4o': {'prompt': 0.0025, 'completion': 0.01}}
+
+
+def test_nearest_rank_percentiles():
+    values = [float(v) for v in range(1, 101)]
+    assert (percentile(values, 0.5), percentile(values, 0.95), percentile(values, 0.99)) == (50.0, 95.0, 99.0)
+    assert percentile([], 0.5) == 0.0
+    assert percentile([3.0], 0.99) == 3.0
+
+
+@pytest.fixture
+def metrics():
+    metrics = MappingMetrics(PRICING)
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        metrics.record_job(seconds, 'ai_analysis')
+    metrics.record_job(0.01, 'cache')
+    metrics.record_call('gpt-4o', 1.5, queue_wait=0.25, prompt_tokens=1000, completion_tokens=200)
+    metrics.record_call('gpt-4o', 0.5, error='RateLimitError')
+    metrics.record_call('local-model', 0.2, prompt_tokens=50)
+    metrics.record_parse_failure()
+    return metrics
+
+
+def test_summary_totals_and_cost(metrics):
+    summary = metrics.summary()
+    assert summary['jobs'] == 5
+    assert summary['sources'] == {'ai_analysis': 4, 'cache': 1}
+    assert summary['job_seconds']['p50'] == 0.2
+    gpt = summary['llm']['gpt-4o']
+    assert (gpt['requests'], gpt['errors']) == (2, {'RateLimitError': 1})
+    assert gpt['estimated_cost_usd'] == pytest.approx(0.0025 + 0.002)
+    assert summary['llm']['local-model']['estimated_cost_usd'] is None
+    assert summary['estimated_cost_usd'] == pytest.approx(0.0045)
+
+
+def test_prometheus_exposition(metrics, tmp_path):
+    path = tmp_path / 'metrics' / 'mapping.prom'
+    metrics.write_prometheus(str(path))
+    lines = path.read_text().splitlines()
+    assert 'mapping_jobs_total{source="cache"} 1' in lines
+    assert 'mapping_llm_errors_total{model="gpt-4o",error="RateLimitError"} 1' in lines
+    assert 'mapping_llm_tokens_total{model="gpt-4o",type="prompt"} 1000' in lines
+    assert 'mapping_job_duration_seconds_count 5' in lines
+    assert '# TYPE mapping_llm_request_duration_seconds summary' in lines
+    # Unpriced models have no cost sample
+    assert not any(line.startswith('mapping_llm_cost_usd_total{model="local-model"') for line in lines)
+
+
+def test_json_summary_includes_extra_sections(metrics, tmp_path):
+    path = tmp_path / 'run.json'
+    metrics.write_json(str(path), {'mode': 'llm'})
+    summary = json.loads(path.read_text())
+    assert summary['mode'] == 'llm'
+    assert summary['parse_failures'] == 1
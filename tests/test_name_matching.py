@@ -0,0 +1,44 @@
+import pytest
+
+from pipelines.entity_resolution.name_matching import (clean, first_name_similarity, jaro_winkler, linkedin_slug,
+                                                       normalize_email, parse_name, soundex)
+
+
+@pytest.mark.parametrize('word, code', [
+    ('Robert', 'R163'), ('Rupert', 'R163'), ('Ashcraft', 'A261'), ('Tymczak', 'T522'),
+    ('Pfister', 'P236'), ('Honeyman', 'H555'), ('Lee', 'L000'), ("O'Brien", 'O165'), ('', ''),
+])
+def test_soundex(word, code):
+    assert soundex(word) == code
+
+
+@pytest.mark.parametrize('a, b, expected', [
+    ('martha', 'marhta', 0.9611), ('dwayne', 'duane', 0.84), ('dixon', 'dicksonx', 0.8133),
+    ('smith', 'smith', 1.0), ('abc', 'xyz', 0.0), ('', 'smith', 0.0), ('', '', 0.0),
+])
+def test_jaro_winkler(a, b, expected):
+    assert jaro_winkler(a, b) == pytest.approx(expected, abs=1e-4)
+    assert jaro_winkler(b, a) == pytest.approx(expected, abs=1e-4)
+
+
+def test_initials_match_names_with_the_same_letter():
+    assert first_name_similarity('j', 'jonathan') == 0.9
+    assert first_name_similarity('k', 'jonathan') < 0.5
+    assert first_name_similarity('', 'jonathan') == 0.0
+
+
+@pytest.mark.parametrize('full_name, expected', [
+    ('Jonathan A. Smith', ('jonathan', 'smith')),
+    ('Smith, Jonathan', ('jonathan', 'smith')),
+    ('Dr. Mary-Ann O\'Neil Jr.', ('mary-ann', "o'neil")),
+    ('Smith, Jr.', ('', 'smith')),
+    ('Cher', ('', 'cher')),
+])
+def test_parse_name(full_name, expected):
+    assert parse_name(full_name) == expected
+
+
+def test_contact_field_normalizers():
+    assert clean('  N/A ') == '' and clean(' Ogden ') == 'Ogden'
+    assert normalize_email('work: J.Smith@NGC.com; home: js@example.com') == 'j.smith@ngc.com'
+    assert linkedin_slug('https://www.linkedin.com/in/JSmith/?trk=x') == 'jsmith'
@@ -0,0 +1,89 @@
+import io
+import json
+
+import pytest
+
+from pipelines.scraper_engine.normalize_jobs import JobNormalizer, iter_raw_jobs, normalize_stream
+
+
+RAW_JOBS = [
+    {'job_id': 'a1', 'title': 'Engineer', 'description': 'Needs "TS" – clearance', 'salary': 120000.5},
+    {'job_id': 'a2', 'title': 'Analyst [II]', 'tags': ['x', {'y': None}], 'source': 'apex_systems'},
+    {'job_id': 'a3', 'title': 'Tech, Level 3', 'count': 1234567890},
+]
+
+
+@pytest.fixture
+def normalizer():
+    return JobNormalizer()
+
+
+def test_normalize_job_fields(normalizer):
+    job = normalizer.normalize_job({
+        'job_id': 'IG-123/45',
+        'title': '  Systems   Engineer ',
+        'company': 'insight global ',
+        'location': 'Ogden,  UT',
+        'description': '<p>Active <b>TS/SCI</b> required &amp; more</p>',
+        'posted_date': '2024-03-01',
+        'source': 'insight_global',
+        'scraped_at': '2024-03-05T12:00:00',
+    })
+    assert job['job_id'] == 'ig-123_45'
+    assert job['title'] == 'Systems Engineer'
+    assert job['company'] == 'Insight Global'
+    assert job['location'] == 'Ogden, Utah'
+    assert job['clearance_level'] == 'TS/SCI'
+    assert job['description'] == 'Active TSSCI required amp more'
+    assert job['posted_date'] == '2024-03-01T00:00:00'
+
+
+def test_state_abbreviations_only_expand_in_capitals(normalizer):
+    assert normalizer._normalize_location('Colorado Springs, CO') == 'Colorado Springs, Colorado'
+    assert normalizer._normalize_location('Remote or in office') == 'Remote or in office'
+    assert normalizer._normalize_location('Washington, DC') == 'Washington, District of Columbia'
+
+
+@pytest.mark.parametrize('description, level', [
+    ('Top Secret SCI with poly', 'TS/SCI'),
+    ('Must hold a TS clearance', 'TS'),
+    ('Active secret clearance', 'Secret'),
+    ('Confidential clearance preferred', 'Confidential'),
+    ('No clearance needed; tests and testing', None),
+])
+def test_clearance_levels(normalizer, description, level):
+    assert normalizer._extract_clearance(description) == level
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 64, 1 << 16])
+def test_iter_raw_jobs_array_and_jsonl_parity(chunk_size):
+    array_text = '  \n' + json.dumps(RAW_JOBS, indent=2)
+    jsonl_text = '\n'.join(json.dumps(job) for job in RAW_JOBS) + '\n\n'
+    from_array = list(iter_raw_jobs(io.StringIO(array_text), chunk_size=chunk_size))
+    from_jsonl = list(iter_raw_jobs(io.StringIO(jsonl_text), chunk_size=chunk_size))
+    assert from_array == RAW_JOBS
+    assert from_jsonl == RAW_JOBS
+
+
+def test_iter_raw_jobs_edge_cases():
+    assert list(iter_raw_jobs(io.StringIO(''))) == []
+    assert list(iter_raw_jobs(io.StringIO('[]'))) == []
+    # A final JSONL record without a trailing newline
+    assert list(iter_raw_jobs(io.StringIO('{"a": 1}\n{"a": 2}'))) == [{'a': 1}, {'a': 2}]
+    with pytest.raises(ValueError):
+        list(iter_raw_jobs(io.StringIO('[{"a": 1}, {"a": 2}'), chunk_size=4))
+
+
+def test_normalize_stream_filters_by_source(normalizer):
+    output = io.StringIO()
+    read, written = normalize_stream(normalizer, iter(RAW_JOBS), output, source='Apex_Systems')
+    assert (read, written) == (3, 1)
+    assert [json.loads(line)['job_id'] for line in output.getvalue().splitlines()] == ['a2']
+
+
+def test_normalize_many_keeps_input_order_across_workers(normalizer):
+    jobs = [{'job_id': f'job-{i}', 'title': f'Role {i}', 'scraped_at': '2024-03-05T12:00:00'} for i in range(50)]
+    serial = [job['job_id'] for job in normalizer.normalize_many(jobs)]
+    parallel = [job['job_id'] for job in normalizer.normalize_many(jobs, workers=2, chunk_size=7)]
+    assert serial == parallel == [f'job-{i}' for i in range(50)]
+    assert sum(normalizer.worker_errors.values()) == 0
@@ -0,0 +1,43 @@
+from pipelines.playbook_engine.playbook_render import inline_runs, parse_markdown, render_html, render_playbook
+
+PLAYBOOK = """# BD Playbook
+
+Intro line one
+continues here.
+
+- **Sentinel** hiring in _Roy, UT_
+  - nested program_code detail
+1. First step
+"""
+
+
+def test_parse_markdown_blocks():
+    assert parse_markdown(PLAYBOOK) == [
+        ('heading', 1, 'BD Playbook'),
+        ('paragraph', 0, 'Intro line one continues here.'),
+        ('bullet', 0, '**Sentinel** hiring in _Roy, UT_'),
+        ('bullet', 1, 'nested program_code detail'),
+        ('number', 0, 'First step'),
+    ]
+
+
+def test_inline_runs_keep_snake_case_intact():
+    assert inline_runs('**Sentinel** hiring in _Roy, UT_ for program_code') == [
+        ('Sentinel', True, False), (' hiring in ', False, False), ('Roy, UT', False, True),
+        (' for program_code', False, False)]
+    assert inline_runs('*GBSD* & 2 * 3') == [('GBSD', False, True), (' & 2 * 3', False, False)]
+
+
+def test_render_html_nests_lists_and_escapes():
+    page = render_html(PLAYBOOK + '\nA < B & C\n', 'BD <Playbook>')
+    assert '<title>BD &lt;Playbook&gt;</title>' in page
+    assert ('<ul>\n<li><strong>Sentinel</strong> hiring in <em>Roy, UT</em>\n<ul>\n'
+            '<li>nested program_code detail\n</li></ul>\n</li></ul>\n<ol>\n<li>First step\n</li></ol>') in page
+    assert '<p>A &lt; B &amp; C</p>' in page
+
+
+def test_render_playbook_skips_unknown_formats(tmp_path):
+    base = str(tmp_path / 'out' / 'playbook')
+    assert render_playbook(PLAYBOOK, 'BD Playbook', base, ['markdown', 'html', 'rtf']) == [f'{base}.md',
+                                                                                          f'{base}.html']
+    assert (tmp_path / 'out' / 'playbook.md').read_text() == PLAYBOOK
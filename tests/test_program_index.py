@@ -0,0 +1,39 @@
+from pipelines.mapping_engine.program_index import ProgramIndex
+
+PROGRAMS = {
+    'GBSD': {'full_name': 'Ground Based Strategic Deterrent', 'acronyms': ['GBSD'], 'code_names': ['Sentinel'],
+             'prime_contractor': 'Northrop Grumman', 'key_skills': ['systems engineering']},
+    'F/A-18': {'full_name': 'Super Hornet', 'acronyms': ['F/A-18'], 'prime_contractor': 'Boeing',
+               'key_skills': ['avionics', 'systems engineering']},
+    'KC-46': {'full_name': 'Pegasus Tanker', 'acronyms': ['KC-46'], 'prime_contractor': 'Boeing'},
+}
+KEYWORDS = {'GBSD': ['ICBM'], 'F_A_18': ['carrier-based']}
+
+
+def test_rank_orders_programs_by_evidence():
+    index = ProgramIndex(PROGRAMS, KEYWORDS)
+    job = {'title': 'Sentinel Systems Engineer', 'company': 'Northrop Grumman',
+           'description': 'ICBM launch systems engineering; some avionics exposure.'}
+    ranked = index.rank(job)
+    assert [code for code, _ in ranked] == ['GBSD', 'F/A-18']
+    # Identity term in the title, keyword and skill in the description, plus the prime
+    assert ranked[0][1] == 3.0 * 2 + 2.0 + 1.0 + 1.5
+    assert index.rank(job, top_k=1) == ranked[:1]
+
+
+def test_keywords_match_program_codes_loosely():
+    index = ProgramIndex(PROGRAMS, KEYWORDS)
+    assert index.score({'description': 'Carrier-based aviation support'}) == {'F/A-18': 2.0}
+
+
+def test_jobs_without_evidence_have_no_candidates():
+    index = ProgramIndex(PROGRAMS, KEYWORDS)
+    assert index.rank({'title': 'Office Manager', 'description': 'Scheduling and travel'}) == []
+
+
+def test_ties_break_on_program_code():
+    index = ProgramIndex(PROGRAMS, KEYWORDS)
+    job = {'title': 'Engineer', 'description': 'Boeing programs', 'company': 'Boeing'}
+    assert index.rank(job) == []
+    job['description'] = 'KC-46 and F/A-18 support'
+    assert [code for code, _ in index.rank(job)] == ['F/A-18', 'KC-46']
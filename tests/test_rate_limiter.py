@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from pipelines.mapping_engine.rate_limiter import AsyncRateLimiter
+
+
+def test_requests_within_the_bucket_do_not_wait():
+    async def run():
+        limiter = AsyncRateLimiter(requests_per_minute=60, tokens_per_minute=6000)
+        return [await limiter.acquire(100) for _ in range(5)]
+
+    assert asyncio.run(run()) == [0.0] * 5
+
+
+def test_token_budget_delays_the_next_request():
+    async def run():
+        # 600 tokens/minute refills 10 tokens a second
+        limiter = AsyncRateLimiter(requests_per_minute=6000, tokens_per_minute=600)
+        await limiter.acquire(600)
+        return await limiter.acquire(5)
+
+    assert asyncio.run(run()) == pytest.approx(0.5, abs=0.1)
+
+
+def test_oversized_requests_are_capped_at_the_bucket():
+    async def run():
+        limiter = AsyncRateLimiter(requests_per_minute=60, tokens_per_minute=1000)
+        waited = await limiter.acquire(5000)
+        # Usage refunds go back into the bucket
+        limiter.adjust(-400)
+        return waited, limiter.tokens
+
+    waited, tokens = asyncio.run(run())
+    assert waited == 0.0
+    assert tokens == pytest.approx(400, abs=1)
@@ -0,0 +1,46 @@
+import pytest
+from scrapy.exceptions import IgnoreRequest
+from scrapy.http import HtmlResponse, Request
+
+from insight_global_spider import InsightGlobalSpider
+from replay import RecordMiddleware, ReplayMiddleware, benchmark, iter_fixtures
+
+SEARCH_URL = 'https://jobs.insightglobal.com/search?keywords=TS'
+DETAIL_URL = 'https://jobs.insightglobal.com/job/123'
+PAGES = {
+    SEARCH_URL: ('parse', '<html><a href="/job/123">Engineer</a></html>'),
+    DETAIL_URL: ('parse_job_detail', '<html><h1>Engineer – Ogden</h1>'
+                                     '<div class="job-description">Active TS/SCI required</div></html>'),
+}
+
+
+@pytest.fixture
+def fixtures_path(tmp_path):
+    path = str(tmp_path / 'fixtures' / 'insight_global.jsonl.gz')
+    recorder = RecordMiddleware(path)
+    spider = InsightGlobalSpider()
+    for url, (callback, body) in PAGES.items():
+        request = Request(url, callback=getattr(spider, callback))
+        response = HtmlResponse(url=url, body=body.encode('utf-8'), encoding='utf-8', request=request)
+        assert recorder.process_response(request, response) is response
+    recorder.spider_closed(spider)
+    return path
+
+
+def test_recorded_fixtures_round_trip(fixtures_path):
+    fixtures = list(iter_fixtures(fixtures_path))
+    assert [(f['url'], f['callback']) for f in fixtures] == [(url, callback) for url, (callback, _) in PAGES.items()]
+
+    replayer = ReplayMiddleware(fixtures_path)
+    # Lookups are by canonical URL, so query order does not matter
+    response = replayer.process_request(Request(DETAIL_URL + '?'))
+    assert response.css('h1::text').get() == 'Engineer – Ogden'
+    with pytest.raises(IgnoreRequest):
+        replayer.process_request(Request('https://jobs.insightglobal.com/job/999'))
+
+
+def test_benchmark_parses_every_page(fixtures_path):
+    results = benchmark(InsightGlobalSpider, list(iter_fixtures(fixtures_path)), pages=10)
+    assert (results['parse']['pages'], results['parse']['requests']) == (10, 10)
+    assert (results['parse_job_detail']['pages'], results['parse_job_detail']['items']) == (10, 10)
+    assert results['selector_depth']['title_selectors'] == 3
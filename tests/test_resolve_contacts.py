@@ -0,0 +1,85 @@
+from pipelines.entity_resolution.resolve_contacts import Contact, ContactResolver, iter_source
+
+
+def contact(name, source='test', **fields):
+    return Contact(source, dict(fields, name=name))
+
+
+def names_by_cluster(resolver):
+    return sorted(sorted(resolver.contacts[i].fields['name'] for i in members)
+                  for members in resolver.clusters().values())
+
+
+def test_exact_keys_merge_unless_the_names_conflict():
+    resolver = ContactResolver()
+    resolver.add([
+        contact('Jonathan Smith', email='jsmith@ngc.com'),
+        contact('J. Smith', email='JSmith@NGC.com'),
+        # Someone else's address pasted into the row
+        contact('Maria Lopez', email='jsmith@ngc.com'),
+    ])
+    assert names_by_cluster(resolver) == [['J. Smith', 'Jonathan Smith'], ['Maria Lopez']]
+    assert resolver.stats['exact_merges'] == 1
+    assert resolver.stats['key_conflicts'] == 1
+
+
+def test_fuzzy_matches_need_the_same_sound_and_city():
+    resolver = ContactResolver(match_threshold=0.9)
+    resolver.add([
+        contact('Jon Smith', city='Ogden', company='Northrop Grumman'),
+        contact('Jonathan Smyth', city='Ogden', company='Northrop Grumman'),
+        contact('Jonathan Smith', city='Roy', company='Northrop Grumman'),
+        contact('Karen Smith', city='Ogden', company='Northrop Grumman'),
+    ])
+    resolver.resolve()
+    assert names_by_cluster(resolver) == [['Jon Smith', 'Jonathan Smyth'], ['Jonathan Smith'], ['Karen Smith']]
+    assert resolver.stats['fuzzy_merges'] == 1
+
+
+def test_same_domain_addresses_are_different_people():
+    resolver = ContactResolver()
+    a = contact('Jon Smith', email='jon.smith@ngc.com')
+    b = contact('Jon Smith', email='jon.smith2@ngc.com')
+    assert resolver.score(a, b) == 0.0
+
+
+def test_oversized_blocks_compare_neighbours_sorted_by_name():
+    resolver = ContactResolver(match_threshold=0.9, max_block_size=2)
+    resolver.add([
+        contact('Ann Smith', city='Ogden'),
+        contact('Bob Smith', city='Ogden'),
+        contact('Ann Smyth', city='Ogden'),
+    ])
+    resolver.resolve()
+    # In arrival order the two Anns are never adjacent; sorted by name they are
+    assert names_by_cluster(resolver) == [['Ann Smith', 'Ann Smyth'], ['Bob Smith']]
+    assert resolver.stats['windowed_blocks'] == 1
+    assert resolver.stats['comparisons'] == 2
+
+
+def test_merged_rows_prefer_earlier_sources_and_fuller_names():
+    resolver = ContactResolver()
+    resolver.add([
+        contact('J. Smith', source='a.csv:2', email='jsmith@ngc.com', title='Engineer'),
+        contact('Jonathan A. Smith', source='b.csv:5', email='jsmith@ngc.com', title='Sr Engineer',
+                phone='555-0100'),
+    ])
+    [row] = resolver.merged_rows()
+    assert (row['name'], row['title'], row['phone']) == ('Jonathan A. Smith', 'Engineer', '555-0100')
+    assert (row['first_name'], row['last_name']) == ('Jonathan', 'Smith')
+    assert (row['record_count'], row['sources'], row['match_keys']) == (2, 'a.csv:2; b.csv:5', 'email=1')
+
+
+def test_sources_map_headers_rollups_and_spilled_locations(tmp_path):
+    export = tmp_path / 'export.csv'
+    export.write_text('Full Name,Title,site_location,email\n'
+                      'Jon Smith,Engineer,Ogden, UT,jon@ngc.com\n'
+                      'unknown,,,\n')
+    rollup = tmp_path / 'rollup.csv'
+    rollup.write_text('Team / IPT,Known Team Members\nGBSD Test,Ann Lee; Bob Ray\n')
+
+    [jon] = iter_source(str(export))
+    assert jon.source == 'export.csv:2'
+    assert (jon.first, jon.last, jon.city, jon.fields['state']) == ('jon', 'smith', 'ogden', 'UT')
+    assert [(c.fields['name'], c.fields['department']) for c in iter_source(str(rollup))] == [
+        ('Ann Lee', 'GBSD Test'), ('Bob Ray', 'GBSD Test')]
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from config.knowledge_base import ProgramKnowledgeBase, compile_sources
+from pipelines.scoring_engine.score_programs import (FACTORS, ProgramFactors, ProgramScorer, clearance_key,
+                                                     parse_contract_value)
+
+SCORING = {
+    'clearance_scores': {'TS_SCI': 1.0, 'TS': 0.8, 'Secret': 0.6},
+    'location_scores': {'primary_state': 1.0, 'secondary_state': 0.7, 'clearance_hub': 0.9, 'other': 0.3},
+}
+
+
+@pytest.mark.parametrize('text, dollars', [
+    ('13.3B', 13.3e9), ('$1.7 trillion', 1.7e12), ('850M', 850e6), ('$2,500,000', 2.5e6),
+    ('FY2025 $500M', 500e6), ('F-35A: 428B', 428e9), ('Lot 17 worth 7.8 billion', 7.8e9),
+    ('TBD', 0.0), (None, 0.0), (1200, 1200.0),
+])
+def test_parse_contract_value(text, dollars):
+    assert parse_contract_value(text) == pytest.approx(dollars)
+
+
+def test_clearance_key():
+    assert [clearance_key(level) for level in ('TS/SCI', 'Top Secret', ' Secret ', '')] == [
+        'TS_SCI', 'Top_Secret', 'Secret', 'None']
+
+
+@pytest.fixture
+def knowledge_base():
+    programs = {
+        'programs': {
+            'GBSD': {'prime_contractor': 'Northrop Grumman', 'contract_value': '$100B', 'clearance_levels': ['TS/SCI'],
+                     'locations': ['Utah'], 'key_skills': ['ICBM', 'Nuclear']},
+            'F/A-18': {'prime_contractor': 'Boeing', 'contract_value': '10M', 'clearance_levels': ['Secret'],
+                       'locations': ['Missouri'], 'key_skills': ['Avionics']},
+            'T-7A': {'prime_contractor': 'Boeing', 'contract_value': 'TBD'},
+        },
+        'locations': {'primary_states': ['Utah'], 'secondary_states': ['Missouri']},
+    }
+    data = compile_sources(programs, {}, {})
+    data['sources'] = {}
+    return ProgramKnowledgeBase(data)
+
+
+MAPPINGS = [
+    {'job_id': '1', 'mapped_programs': ['GBSD'], 'confidence_score': 1.0, 'keywords_found': ['ICBM']},
+    {'job_id': '2', 'mapped_programs': ['GBSD', 'F_A_18'], 'confidence_score': 0.5, 'keywords_found': ['nuclear']},
+    {'job_id': '3', 'mapped_programs': ['Unknown'], 'confidence_score': 0.9},
+]
+JOBS = [
+    {'job_id': '1', 'clearance_level': 'TS', 'location': 'Ogden, Utah'},
+    {'job_id': '2', 'clearance_level': 'Secret', 'location': ''},
+]
+
+
+def column(factors, name):
+    return dict(zip(factors.codes, factors.matrix[:, FACTORS.index(name)].round(4)))
+
+
+def test_factors_from_dictionary_and_mapped_jobs(knowledge_base):
+    factors = ProgramFactors.build(knowledge_base, SCORING, MAPPINGS, JOBS)
+    assert dict(zip(factors.codes, factors.job_counts)) == {'GBSD': 2, 'F/A-18': 1, 'T-7A': 0}
+    # log10($100B / $1M) = 5 is the scale; $10M is 1/5 of it, unparsable is the floor
+    assert column(factors, 'contract_value') == {'GBSD': 1.0, 'F/A-18': 0.2, 'T-7A': 0.0}
+    assert column(factors, 'company_reputation') == {'GBSD': 0.5, 'F/A-18': 1.0, 'T-7A': 1.0}
+    # Confidence-weighted over the jobs that state one; dictionary default otherwise
+    assert column(factors, 'clearance_level') == {'GBSD': round((0.8 * 1.0 + 0.6 * 0.5) / 1.5, 4),
+                                                  'F/A-18': 0.6, 'T-7A': 0.0}
+    assert column(factors, 'location_match') == {'GBSD': 1.0, 'F/A-18': 0.7, 'T-7A': 0.0}
+    assert column(factors, 'skill_match') == {'GBSD': 1.0, 'F/A-18': 0.0, 'T-7A': 0.0}
+    assert column(factors, 'job_demand') == {'GBSD': 1.0, 'F/A-18': round(np.log1p(0.5) / np.log1p(1.5), 4),
+                                             'T-7A': 0.0}
+
+
+def test_weight_sets_are_normalized_and_checked():
+    weights = ProgramScorer.weight_matrix([{'contract_value': 3, 'job_demand': 1}, {}])
+    assert weights[0, FACTORS.index('contract_value')] == 0.75
+    assert weights[1].sum() == 0.0
+    with pytest.raises(ValueError, match='Unknown scoring factors: bogus'):
+        ProgramScorer.weight_matrix([{'bogus': 1}])
+    with pytest.raises(ValueError):
+        ProgramScorer.weight_matrix([{'contract_value': -1}])
+
+
+def test_what_if_scores_match_scoring_each_set_alone(knowledge_base):
+    scorer = ProgramScorer(ProgramFactors.build(knowledge_base, SCORING, MAPPINGS, JOBS))
+    weight_sets = [{'contract_value': 1}, {'company_reputation': 1}, {'job_demand': 2, 'skill_match': 1}]
+    scores = scorer.score_many(weight_sets)
+    for row, weights in zip(scores, weight_sets):
+        np.testing.assert_allclose(row, scorer.score(weights))
+    # Ties keep dictionary order
+    assert [r['program'] for r in scorer.results(scores[1])] == ['F/A-18', 'T-7A', 'GBSD']
+    assert scorer.results(scores[0], top=1) == [{
+        'program': 'GBSD', 'rank': 1, 'score': 100.0, 'job_count': 2,
+        'factors': dict(zip(FACTORS, scorer.factors.matrix[0].round(4).tolist()))}]
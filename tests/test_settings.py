@@ -0,0 +1,36 @@
+import pytest
+import yaml
+
+from config.settings import load_settings, validate_settings
+
+VALID = {
+    'apis': {'openai': {'model': 'gpt-4o', 'max_tokens': 4000, 'temperature': 0.1}},
+    'program_mapping': {'keyword_match_threshold': 0.6},
+}
+
+
+def test_project_settings_are_valid():
+    validate_settings(load_settings('config/settings.yaml'))
+
+
+def test_every_problem_is_reported_at_once():
+    settings = {'apis': {'openai': {'model': 'gpt-4o', 'max_tokens': '4000', 'temperature': True}},
+                'program_mapping': {}}
+    with pytest.raises(ValueError) as error:
+        validate_settings(settings)
+    message = str(error.value)
+    assert 'apis.openai.max_tokens must be int, got str' in message
+    assert 'apis.openai.temperature must be int/float, got bool' in message
+    assert 'program_mapping.keyword_match_threshold is required' in message
+
+
+def test_settings_are_parsed_once_until_the_file_changes(tmp_path):
+    path = tmp_path / 'settings.yaml'
+    path.write_text(yaml.safe_dump(VALID))
+    first = load_settings(str(path))
+    assert load_settings(str(path)) is first
+
+    path.write_text(yaml.safe_dump(dict(VALID, extra={'key': 'a much longer value'})))
+    reloaded = load_settings(str(path))
+    assert reloaded is not first
+    assert reloaded['extra'] == {'key': 'a much longer value'}
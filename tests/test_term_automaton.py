@@ -0,0 +1,48 @@
+import random
+
+from pipelines.mapping_engine.term_automaton import TermAutomaton, tokenize
+
+TERMS = ['stealth', 'stealth bomber', 'bomber', 'B-21', 'long range strike', 'range', 'F/A-18', 'A 18']
+
+
+def automaton(terms=TERMS):
+    automaton = TermAutomaton()
+    for term in terms:
+        automaton.add(term, term)
+    return automaton
+
+
+def naive_count(terms, text):
+    """Every term occurrence found by sliding over the token list."""
+    tokens = tokenize(text)
+    counts = {}
+    for term in terms:
+        term_tokens = tokenize(term)
+        for start in range(len(tokens) - len(term_tokens) + 1):
+            if tokens[start:start + len(term_tokens)] == term_tokens:
+                counts[term] = counts.get(term, 0) + 1
+    return counts
+
+
+def test_overlapping_and_nested_terms():
+    text = 'B-21 stealth bomber for long range strike; F/A-18 stealth upgrades'
+    assert automaton().count(text) == {
+        'B-21': 1, 'stealth': 2, 'stealth bomber': 1, 'bomber': 1, 'long range strike': 1, 'range': 1,
+        'F/A-18': 1, 'A 18': 1,
+    }
+
+
+def test_matches_stop_at_word_boundaries():
+    assert automaton().count('Stealthy bombers arranged a FA-18 flight') == {}
+
+
+def test_matches_agree_with_a_naive_scan():
+    rng = random.Random(7)
+    vocabulary = ['stealth', 'bomber', 'long', 'range', 'strike', 'b', '21', 'f', 'a', '18', 'the']
+    for _ in range(200):
+        text = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(0, 30)))
+        assert automaton().count(text) == naive_count(TERMS, text)
+
+
+def test_terms_without_tokens_are_rejected():
+    assert TermAutomaton().add(' -/ ', 'empty') is False